@@ -0,0 +1,52 @@
+""" Dynamic baseline fitting (skspec.core.baseline.dynamic_baseline, one
+least squares solve shared by all columns) against np.polyfit column by
+column, as dynamic_baseline used to.
+
+   python bench_baseline.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+import numpy as np
+from pandas import DataFrame, Series
+
+from skspec.core.baseline import dynamic_baseline
+
+from benchutils import make_timespectra, best_time, print_table
+
+SLICES = ((420.0, 450.0), (750.0, 780.0), (800.0,))
+
+def _per_column(ts, order):
+    """ polyfit/poly1d and a Series per column, then a DataFrame"""
+    frame = ts._frame
+    x = np.asarray(frame.index)
+    inside = ((x >= 420.0) & (x <= 450.0)) | ((x >= 750.0) & (x <= 780.0))
+    xp = list(x[inside]) + [x[np.abs(x - 800.0).argmin()]]
+    out = {}
+    for col in frame.columns:
+        curve = frame[col]
+        p = np.poly1d(np.polyfit(xp, curve[xp], order))
+        out[col] = Series(p(x), index=curve.index)
+    return DataFrame(out)
+
+def _inplace(ts, order):
+    dynamic_baseline(ts, SLICES, order=order, inplace=True)
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    rows = []
+    for order in (1, 3):
+        told = best_time(partial(_per_column, ts, order), repeat=1)
+        tnew = best_time(partial(dynamic_baseline, ts, SLICES, order=order))
+        tin = best_time(partial(_inplace, ts.copy(), order))
+        rows.append([order, '%.3f' % told, '%.3f' % tnew, '%.3f' % tin,
+                     '%.0fx' % (told / tnew)])
+
+    print_table(['order', 'polyfit s', 'batched s', 'in place s', 'speedup'],
+                rows)
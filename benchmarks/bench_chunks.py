@@ -0,0 +1,55 @@
+""" Peak memory of reductions of a memory mapped TimeSpectra, in memory
+(ts.mean() etc... on the whole run) and chunked (skspec.core.chunks), as
+the number of columns grows.  Chunked memory should stay flat.
+
+Memory is anonymous memory only (see benchutils.peak_memory); pages of
+the mapped file are left out, since the kernel can drop them at will.
+
+   python bench_chunks.py [nspec] [chunksize]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from functools import partial
+
+from skspec import TimeSpectra
+import skspec.core.chunks as pvchunks
+from benchutils import make_timespectra, peak_memory, print_table
+
+NTIMES = [2000, 4000, 8000, 16000]
+
+def _reductions(chunksize):
+    return [
+        ('mean(axis=1)', lambda ts: ts.mean(axis=1),
+         partial(pvchunks.chunked_mean, axis=1, columns=chunksize)),
+        ('area', lambda ts: ts.area(),
+         partial(pvchunks.area, columns=chunksize)),
+        ]
+
+
+if __name__ == '__main__':
+    nspec, chunksize = 2048, 1000
+    if len(sys.argv) > 2:
+        nspec, chunksize = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x ntime, chunks of %s columns\n' % (nspec, chunksize)
+
+    tmpdir = tempfile.mkdtemp()
+    rows = []
+    try:
+        for ntime in NTIMES:
+            path = os.path.join(tmpdir, 'run%s.dat' % ntime)
+            make_timespectra(nspec, ntime).to_memmap(path)
+            load = partial(TimeSpectra.from_memmap, path)
+            framesize = nspec * ntime * 8 / 1024.0**2
+            for name, whole, chunked in _reductions(chunksize):
+                mw, tw = peak_memory(load, whole, anon=True)
+                mc, tc = peak_memory(load, chunked, anon=True)
+                rows.append([ntime, '%.0f' % framesize, name, '%.1f' % mw,
+                             '%.1f' % mc, '%.3f' % tw, '%.3f' % tc])
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print_table(['ntime', 'file MB', 'reduction', 'whole MB', 'chunked MB',
+                 'whole s', 'chunked s'], rows)
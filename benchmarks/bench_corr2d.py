@@ -0,0 +1,83 @@
+""" Cost of the 2D correlation spectra a corr_multi quad plot and a phase/
+modulous analysis read from one Corr2d.  Corr2d caches its matrix products
+(see Corr2d._cached), so each N x N product is computed once; 'uncached'
+empties the cache before every access, which is what every access cost
+before.
+
+Then the asynchronous spectrum against the number of timepoints M, with 
+the FFT Hilbert-Noda transform (default) and the dense Noda matrix, which
+needs O(M**2) memory and is skipped past DENSEMAX timepoints.
+
+Last, a region of interest (Corr2d(ts, rows=..., cols=...)) against the 
+full 2D spectra it is cut from.
+
+   python bench_corr2d.py [nspec] [ntime]
+"""
+
+import sys
+
+from skspec.correlation import Corr2d
+from skspec.correlation.corr import noda_transform
+from benchutils import make_timespectra, best_time, print_table
+
+DENSEMAX = 8000
+NTIMES = [1000, 4000, 8000, 20000]
+
+ACCESSES = ['sync', 'async', 'phase', 'modulous', 'correlation', 
+            'disrelation']
+
+def _analysis(corr, cached=True, scalings=((0.8, 0.0),)):
+    for alpha, beta in scalings:
+        corr.scale(alpha=alpha, beta=beta)
+        for attr in ACCESSES:
+            if not cached:
+                corr._cache = {}
+            getattr(corr, attr)
+
+if __name__ == '__main__':
+    nspec, ntime = 1000, 500
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    rows = []
+    for name, scalings in [('one scaling', ((0.8, 0.0),)),
+                           ('3 scalings', ((0.8, 0.0), (0.5, 0.5), 
+                                           (1.0, 0.2)))]:
+        told = best_time(lambda: _analysis(Corr2d(ts), False, scalings), 
+                         repeat=1)
+        tnew = best_time(lambda: _analysis(Corr2d(ts), True, scalings), 
+                         repeat=1)
+        rows.append([name, '%.3f' % told, '%.3f' % tnew, 
+                     '%.1fx' % (told / tnew)])
+
+    print_table(['analysis', 'uncached s', 'cached s', 'speedup'], rows)
+
+    nspec = 500
+    print '\nHilbert-Noda transform (async spectrum), %s spectra\n' % nspec
+    rows = []
+    for ntime in NTIMES:
+        dyn = make_timespectra(nspec, ntime)._frame.values
+        tfft = best_time(lambda: noda_transform(dyn), repeat=1)
+        if ntime <= DENSEMAX:
+            tdense = best_time(lambda: noda_transform(dyn, 'dense'), repeat=1)
+            rows.append([ntime, '%.3f' % tdense, '%.3f' % tfft,
+                         '%.1fx' % (tdense / tfft)])
+        else:
+            rows.append([ntime, 'n/a', '%.3f' % tfft, ''])
+
+    print_table(['timepoints', 'dense s', 'fft s', 'speedup'], rows)
+
+    nspec, ntime = 2048, 1000
+    ts = make_timespectra(nspec, ntime)
+    print '\nRegions of interest, TimeSpectra %s x %s\n' % (nspec, ntime)
+    full = best_time(lambda: _analysis(Corr2d(ts)), repeat=1)
+    rows = [['full (350-1000 nm)', '%.3f' % full, '']]
+    for name, roi in [('500-560 x 600-700 nm', ((500, 560), (600, 700))),
+                      ('400-700 x 400-700 nm', ((400, 700), (400, 700)))]:
+        troi = best_time(lambda: _analysis(Corr2d(ts, rows=roi[0], 
+                                                  cols=roi[1])), repeat=1)
+        rows.append([name, '%.3f' % troi, '%.1fx' % (full / troi)])
+
+    print_table(['2D spectra', 'best s', 'speedup'], rows)
@@ -0,0 +1,51 @@
+""" StreamingCorr2d (skspec.correlation.corr) against rebuilding a Corr2d
+as each spectrum of a live acquisition arrives: time per new frame for the
+synchronous spectrum, over all spectra so far and over a sliding window.
+
+   python bench_corr_stream.py [nspec] [ntime] [window]
+"""
+
+import sys
+import time
+
+from skspec.correlation import Corr2d
+from skspec.correlation.corr import StreamingCorr2d
+from benchutils import make_timespectra, print_table
+
+def _rebuild(ts, start, window):
+    """ Seconds per frame: a new Corr2d of the spectra so far (or of the
+    last window of them) each time one arrives."""
+    t0 = time.time()
+    for j in range(start, ts.shape[1]):
+        lo = 0 if window is None else max(0, j + 1 - window)
+        corr = Corr2d(ts.iloc[:, lo:j+1])
+        corr.set_center('mean')
+        corr.sync_noscale
+    return (time.time() - t0) / (ts.shape[1] - start)
+
+def _stream(ts, start, window):
+    """ Seconds per frame with StreamingCorr2d.append()."""
+    stream = StreamingCorr2d(ts.iloc[:, :start], window=window)
+    values = ts._frame.values
+    t0 = time.time()
+    for j in range(start, ts.shape[1]):
+        stream.append(values[:, j], label=ts.columns[j])
+        stream.sync_noscale
+    return (time.time() - t0) / (ts.shape[1] - start)
+
+if __name__ == '__main__':
+    nspec, ntime, window = 1000, 200, 50
+    if len(sys.argv) > 3:
+        nspec, ntime, window = [int(a) for a in sys.argv[1:4]]
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    start = ntime // 2
+    rows = []
+    for name, win in [('all spectra', None), ('window %s' % window, window)]:
+        told = _rebuild(ts, start, win)
+        tnew = _stream(ts, start, win)
+        rows.append([name, '%.2f' % (1e3 * told), '%.2f' % (1e3 * tnew),
+                     '%.1fx' % (told / tnew)])
+    print_table(['spectra', 'Corr2d ms/frame', 'stream ms/frame', 'speedup'],
+                rows)
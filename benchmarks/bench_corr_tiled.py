@@ -0,0 +1,46 @@
+""" tiled_correlation (skspec.correlation.corr) against Corr2d for a
+large spectral dimension: wall time of sync and async as the number of
+threads grows, and peak memory (in RAM and into temporary memmaps).
+
+BLAS may thread on its own; for clean scaling numbers pin it, eg
+
+   OPENBLAS_NUM_THREADS=1 python bench_corr_tiled.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+from multiprocessing import cpu_count
+
+from skspec.correlation import Corr2d
+from skspec.correlation.corr import tiled_correlation
+from benchutils import make_timespectra, peak_memory, best_time, print_table
+
+def _corr2d(ts):
+    corr = Corr2d(ts)
+    return corr.sync, corr.async
+
+if __name__ == '__main__':
+    nspec, ntime = 3648, 500
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s, %s CPUs\n' % (nspec, ntime, cpu_count())
+
+    ts = make_timespectra(nspec, ntime)
+    told = best_time(partial(_corr2d, ts), repeat=1)
+    rows = [['Corr2d', '', '%.3f' % told, '']]
+    threads = sorted(set([1, 2, 4, cpu_count()]))
+    for n in threads:
+        tnew = best_time(partial(tiled_correlation, ts, threads=n), repeat=1)
+        rows.append(['tiled', n, '%.3f' % tnew, '%.1fx' % (told / tnew)])
+    print_table(['engine', 'threads', 'best s', 'vs Corr2d'], rows)
+
+    setup = partial(make_timespectra, nspec, ntime)
+    rows = []
+    for name, op in [('Corr2d sync + async', _corr2d),
+                     ('tiled', tiled_correlation),
+                     ('tiled, memmap outputs', 
+                      partial(tiled_correlation, memmap=True))]:
+        mb, _ = peak_memory(setup, op, anon=True)
+        rows.append([name, '%.0f' % mb])
+    print
+    print_table(['engine', 'peak MB'], rows)
@@ -0,0 +1,71 @@
+""" Overhead of attribute and method dispatch through
+MetaPandasObject.__getattr__/__setattr__ on Spectra and Spectrum, against
+the old dispatch (partial per lookup, list scan of _dfattrs).  Uses a tiny
+frame so that dispatch, not numerics, dominates.
+
+   python bench_dispatch.py [number]
+"""
+
+import sys
+import functools
+from types import MethodType
+
+from pandas import DataFrame
+
+import skspec.pandas_utils.metadframe as metadframe
+from skspec.pandas_utils.metadframe import MetaPandasObject
+from skspec.core.spectra import Spectrum
+from benchutils import make_timespectra, best_time, print_table
+
+_dfattrs_list = sorted(metadframe._dfattrs)
+
+def _legacy_getattr(self, attr, *fcnargs, **fcnkwargs):
+    refout = getattr(self._frame, attr)
+    if not isinstance(refout, MethodType):
+        return refout
+    return functools.partial(self._framegetattr, attr, *fcnargs, **fcnkwargs)
+
+def _legacy_setattr(self, name, value):
+    super(MetaPandasObject, self).__setattr__(name, value)
+    if name in _dfattrs_list:
+        setattr(self._frame, name, value)
+    else:
+        self.__dict__[name] = value
+
+
+def _ops(ts, spec):
+    return [
+        ('Spectra attribute (ts.ndim)', lambda: ts.ndim),
+        ('Spectra method lookup (ts.sum)', lambda: ts.sum),
+        ('Spectra method call (ts.sum())', lambda: ts.sum()),
+        ('Spectra setattr (ts.foo = 1)', lambda: setattr(ts, 'foo', 1)),
+        ('Spectrum attribute (s.ndim)', lambda: spec.ndim),
+        ('Spectrum method lookup (s.max)', lambda: spec.max),
+        ('Spectrum method call (s.max())', lambda: spec.max()),
+    ]
+
+
+if __name__ == '__main__':
+    number = 20000
+    if len(sys.argv) > 1:
+        number = int(sys.argv[1])
+
+    ts = make_timespectra(8, 4)
+    spec = Spectrum([1.0, 2.0, 3.0], index=[400.0, 500.0, 600.0])
+
+    new = [best_time(op, number=number) for name, op in _ops(ts, spec)]
+
+    getattr_, setattr_ = MetaPandasObject.__getattr__, MetaPandasObject.__setattr__
+    MetaPandasObject.__getattr__ = _legacy_getattr
+    MetaPandasObject.__setattr__ = _legacy_setattr
+    try:
+        old = [best_time(op, number=number) for name, op in _ops(ts, spec)]
+    finally:
+        MetaPandasObject.__getattr__ = getattr_
+        MetaPandasObject.__setattr__ = setattr_
+
+    rows = []
+    for (name, op), to, tn in zip(_ops(ts, spec), old, new):
+        rows.append([name, '%.2f' % (to * 1e6), '%.2f' % (tn * 1e6), 
+                     '%.1fx' % (to / tn)])
+    print_table(['operation', 'old us', 'new us', 'speedup'], rows)
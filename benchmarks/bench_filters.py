@@ -0,0 +1,41 @@
+""" Spectra.smooth/derivative (one convolution over all columns, see
+skspec.core.filters) against filtering column by column through df.apply,
+in float64 and float32.
+
+   python bench_filters.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+from scipy.signal import savgol_filter
+
+from benchutils import make_timespectra, best_time, print_table
+
+def _per_column(df, window, polyorder, deriv=0):
+    return df.apply(lambda y: savgol_filter(y, window, polyorder, deriv=deriv,
+                                            mode='nearest'), raw=True)
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    rows = []
+    for dtype in ('float64', 'float32'):
+        ts = ts.astype(dtype) if dtype == 'float32' else ts
+        cases = [
+            ('savgol 11/3', partial(_per_column, ts._frame, 11, 3),
+             partial(ts.smooth, 'savgol', 11, 3)),
+            ('1st derivative', partial(_per_column, ts._frame, 11, 2, 1),
+             partial(ts.derivative, 1, 'savgol', 11, 2)),
+        ]
+        for name, old, new in cases:
+            told = best_time(old, repeat=1)
+            tnew = best_time(new, repeat=3)
+            rows.append(['%s (%s)' % (name, dtype), '%.3f' % told,
+                         '%.3f' % tnew, '%.1fx' % (told / tnew)])
+
+    print_table(['filter', 'apply s', 'smooth s', 'speedup'], rows)
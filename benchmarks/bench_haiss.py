@@ -0,0 +1,71 @@
+""" Haiss sizing of every spectrum of a run (skspec.nptools.haiss, one NumPy
+pass over all columns) against the scalar formulae applied column by
+column, as haiss_m1/haiss_m3 used to; and over a SpecStack of runs.
+
+   python bench_haiss.py [nspec] [ntime] [nruns]
+"""
+
+import sys
+import math
+import warnings
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+from skspec import SpecStack
+from skspec.nptools import haiss
+
+from benchutils import make_timespectra, best_time, print_table
+
+def _m1_per_column(ts):
+    cut = ts._frame.ix[400.0:700.0]
+    return cut.idxmax().apply(lambda spr: math.log((spr - 512) / 6.53) / 0.0216)
+
+def _m3_per_column(ts, Cau):
+    cut = ts._frame.ix[400.0:700.0]
+    return cut.max(axis=0).apply(lambda a: ((a * 5.89e-6) / 
+                                 (Cau * math.exp(-4.75)))**(1.0 / 0.314))
+
+def _m2_per_column(ts):
+    cut = ts._frame.ix[400.0:700.0]
+    def size(curve):
+        xspr = curve.idxmax()
+        aspr = curve[xspr - 2.0:xspr + 2.0].mean()
+        aref = curve[448.0:452.0].mean()
+        return math.exp(3.0 * aspr / aref - 2.2)
+    return [size(cut[col]) for col in cut.columns]
+
+if __name__ == '__main__':
+    nspec, ntime, nruns = 2048, 5000, 4
+    if len(sys.argv) > 3:
+        nspec, ntime, nruns = [int(x) for x in sys.argv[1:4]]
+    print 'TimeSpectra %s x %s, stack of %s runs\n' % (nspec, ntime, nruns)
+    warnings.simplefilter('ignore')
+
+    # A plasmon peak red of 512nm (so M1 has a diameter), drifting over the run
+    ts = make_timespectra(nspec, ntime)
+    x = np.asarray(ts.index)
+    centers = np.linspace(525.0, 545.0, ntime)
+    ts = ts + 5000.0 * np.exp(-(x[:, None] - centers)**2 / (2 * 30.0**2))
+    ts.iunit = 'a'
+    stack = SpecStack(OrderedDict([('run%s' % i, ts) for i in range(nruns)]))
+
+    cases = [
+        ('m1', partial(_m1_per_column, ts), partial(haiss.haiss_m1, ts)),
+        ('m2 (windows)', partial(_m2_per_column, ts), 
+         partial(haiss.haiss_m2, ts, peak_width=2.0, ref_width=2.0)),
+        ('m3', partial(_m3_per_column, ts, 0.000909), 
+         partial(haiss.haiss_m3, ts, 0.000909)),
+        ('m1, stack', lambda: [_m1_per_column(ts) for i in range(nruns)],
+         partial(haiss.haiss_m1, stack)),
+        ]
+
+    rows = []
+    for name, old, new in cases:
+        told = best_time(old, repeat=1)
+        tnew = best_time(new)
+        rows.append([name, '%.3f' % told, '%.3f' % tnew, 
+                     '%.0fx' % (told / tnew)])
+
+    print_table(['method', 'per column s', 'batched s', 'speedup'], rows)
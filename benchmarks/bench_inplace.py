@@ -0,0 +1,46 @@
+""" Peak memory of in place arithmetic and baseline subtraction against
+their out of place equivalents.
+
+   python bench_inplace.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+from benchutils import make_timespectra, peak_memory, print_table
+
+def _isub(ts):
+    ts -= 5.0
+    return ts
+
+def _imul(ts):
+    ts *= 2.0
+    return ts
+
+def _sub_base(ts):
+    ts.sub_base()
+    return ts
+
+OPERATIONS = [
+    ('ts = ts - 5', lambda ts: ts - 5.0),
+    ('ts -= 5', _isub),
+    ('ts = ts * 2', lambda ts: ts * 2.0),
+    ('ts *= 2', _imul),
+    ('ts.sub(baseline, axis=0)', lambda ts: ts.sub(ts._baseline, axis=0)),
+    ('ts.sub_base()', _sub_base),
+]
+
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+
+    framesize = nspec * ntime * 8 / 1024.0**2
+    print 'TimeSpectra %s x %s (%.1f MB frame)\n' % (nspec, ntime, framesize)
+
+    rows = []
+    for name, op in OPERATIONS:
+        mb, t = peak_memory(partial(make_timespectra, nspec, ntime), op)
+        rows.append([name, '%.1f' % mb, '%.3f' % t])
+    print_table(['operation', 'peak MB', 's'], rows)
@@ -0,0 +1,45 @@
+""" Batched integration (Spectra.wavelength_slices/area with 'simps' or
+'trapz', skspec.core.quadrature) against integrating every column with
+scipy, as wavelength_slices used to.
+
+   python bench_integrate.py [nspec] [ntime] [nranges]
+"""
+
+import sys
+from functools import partial
+
+import numpy as np
+from scipy import integrate
+
+from benchutils import make_timespectra, best_time, print_table
+
+def _legacy(ts, ranges, rule):
+    """ One scipy call per column and range"""
+    kwds = {'even':'last'} if rule == 'simps' else {}
+    fcn = getattr(integrate, rule)
+    out = []
+    for start, stop in ranges:
+        cut = ts._frame.ix[start:stop]
+        x, values = np.asarray(cut.index), cut.values
+        out.append([fcn(values[:, i], x=x, **kwds)
+                    for i in range(values.shape[1])])
+    return out
+
+if __name__ == '__main__':
+    nspec, ntime, nranges = 2048, 5000, 8
+    if len(sys.argv) > 3:
+        nspec, ntime, nranges = [int(x) for x in sys.argv[1:4]]
+    print 'TimeSpectra %s x %s, %s ranges\n' % (nspec, ntime, nranges)
+
+    ts = make_timespectra(nspec, ntime)
+    edges = np.linspace(ts.index[0], ts.index[-1], nranges + 1)
+    ranges = zip(edges[:-1], edges[1:])
+
+    rows = []
+    for rule in ('simps', 'trapz'):
+        told = best_time(partial(_legacy, ts, ranges, rule), repeat=1)
+        tnew = best_time(partial(ts.wavelength_slices, ranges, rule))
+        rows.append([rule, '%.3f' % told, '%.3f' % tnew,
+                     '%.0fx' % (told / tnew)])
+
+    print_table(['rule', 'apply s', 'batched s', 'speedup'], rows)
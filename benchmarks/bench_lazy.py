@@ -0,0 +1,61 @@
+""" A Controller.apply_parameters style preprocessing chain (subtract
+baseline, slice time, slice wavelengths, scale, convert norm), run eagerly
+and with Spectra.lazy().  Memory is the peak increase in anonymous memory
+(see benchutils.peak_memory).
+
+   python bench_lazy.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+from benchutils import make_timespectra, peak_memory, best_time, print_table
+
+
+def eager(ts):
+    ts = ts.deepcopy()  # sub_base() is in place
+    ts.sub_base()
+    ts = ts.iloc[:, 1000:]
+    ts = ts.nearby[450:750]
+    ts = ts * 1.5
+    return ts.as_norm('a')
+
+
+def lazy(ts):
+    return ts.lazy().sub_base().iloc[:, 1000:].nearby[450:750] \
+             .mul(1.5).as_norm('a').compute()
+
+
+def no_slices(ts):
+    ts = ts.deepcopy()
+    ts.sub_base()
+    return (ts * 1.5).as_norm('a')
+
+
+def lazy_no_slices(ts):
+    return ts.lazy().sub_base().mul(1.5).as_norm('a').compute()
+
+
+CHAINS = [('sub_base/slice/slice/mul/as_norm', eager, lazy),
+          ('sub_base/mul/as_norm', no_slices, lazy_no_slices)]
+
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+
+    framesize = nspec * ntime * 8 / 1024.0**2
+    print 'TimeSpectra %s x %s (%.1f MB frame)\n' % (nspec, ntime, framesize)
+
+    setup = partial(make_timespectra, nspec, ntime)
+    ts = setup()
+    rows = []
+    for name, e, l in CHAINS:
+        me, _ = peak_memory(setup, e, anon=True)
+        ml, _ = peak_memory(setup, l, anon=True)
+        te = best_time(partial(e, ts), repeat=3)
+        tl = best_time(partial(l, ts), repeat=3)
+        rows.append([name, '%.1f' % me, '%.1f' % ml, '%.3f' % te, '%.3f' % tl])
+
+    print_table(['chain', 'eager MB', 'lazy MB', 'eager s', 'lazy s'], rows)
@@ -0,0 +1,64 @@
+""" Peak memory of common operations on a memory mapped TimeSpectra
+(Spectra.from_memmap) against the same run loaded in RAM.
+
+The run is written once to a temporary directory; each operation includes
+loading it.  Memory is the increase in peak resident size, which includes
+mapped file pages that were read or written (the kernel can drop those 
+under memory pressure, unlike anonymous memory).  The file holds one 
+spectrum after another, so column (time) slices read only their own pages
+while row (wavelength) slices touch all of them.
+
+   python bench_memmap.py [nspec] [ntime]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from functools import partial
+
+from skspec import TimeSpectra
+from benchutils import make_timespectra, peak_memory, print_table
+
+OPERATIONS = [
+    ('load', lambda ts: ts),
+    ('ts.nearby[500:600].mean()', lambda ts: ts.nearby[500:600].mean()),
+    ('ts.iloc[:, :100].mean()', lambda ts: ts.iloc[:, :100].mean()),
+    ('wavelength_slices',
+     lambda ts: ts.wavelength_slices([(400, 450), (500, 550), (600, 650)])),
+    ('ts.as_norm("a")', lambda ts: ts.as_norm('a')),
+]
+
+
+def _load(path, memmap, operation):
+    if memmap:
+        return operation(TimeSpectra.from_memmap(path))
+    return operation(TimeSpectra.from_memmap(path, mode='c').deepcopy())
+
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+
+    framesize = nspec * ntime * 8 / 1024.0**2
+    print 'TimeSpectra %s x %s (%.1f MB frame)\n' % (nspec, ntime, framesize)
+
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'bench.dat')
+    try:
+        make_timespectra(nspec, ntime).to_memmap(path)
+        rows = []
+        for name, op in OPERATIONS:
+            setup = partial(str, path)
+            ram, tr = peak_memory(setup, partial(_load, memmap=False,
+                                                 operation=op))
+            mm, tm = peak_memory(setup, partial(_load, memmap=True,
+                                                operation=op))
+            rows.append([name, '%.1f' % ram, '%.1f' % mm,
+                         '%.3f' % tr, '%.3f' % tm])
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print_table(['operation', 'RAM MB', 'memmap MB', 'RAM s', 'memmap s'],
+                rows)
@@ -0,0 +1,39 @@
+""" Norm conversions (Spectra.as_norm) against
+the old per-column from_T/to_T lambdas applied through df.apply.
+
+   python bench_norms.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+from skspec.core.spectra import from_T, to_T
+import skspec.core.utilities as pvutils
+from benchutils import make_timespectra, best_time, print_table
+
+def _legacy(df, sin, sout, ref):
+    """ What _set_normtype used to do for each case"""
+    if sin is None:
+        return pvutils.divby(df, divisor=ref).apply(from_T[sout])
+    if sout is None:
+        return df.apply(to_T[sin]).mul(ref, axis=0)
+    return df.apply(to_T[sin]).apply(from_T[sout])
+
+CONVERSIONS = [(None, 'a'), (None, 't'), ('a', 'r'), ('a', '%t'), ('t', None)]
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    raw = make_timespectra(nspec, ntime)
+    rows = []
+    for sin, sout in CONVERSIONS:
+        ts = raw.as_norm(sin)
+        ref = ts._reference
+        told = best_time(partial(_legacy, ts._frame, sin, sout, ref), repeat=3)
+        tnew = best_time(partial(ts.as_norm, sout), repeat=3)
+        rows.append(['%s --> %s' % (sin, sout), '%.3f' % told, '%.3f' % tnew])
+
+    print_table(['conversion', 'apply s', 'as_norm s'], rows)
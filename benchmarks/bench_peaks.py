@@ -0,0 +1,38 @@
+""" Peak finding on every spectrum of a run (Spectra.find_peaks, see
+skspec.peaks) against idxmax per column through ts.apply, as haiss did.
+find_peaks also refines positions and measures FWHM and areas.
+
+   python bench_peaks.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+import numpy as np
+
+from benchutils import make_timespectra, best_time, print_table
+
+def _per_column(ts):
+    return ts._frame.apply(lambda curve: curve.idxmax())
+
+if __name__ == '__main__':
+    nspec, ntime = 1024, 20000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    # A plasmon-like peak drifting over the run, on top of the noise
+    # (baseline removed: widths are at half the height above zero)
+    ts = make_timespectra(nspec, ntime)
+    x = np.asarray(ts.index)
+    centers = np.linspace(520.0, 560.0, ntime)
+    ts = ts - 1000.0 + 500.0 * np.exp(-(x[:, None] - centers)**2 / (2 * 30.0**2))
+
+    rows = []
+    told = best_time(partial(_per_column, ts), repeat=1)
+    for npeaks in (1, 3):
+        tnew = best_time(partial(ts.find_peaks, npeaks=npeaks), repeat=1)
+        rows.append(['%s peak(s)' % npeaks, '%.3f' % told, '%.3f' % tnew,
+                     '%.1fx' % (told / tnew)])
+
+    print_table(['find', 'idxmax apply s', 'find_peaks s', 'speedup'], rows)
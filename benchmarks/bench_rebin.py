@@ -0,0 +1,66 @@
+""" Rebinning (skspec.core.utilities.rebin/boxcar, TimeSpectra.resample,
+skspec.core.binning) against the DataFrame.groupby versions they replaced,
+and pandas resample of the transposed frame.
+
+   python bench_rebin.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+import numpy as np
+from pandas import DataFrame
+
+import skspec.core.utilities as pvutils
+from benchutils import make_timespectra, best_time, print_table
+
+def _groupby_rebin(df, binwidth, axis, weighted=False):
+    """ Old rebin(avg_fcn='mean' or 'weighted')"""
+    out = df.groupby(lambda x: x // binwidth, axis=axis).mean()
+    if weighted:
+        out = out.apply(lambda x: x / x.max(), axis=axis)
+    return out
+
+def _groupby_boxcar(df, binwidth):
+    """ Old boxcar(axis=0)"""
+    binnumber = len(df.index) / binwidth
+    counts, binarray = np.histogram(df.index, bins=binnumber)
+    digiarray = np.digitize(np.asarray(df.index, dtype=float), binarray)
+    return df.groupby(digiarray, axis=0).mean()
+
+def _pandas_resample(df, dti, freq, how):
+    """ Spectra along the rows, then resample"""
+    out = DataFrame(df.values.T, index=dti).resample(freq, how=how)
+    return out.dropna(how='all').T
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    df = ts._frame
+    dti = ts.columns.datetimeindex
+    cases = [
+        ('rebin 10nm', partial(_groupby_rebin, df, 10.0, 0),
+         partial(pvutils.rebin, df, 10.0, axis=0, avg_fcn='mean')),
+        ('rebin 10nm weighted', partial(_groupby_rebin, df, 10.0, 0, True),
+         partial(pvutils.rebin, df, 10.0, axis=0, avg_fcn='weighted')),
+        ('boxcar 8 rows', partial(_groupby_boxcar, df, 8),
+         partial(pvutils.boxcar, df, 8, axis=0)),
+        ('resample 1min', partial(_pandas_resample, df, dti, '1min', 'mean'),
+         partial(ts.resample, '1min')),
+        ('resample 1min median', 
+         partial(_pandas_resample, df, dti, '1min', 'median'),
+         partial(ts.resample, '1min', how='median')),
+    ]
+
+    rows = []
+    for name, old, new in cases:
+        told = best_time(old, repeat=3)
+        tnew = best_time(new, repeat=3)
+        rows.append([name, '%.3f' % told, '%.3f' % tnew,
+                     '%.1fx' % (told / tnew)])
+
+    print_table(['operation', 'groupby s', 'reduceat s', 'speedup'], rows)
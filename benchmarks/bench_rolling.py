@@ -0,0 +1,55 @@
+""" TimeSpectra.rolling (skspec.core.rolling) against pandas rolling moments
+of the transposed frame, and the DataFrame.apply over windows it replaced.
+
+   python bench_rolling.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+import numpy as np
+from pandas import DataFrame
+from pandas.stats.moments import rolling_mean, rolling_var, rolling_max
+
+from benchutils import make_timespectra, best_time, print_table
+
+def _apply_rolling(df, window, fcn):
+    """ Old way: fcn over each trailing window of columns"""
+    return df.apply(lambda row: DataFrame(
+        [fcn(row.values[max(0, i-window+1):i+1]) for i in range(len(row))]
+        ).iloc[:, 0], axis=1)
+
+def _pandas_rolling(df, window, fcn):
+    """ Spectra along the rows, then pandas rolling moments"""
+    return fcn(DataFrame(df.values.T), window).T
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+    print 'TimeSpectra %s x %s\n' % (nspec, ntime)
+
+    ts = make_timespectra(nspec, ntime)
+    df = ts._frame
+
+    rows = []
+    small = df.iloc[:64]
+    told = best_time(partial(_apply_rolling, small, 50, np.mean), repeat=1)
+    tnew = best_time(lambda: ts.rolling(50).mean(), repeat=3)
+    told *= len(df.index) / float(len(small.index))
+    rows.append(['apply mean 50 (est.)', '%.3f' % told, '%.3f' % tnew,
+                 '%.1fx' % (told / tnew)])
+
+    for window in (50, 500):
+        for name, fcn in (('mean', rolling_mean), ('var', rolling_var),
+                          ('max', rolling_max)):
+            told = best_time(partial(_pandas_rolling, df, window, fcn),
+                             repeat=3)
+            tnew = best_time(getattr(ts.rolling(window), name), repeat=3)
+            rows.append(['%s %s' % (name, window), '%.3f' % told,
+                         '%.3f' % tnew, '%.1fx' % (told / tnew)])
+
+    tnew = best_time(ts.rolling('5min').max, repeat=3)
+    rows.append(['max 5min (irregular)', '', '%.3f' % tnew, ''])
+
+    print_table(['operation', 'old s', 'rolling s', 'speedup'], rows)
@@ -0,0 +1,45 @@
+""" Cost of slicing a TimeSpectra (wavelength windows, as in plots_1d and
+area_thirds_plot).  Slices are copy-on-write views, so the time and memory
+per slice should not depend on the size of the window; nearby lookups are
+binary searches, so neither on the length of the axis.  split_by makes
+views too, so splitting for parallel work should cost no memory.
+
+   python bench_slicing.py [nspec] [ntime]
+"""
+
+import sys
+from functools import partial
+
+from benchutils import make_timespectra, peak_memory, best_time, print_table
+
+OPERATIONS = [
+    ('ts.iloc[100:1100]', lambda ts: ts.iloc[100:1100]),
+    ('ts.loc[500.0:700.0]', lambda ts: ts.loc[500.0:700.0]),
+    ('ts.nearby[500:700]', lambda ts: ts.nearby[500:700]),
+    ('ts.iloc[:, :1000]', lambda ts: ts.iloc[:, :1000]),
+    ('20 x nearby windows', lambda ts: [ts.nearby[400+10*i:450+10*i] 
+                                        for i in range(20)]),
+    ('ts.nearby[[450, 520, 610]]', lambda ts: ts.nearby[[450, 520, 610]]),
+    ('ts.nearby[:, t0:t1]', lambda ts: ts.nearby[:, ts.columns[10]:
+                                                    ts.columns[-10]]),
+    ('ts.split_by(16)', lambda ts: ts.split_by(16)),
+    ('ts.split_by(16, axis=0)', lambda ts: ts.split_by(16, axis=0)),
+    ("ts.split_by('10min')", lambda ts: ts.split_by('10min')),
+]
+
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+
+    framesize = nspec * ntime * 8 / 1024.0**2
+    print 'TimeSpectra %s x %s (%.1f MB frame)\n' % (nspec, ntime, framesize)
+
+    ts = make_timespectra(nspec, ntime)
+    rows = []
+    for name, op in OPERATIONS:
+        mb, _ = peak_memory(partial(make_timespectra, nspec, ntime), op)
+        rows.append([name, '%.1f' % mb, '%.5f' % best_time(partial(op, ts))])
+
+    print_table(['operation', 'peak MB', 'best s'], rows)
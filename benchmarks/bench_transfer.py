@@ -0,0 +1,55 @@
+""" Peak memory per operation for MetaPandasObject._transfer().
+
+Compares the metadata-only transfer against the old behavior of deep
+copying the whole object (frame, reference and baseline) and throwing the
+copied frame away.
+
+   python bench_transfer.py [nspec] [ntime]
+"""
+
+import sys
+import copy
+from functools import partial
+
+from skspec.pandas_utils.metadframe import MetaPandasObject
+from benchutils import make_timespectra, peak_memory, print_table
+
+def _deepcopy_transfer(self, dfnew):
+    """ _transfer() as it used to be """
+    newobj = copy.deepcopy(self)
+    newobj._frame = dfnew
+    return newobj
+
+
+OPERATIONS = [
+    ('ts * 2', lambda ts: ts * 2),
+    ('ts - 1', lambda ts: ts - 1),
+    ('ts.iloc[:, :100]', lambda ts: ts.iloc[:, :100]),
+    ('ts.nearby[500:600]', lambda ts: ts.nearby[500:600]),
+    ('ts.rank()', lambda ts: ts.rank()),
+]
+
+
+def _setup(nspec, ntime, legacy=False):
+    if legacy:
+        MetaPandasObject._transfer = _deepcopy_transfer
+    return make_timespectra(nspec, ntime)
+
+
+if __name__ == '__main__':
+    nspec, ntime = 2048, 5000
+    if len(sys.argv) > 2:
+        nspec, ntime = int(sys.argv[1]), int(sys.argv[2])
+
+    framesize = nspec * ntime * 8 / 1024.0**2
+    print 'TimeSpectra %s x %s (%.1f MB frame)\n' % (nspec, ntime, framesize)
+
+    rows = []
+    for name, op in OPERATIONS:
+        legacy, tl = peak_memory(partial(_setup, nspec, ntime, True), op)
+        new, tn = peak_memory(partial(_setup, nspec, ntime, False), op)
+        rows.append([name, '%.1f' % legacy, '%.1f' % new,
+                     '%.3f' % tl, '%.3f' % tn])
+
+    print_table(['operation', 'deepcopy MB', 'transfer MB',
+                 'deepcopy s', 'transfer s'], rows)
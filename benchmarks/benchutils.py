@@ -0,0 +1,129 @@
+""" Shared helpers for the scripts in this directory.  Each benchmark is a
+plain script (python bench_xxx.py) that prints a small table; nothing here is
+imported by skspec itself.
+"""
+
+import sys
+import time
+import resource
+import threading
+from multiprocessing import Process, Queue
+
+import numpy as np
+from pandas import date_range
+
+from skspec import TimeSpectra
+from skspec.core.specindex import SpecIndex
+
+MB = 1024.0 # ru_maxrss is in kilobytes on linux
+
+
+def make_timespectra(nspec=2048, ntime=5000, seed=0):
+    """ Synthetic TimeSpectra of shape (nspec, ntime) with a reference and
+    a baseline, roughly like an Ocean Optics run."""
+    rs = np.random.RandomState(seed)
+    index = SpecIndex(np.linspace(350.0, 1000.0, nspec), unit='nm')
+    columns = date_range(start='1/1/14', periods=ntime, freq='s')
+    data = 1000.0 + 50.0 * rs.rand(nspec, ntime)
+    ts = TimeSpectra(data, index=index, columns=columns, varunit='dti',
+                     reference=0, name='bench')
+    ts.baseline = 10.0 * rs.rand(nspec)
+    return ts
+
+
+def _rss_anon():
+    """ Resident anonymous memory (kB), ie not counting mapped file pages."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1])
+    raise OSError('RssAnon not in /proc/self/status')
+
+
+class _AnonSampler(threading.Thread):
+    """ Polls _rss_anon() until stopped; there is no high-water mark."""
+    def __init__(self, interval=0.001):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.interval = interval
+        self.peak = _rss_anon()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, _rss_anon())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, _rss_anon())
+        return self.peak
+
+
+def _child(queue, setup, operation, anon):
+    try:
+        obj = setup()
+        if anon:
+            before = _rss_anon()
+            sampler = _AnonSampler()
+            sampler.start()
+        else:
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        t0 = time.time()
+        out = operation(obj)
+        elapsed = time.time() - t0
+        if anon:
+            after = sampler.stop()
+        else:
+            after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception as E:
+        queue.put(E)
+    else:
+        queue.put(((after - before) / MB, elapsed))
+
+
+def peak_memory(setup, operation, anon=False):
+    """ Run setup() then operation(setup_output) in a fresh process.  Returns
+    (peak memory increase in MB, wall time in s) of operation alone.  A new
+    process is used because ru_maxrss can't be reset.  The increase is over
+    the high-water mark left by setup(), so memory freed during setup can
+    be reused by the operation; compare numbers relative to each other.
+
+    If anon, only anonymous memory is counted (linux), sampled every ms
+    from another thread: pages of memory mapped files, which the kernel can
+    drop at will, are left out."""
+    queue = Queue()
+    proc = Process(target=_child, args=(queue, setup, operation, anon))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    if isinstance(out, Exception):
+        raise out
+    return out
+
+
+def best_time(fcn, repeat=5, number=1):
+    """ Best-of-repeat wall time for number calls of fcn(), per call."""
+    best = None
+    for i in range(repeat):
+        t0 = time.time()
+        for j in range(number):
+            fcn()
+        elapsed = (time.time() - t0) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def print_table(header, rows):
+    """ Left-aligned plain text table."""
+    rows = [[str(x) for x in row] for row in rows]
+    widths = [max(len(str(h)), *[len(r[i]) for r in rows])
+              for i, h in enumerate(header)]
+    fmt = '  '.join('%%-%ss' % w for w in widths)
+    print fmt % tuple(header)
+    print '  '.join('-' * w for w in widths)
+    for row in rows:
+        print fmt % tuple(row)
+    sys.stdout.flush()
@@ -94,7 +94,7 @@ def get_headermetadata_dataframe(dataframe, time_file_dict, name=''):
 ### Below are the 2 main functions to extract the data ###
 ##########################################################
 
-def from_spec_files(file_list, name='', skiphead=17, skipfoot=1, check_for_overlapping_time=True, extract_dark=True):
+def from_spec_files(file_list, name='', skiphead=17, skipfoot=1, check_for_overlapping_time=True, extract_dark=True, dtype=None):
     ''' Takes in raw files directly from Ocean optics USB2000 and USB650 spectrometers and returns a
     skspec TimeSpectra. If spectral data stored without header, can be called with skiphead=0.
 
@@ -109,6 +109,8 @@ def from_spec_files(file_list, name='', skiphead=17, skipfoot=1, check_for_overl
                      not found, will print warning.  If multiple darks found, will raise error.
       
        skiphead/skipfoot: Mostly for reminder that this filetype has a 17 line header and a 1 line footer.
+
+       dtype: Storage dtype of the TimeSpectra (eg 'float32').  Defaults to skspec.config.DTYPE.
        
     Notes
     -----
@@ -176,7 +178,7 @@ def from_spec_files(file_list, name='', skiphead=17, skipfoot=1, check_for_overl
         f.close()
 
     ### Make timespec, add filenames, baseline and metadata attributes (note, DateTimeIndex auto sorts!!)
-    timespec=TimeSpectra(DataFrame(dict_of_series), name=name) #Dataframe beacuse TS doesn't handle dict of series
+    timespec=TimeSpectra(DataFrame(dict_of_series), name=name, dtype=dtype) #Dataframe beacuse TS doesn't handle dict of series
     timespec.specunit='nm'
     timespec.filedict=time_file_dict
     timespec.baseline=baseline  #KEEP THIS AS DARK SERIES RECALL IT IS SEPARATE FROM reference OR REFERENCE..  
@@ -226,12 +228,13 @@ def _get_metadata_fromheader(specsuiteheader):
 ######### Get dataframe from timefile / datafile #####
 # Authors Zhaowen Liu/Adam Hughes, 10/15/12
 
-def from_timefile_datafile(datafile, timefile, extract_dark=True, name=''): 
+def from_timefile_datafile(datafile, timefile, extract_dark=True, name='', dtype=None): 
     ''' Converts old-style spectral data from GWU phys lab into  
     a dataframe with timestamp column index and wavelength row indicies.
 
     Creates the DataFrame from a dictionary of Series, keyed by datetime.
-    **name becomes name of dataframe''' 
+    **name becomes name of dataframe
+    **dtype is the storage dtype (default skspec.config.DTYPE)''' 
 
     tlines=open(timefile,'r').readlines()
     tlines=[line.strip().split() for line in tlines]           
@@ -267,7 +270,7 @@ def from_timefile_datafile(datafile, timefile, extract_dark=True, name=''):
     else:
         baseline=None
 
-    dataframe=TimeSpectra(data, columns=sorted_times, index=wavelengths)      
+    dataframe=TimeSpectra(data, columns=sorted_times, index=wavelengths, dtype=dtype)      
     
 
     ### Add field attributes to dataframe
@@ -296,7 +299,7 @@ def from_timefile_datafile(datafile, timefile, extract_dark=True, name=''):
 
     return dataframe
 
-def from_gwu_chem_UVVIS(filelist, sortnames=False, shortname=True, cut_extension=False, name=''):
+def from_gwu_chem_UVVIS(filelist, sortnames=False, shortname=True, cut_extension=False, name='', dtype=None):
     ''' Format for comma delimited two column data from GWU chemistry's UVVis.  These have no useful metadata
     or dark data and so it is important that users either pass in a correctly sorted filelist.  Once the 
     dataframe is created, on can do df=df.reindex(columns=[correct order]).  
@@ -308,7 +311,9 @@ def from_gwu_chem_UVVIS(filelist, sortnames=False, shortname=True, cut_extension
                   directly used as columns.
        shortname- If false, full file path is used as the column name.  If true, only the filename is used. 
        
-       cut_extension- If using the shortname, this will determine if the file extension is saved or cut from the data.'''
+       cut_extension- If using the shortname, this will determine if the file extension is saved or cut from the data.
+       
+       dtype- Storage dtype of the TimeSpectra (default skspec.config.DTYPE).'''
 
     if shortname:
         fget=lambda x:get_shortname(x, cut_extension=cut_extension)
@@ -329,7 +334,7 @@ def from_gwu_chem_UVVIS(filelist, sortnames=False, shortname=True, cut_extension
     if sortnames:
         dataframe=dataframe.reindex(columns=sorted(working_names))
 
-    dataframe=TimeSpectra(dataframe) #this is fine
+    dataframe=TimeSpectra(dataframe, dtype=dtype) #this is fine
 
     dataframe.metadata=None
     dataframe.filedict=None
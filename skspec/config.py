@@ -38,3 +38,24 @@ HEADERHTMLDELIM = '&nbsp;' * 8
 # Default specifier to Spectrum
 SPECIFIERDEF = 'values' 
 MISSING = '??' #When unit info is missing, header/plotting will refer to this
+
+# Default byte budget of Spectra.enable_repcache() (as_norm etc... outputs)
+REPCACHE_BYTES = 256 * 1024**2
+
+# Storage dtype of Spectra data (eg 'float32' for spectrometer counts). 
+# None keeps whatever pandas infers (usually float64).  Per object, pass
+# Spectra(..., dtype=...).
+DTYPE = None
+
+# Directory of the temporary files that hold full size outputs of memory 
+# mapped Spectra (see Spectra.from_memmap).  None uses the system default.
+MEMMAP_TMPDIR = None
+
+# Default number of columns per chunk in chunked reductions (Spectra.chunks)
+CHUNKCOLUMNS = 5000
+
+# Tiled 2D correlation (correlation.corr.tiled_correlation): bytes of 
+# working memory for the tiles being computed (all threads together), and 
+# the number of threads (None: one per CPU).
+CORRTILE_BYTES = 64 * 1024**2
+CORRTHREADS = None
@@ -1,4 +1,4 @@
-from pandas import Float64Index, Index
+from pandas import Float64Index, Index, DatetimeIndex, Timestamp
 import numpy as np
 from skspec.units.abcunits import UnitError, Unit, ConversionUnit
 
@@ -22,6 +22,94 @@ def _parse_conversion_unit(unit, unitdict):
    return unitdict[unit]  
 
 
+# Nearest Value Search
+# --------------------
+def searchable(index):
+   """ Numeric values of an index (or array) to search: a view of floats,
+   or for datetimes (DatetimeIndex, or a TimeIndex storing one), int64
+   nanoseconds."""
+   if isinstance(index, DatetimeIndex):
+      return index.asi8
+   dti = getattr(index, '_stored_dti', None)
+   if dti is not None and getattr(index, 'dtype', None) == object:
+      return dti.asi8
+   return np.asarray(index)
+
+
+def _as_searchable(index, keys):
+   """ keys in the units of searchable(index)."""
+   if searchable(index).dtype.kind != 'i' or index.dtype.kind == 'i':
+      return np.asarray(keys)
+   if np.isscalar(keys) or not hasattr(keys, '__iter__'):
+      return Timestamp(keys).value
+   return np.array([Timestamp(k).value for k in keys])
+
+
+def monotonic(values):
+   """ 1 if values ascend, -1 if they descend (ties allowed), else 0."""
+   values = np.asarray(values)
+   if len(values) < 2:
+      return 1
+   step = np.diff(values)
+   if (step >= 0).all():
+      return 1
+   if (step <= 0).all():
+      return -1
+   return 0
+
+
+def index_order(index):
+   """ monotonic() of an index; cached on skspec indices (see 
+   ConversionIndex.monotonic)."""
+   order = getattr(index, 'monotonic', None)
+   if order is None:
+      order = monotonic(searchable(index))
+   return order
+
+
+def index_bounds(index):
+   """ (min, max) of an index, as searchable() values; O(1) if sorted."""
+   values = searchable(index)
+   order = index_order(index)
+   if order == 1:
+      return values[0], values[-1]
+   if order == -1:
+      return values[-1], values[0]
+   return values.min(), values.max()
+
+
+def nearest(index, keys):
+   """ Positions in index (or array) of the values closest to keys (a
+   scalar, or an array of them, resolved at once).  Binary search if the 
+   index is sorted, ascending or descending; else a linear scan per key. 
+   Ties go to the first position."""
+   values = searchable(index)
+   order = index_order(index)
+   keys = _as_searchable(index, keys)
+   scalar = np.ndim(keys) == 0
+   keys = np.atleast_1d(keys)
+
+   if not order or len(values) < 2:
+      pos = np.array([np.abs(values - k).argmin() for k in keys], dtype=int)
+   else:
+      if order == -1:
+         values = values[::-1]
+      right = np.clip(np.searchsorted(values, keys), 1, len(values) - 1)
+      left = right - 1
+      # As float, so int64 ns don't overflow in the difference
+      lower = np.abs(keys.astype(float) - values[left].astype(float))
+      upper = np.abs(values[right].astype(float) - keys.astype(float))
+      pos = np.where(upper < lower, right, left)
+      if order == -1:
+         pos = len(values) - 1 - pos
+         # Ties go to the first position in the original order too
+         pos[upper == lower] -= 1
+
+   if scalar:
+      return pos[0]
+   return pos
+
+
 # Custom Index Classes
 # --------------------
 
@@ -100,6 +188,7 @@ class ConversionIndex(Index):
    unitdict = None 
    addnullunit = True
    _forcetype = None 
+   _monotonic = None
    
 
    def __new__(cls, input_array, unit=None):
@@ -187,6 +276,19 @@ class ConversionIndex(Index):
    def unit(self):
       return self._unit.short
 
+   def take(self, indexer, axis=0):
+      """ pandas' take() rebuilds the index without its unit (eg iloc with
+      a list of positions); indexing by position keeps it."""
+      return self[np.asarray(indexer, dtype=np.intp)]
+
+   @property
+   def monotonic(self):
+      """ 1 if ascending, -1 if descending, 0 if unsorted (see nearest()).
+      Computed once per index; indices aren't changed in place."""
+      if self._monotonic is None:
+         self._monotonic = monotonic(searchable(self))
+      return self._monotonic
+
    @property
    def unitshortdict(self):
       """ Return key:shortname; used by TimeSpectra to list output units."""
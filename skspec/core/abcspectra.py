@@ -1,10 +1,14 @@
 #Want C(abcspectra, metaframe)
 
-from pandas import Series, DataFrame
+from pandas import Series, DataFrame, MultiIndex
+from pandas.core.common import _is_bool_indexer
+from pandas.core.indexing import _is_list_like, _is_nested_tuple
 import skspec.core.utilities as pvutils
 import skspec.config as pvconfig
-from pandas.core.indexing import _LocIndexer
+from skspec.pandas_utils.metadframe import _MetaLocIndexer
 from skspec.units.abcunits import IUnit, Unit, UnitError
+from skspec.core.abcindex import nearest, index_bounds, index_order, \
+     _as_searchable
 import numpy as np
 
 # Exceptions
@@ -123,6 +127,9 @@ class ABCSpectra(object):
    # Indexer
    _nearby=None
 
+   # Indexers are bound to the instance; never transfer them (see _transfer)
+   _transientattrs = ('_ix', '_iloc', '_loc', '_cow', '_sharers', '_nearby')
+
    @property
    def nearby(self, *args, **kwargs):      	
       """ Slicers similiar to loc that allows for nearby value slicing.
@@ -168,7 +175,7 @@ class ABCSpectra(object):
 
 # Nearby Indexer 
 # --------------
-class _NearbyIndexer(_LocIndexer):
+class _NearbyIndexer(_MetaLocIndexer):
    """ Index by location, but looks for nearest values.  Warning: not all
    use cases may be handled properly; this is predominantly for range slices
    eg (df.nearby[50.0:62.4]), ie looking at a range of wavelengths.
@@ -198,28 +205,39 @@ class _NearbyIndexer(_LocIndexer):
       """
 
       labels = self.obj._get_axis(axis)
-      values = labels.values #Necessary for subtraciton in find_nearest
 
       def _nearest(v):
-         """ Find the neareast value in the Index (cast to array type);
-         necessary because diff (ie subtraction) is not defined on Index
-         in the way used here.
+         """ Position of the neareast value(s) in the Index.  Binary search
+         when the index is sorted (ascending or descending), which skspec
+         indices remember; see abcindex.nearest().
          """
-         vmin, vmax = min(values), max(values)
-         if v < vmin:
+         vmin, vmax = index_bounds(labels)
+         keys = _as_searchable(labels, v)
+         if np.min(keys) < vmin:
             raise SpecIndexError("%s is less than Index min value of %s" 
-                                 % (v, vmin))
-         elif v > vmax:
+                                 % (v, labels[nearest(labels, vmin)]))
+         elif np.max(keys) > vmax:
             raise SpecIndexError("%s is greater than Index max value of %s" 
-                                 % (v, vmax))
-         return values[(np.abs(values - v)).argmin()]
-
-      if isinstance(key, slice):
+                                 % (v, labels[nearest(labels, vmax)]))
+         return nearest(labels, keys)
+
+      # Sorted: slice by the positions found (same as by their labels)
+      if isinstance(key, slice) and index_order(labels):
+         start, stop = key.start, key.stop
+         if start is not None:
+            start = _nearest(start)
+         if stop is not None:
+            stop = _nearest(stop) + 1
+         indexer = [slice(None)] * self.ndim
+         indexer[axis] = slice(start, stop, key.step)
+         out = self.obj.iloc[tuple(indexer)]
+
+      elif isinstance(key, slice):
          start, stop, step = key.start, key.stop, key.step
-         if key.start:
-            start = _nearest(key.start)
-         if key.stop:
-            stop = _nearest(key.stop)
+         if key.start is not None:
+            start = labels[_nearest(key.start)]
+         if key.stop is not None:
+            stop = labels[_nearest(key.stop)]
          key = slice(start, stop, key.step)
          self._has_valid_type(key, axis)
          out = self._get_slice_axis(key, axis=axis)
@@ -244,13 +262,10 @@ class _NearbyIndexer(_LocIndexer):
             if hasattr(key, 'ndim') and key.ndim > 1:
                raise ValueError('Cannot index with multidimensional key')
 
-            if validate_iterable:
-               self._has_valid_type(key, axis)
-
-            # WILL OUTPUT WRONG INDEX STUFF LIKE TIMEINDEX
-            # NEED TO FIX
-            raise NotImplementedError("See GH #107")
-            out = self._getitem_iterable(key, axis=axis)
+            # All keys resolved at once, then taken by position
+            indexer = [slice(None)] * self.ndim
+            indexer[axis] = _nearest(key)
+            out = self.obj.iloc[tuple(indexer)]
 
          # nested tuple slicing
          if _is_nested_tuple(key, labels):
@@ -261,7 +276,7 @@ class _NearbyIndexer(_LocIndexer):
 
       # fall thru to straight lookup
       else:
-         key = _nearest(key)  
+         key = labels[_nearest(key)]
          self._has_valid_type(key, axis)
          out = self._get_label(key, axis=axis)      
 
@@ -8,89 +8,203 @@ __email__ = "hugadams@gwmail.gwu.edu"
 __status__ = "Development"
 
 import numpy as np
-from pandas import DataFrame, Series
+from pandas import DataFrame, DatetimeIndex
 import logging
 
+import skspec.core.memmap as pvmemmap
+import skspec.core.chunks as pvchunks
+from skspec.core.binning import axis_values, _datetimes
+from skspec.core.abcindex import nearest
+
 logger = logging.getLogger(__name__)
 
-        
-def _find_nearest(array, value):
-    '''Find nearest value in an array, return index and array value'''
-    idx=(np.abs(array-value)).argmin()
-    return idx, array[idx]      
+# Polynomial order of the named fitting styles; 'poly' takes order=
+STYLES = {'linear':1, 'quadratic':2, 'cubic':3}
+WEIGHTSTYLES = (None, 'mean', 'midpoint')
+
+
+def _fit_design(x, slices, weightstyle=None):
+    '''Rows of the data read by a fit through slices, and the (npoints x
+    nrows) matrix averaging them into fit points (None if every row is a
+    point).  x are the positions along the fitted axis.'''
+    rows, groups = [], []
+    for val in slices:
+        if np.isscalar(val):
+            val = (val,)
+
+        ### If slice is a single point, find its nearest actual entry
+        if len(val) == 1:
+            rows.append([nearest(x, val[0])])
+            groups.append(False)
+
+        ### If slice is range, take all index values in that region
+        elif len(val) == 2:
+            inside = np.flatnonzero((x >= min(val)) & (x <= max(val)))
+            if not len(inside):
+                raise ValueError('No index values between %s and %s' % tuple(val))
+
+            # One fit point per range: the one closest to its middle, or the mean
+            if weightstyle == 'midpoint':
+                middle = (val[0] + val[1]) / 2.0
+                inside = inside[[np.abs(x[inside] - middle).argmin()]]
+            rows.append(inside)
+            groups.append(weightstyle == 'mean')
+
+        else:
+            raise AttributeError('In reference correction, slices must 1 or 2 items;'
+                'received %s of len %s'%(val, len(val)))
+
+    if not any(groups):
+        return np.concatenate(rows), None
+
+    npoints = sum(1 if avg else len(r) for r, avg in zip(rows, groups))
+    average = np.zeros((npoints, sum(len(r) for r in rows)))
+    i = j = 0
+    for r, avg in zip(rows, groups):
+        if avg:
+            average[i, j:j+len(r)] = 1.0 / len(r)
+            i += 1
+        else:
+            average[i:i+len(r), j:j+len(r)] = np.eye(len(r))
+            i += len(r)
+        j += len(r)
+    return np.concatenate(rows), average
+
+
+def baseline_operator(x, slices, order=1, weightstyle=None):
+    '''Rows read by the fit and the (order + 1, len(rows)) matrix W such that the
+    polynomial coefficients of every column are np.dot(W, values[rows]); plus the
+    (len(x), order + 1) Vandermonde matrix V to evaluate them on all of x.
+
+    All the columns share x, so the least-squares problem is solved once (pinv of
+    the design matrix) rather than once per column.  x is centered and scaled to
+    [-1, 1] first, to keep high orders well conditioned.'''
+    x = np.asarray(x, dtype=float)
+    rows, average = _fit_design(x, slices, weightstyle)
+
+    span = (np.nanmax(x) - np.nanmin(x)) / 2.0 or 1.0
+    t = (x - (np.nanmax(x) + np.nanmin(x)) / 2.0) / span
+    tfit = t[rows] if average is None else np.dot(average, t[rows])
+    if len(tfit) <= order:
+        raise ValueError('A polynomial of order %s needs more than %s fit points'
+                         % (order, len(tfit)))
+
+    W = np.linalg.pinv(np.vander(tfit, order + 1))
+    if average is not None:
+        W = np.dot(W, average)
+    return rows, W, np.vander(t, order + 1)
+
 
-def dynamic_baseline(df, slices, style='linear', weightstyle=None, axis=1):
+def _as_axis(index, value):
+    '''Slice value in the units of axis_values(index).'''
+    if _datetimes(index) is not None:
+        return DatetimeIndex([value]).asi8[0]
+    return value
+
+
+def dynamic_baseline(df, slices, style='linear', weightstyle=None, axis=1, order=None,
+                     inplace=False, columns=None):
     '''Applies a dynamically calculated reference correction to a dataframe.  User passes in index values, either ranges
-    or points, then a linear fit is applied through these points.  Each column in the dataframe is scaled its corresponding
+    or points, then a polynomial fit is applied through these points.  Each column in the dataframe is scaled its corresponding
     curve, which is then subracted off.  Essentially, this subracts a reference that can be lopsided- useful for assymetric data, and
     is usually how crude ATR-IR reference correction is performed.  
     
-    For now, program only works for index values as the reference.
+    Every column is fit through the same points, so the fits share one design matrix: it is solved once (least squares), and
+    all the columns are fit with a matrix product.
     
-    df- DataFrame.
+    df- DataFrame (or Spectra).
     
     slice- List of points or ranges at which the reference data is sampled.  For example, 
            ( (300.0, 500.0), 900.0 ).  Curve will take all index values of the dataframe between
            300.0:500.0 (nanometers in my case), and also take the closest index value there is to 900.0. 
            A fit is then drawn between these points.
            
-    style- Fitting style to connect the dots between slice regions.  For now, only linear fit is used.  Not sure if higher order
-           will ever be useful, so I left this in here as a reminder.
+    style- Fitting style to connect the dots between slice regions: 'linear', 'quadratic', 'cubic' or 'poly' (of order).
+    
+    order- Polynomial order; overrides style.
            
-    axis-  Axis overwhich to do this reference correction.  For now, ONLY INDEX IS IMPLEMENTED.
+    axis-  Axis overwhich to do this reference correction.  1 (default) fits every column along the index; 0 fits
+           every row along the columns (slices are then in units of the columns).
     
     weightstyle- Tries to account for idea that if I pass slices, and one slice contains more points, then the line of best fit will be weighted
-                 more strongly to this region.  For now, I haven't implemented this, but would have to actually use poly1d to call more points to the
-                 other regions, or some other solution?  This does have an option, mean, which will take the mean if each range so that each range gets 
-                 a single fit point; however, I think this is useless as this can be passed in anyway.  And it's the mean of the x-values, not even the 
-                 mean of the data along that axis anyway.
+                 more strongly to this region.  None uses every point of a range; 'mean' averages each range into a single fit point
+                 (mean position and value) and 'midpoint' uses the point closest to the middle of each range, so that each range gets 
+                 a single fit point.
+                 
+    inplace- If True, the baselines are subtracted from df in place and None is returned.
+    
+    columns- Fit columns (rows for axis=0) columns at a time, bounding the temporary arrays.  Default is all at once, unless df
+             is memory mapped (then config.CHUNKCOLUMNS).
                  
     returns-
        DataFrame of fitted references.'''
         
     ### Test for proper input ###
-    if style != 'linear' or axis != 1:
-        raise NotImplementedError('reference correction only support linear fitting style and index axis iteration only.')
-    
-    if weightstyle:
-        if weightstyle != 'midpoint':
-            raise NotImplemented('weightstyle attribute in reference_correction must be either None or "midpoint" but %s was entered'%weightstyle)
-
-    xp=[] #xpoints
+    if order is None:
+        if style not in STYLES:
+            raise NotImplementedError('reference correction style must be one of %s, or "poly" with order; got %s'
+                                      % (', '.join(sorted(STYLES)), style))
+        order = STYLES[style]
     
-    logger.info('Applying dynamic baseline (style=%s)' % style)
+    if weightstyle not in WEIGHTSTYLES:
+        raise NotImplementedError('weightstyle attribute in reference correction must be None, "mean" or "midpoint" but %s was entered'%weightstyle)
     
-    for val in slices:
-        ### If slice is a single point, find its nearest actual entry in df.index
-        if len(val) == 1:
-            xp.append(_find_nearest(df.index, val)[1])
-        
-        ### If slice is range, take all index values in that region
-        elif len(val) == 2:
-            xvals=np.asarray(df.ix[ val[0]: val[1] ].index)
+    if axis not in (0, 1):
+        raise NotImplementedError('reference correction axis must be 0 or 1, got %s' % axis)
 
-            if weightstyle =='mean':
-                xp.append(np.mean(xvals))
+    logger.info('Applying dynamic baseline (style=%s, order=%s)' % (style, order))
 
-            else:
-                xp=xp+list(xvals) #List necessary to get npdtype straight..
-            
-            
+    frame = getattr(df, '_frame', df)
+    fitaxis = frame.index if axis == 1 else frame.columns
+    slices = [[_as_axis(fitaxis, v) for v in (val if not np.isscalar(val) else (val,))] 
+              for val in slices]
+    rows, W, V = baseline_operator(axis_values(fitaxis), slices, order, weightstyle)
+
+    if inplace:
+        if hasattr(df, '_cow_gate'):
+            df._cow_gate()
+            frame = df._frame
+        values = frame.values
+        writeable = (len(frame._data.blocks) == 1 and values.dtype.kind == 'f' and 
+                     values.flags.writeable and 
+                     np.may_share_memory(values, frame._data.blocks[0].values))
+        out = values if writeable else pvmemmap.empty_values(frame, np.float64)
+    else:
+        values = frame.values
+        dtype = values.dtype if values.dtype.kind == 'f' else np.float64
+        out = pvmemmap.empty_values(frame, dtype)
+
+    ### Fit blocks of columns (rows for axis=0) at once
+    data, target = (values, out) if axis == 1 else (values.T, out.T)
+    ncols = data.shape[1]
+    if columns is None and pvmemmap.memmap_base(frame) is None:
+        step = max(1, ncols)
+    else:
+        step = pvchunks.chunk_size(columns)
+
+    # Baselines laid out like the data (frames are usually column major)
+    colmajor = data.strides[0] < data.strides[1]
+    for start in range(0, ncols, step):
+        cols = slice(start, start + step)
+        coefs = np.dot(W, data[rows, cols])
+        if colmajor:
+            base = np.dot(coefs.T, V.T).T
         else:
-            raise AttributeError('In reference correction, slices must 1 or 2 items;'
-                'received %s of len %s'%(val, len(val)))
-    
-    ### Apply 1-d connect the dots curvefit to each column, then subtract this from said column
-    ### Still vectorized, despite loop.  Loop is necessary; too much to use df.apply.
-    bout={}                      
-    for col in df.columns:
-        curve=df[col] #Series at this point
-        z=np.polyfit(xp, curve[xp], 1)  
-        p=np.poly1d(z)        
-        array=p(np.asarray(list(curve.index) ) )   
-        reference=Series(array, name=col, index=curve.index) #curve.index instead of df.index                            
-        bout[col]=reference #incase index is getting recast for nans or some behavior I may not be aware of
-    
-    bout=DataFrame(bout)
-    bout.reindex(columns=df.columns) #Columns are automatically if they are datetimes
-    return bout        
\ No newline at end of file
+            base = np.dot(V, coefs)
+        if not inplace:
+            target[:, cols] = base
+        elif target is data:
+            target[:, cols] -= base
+        else:
+            target[:, cols] = data[:, cols] - base
+
+    if inplace:
+        if out is not values:
+            newframe = DataFrame(out, index=frame.index, columns=frame.columns, copy=False)
+            if hasattr(df, '_frame'):
+                df._frame = newframe
+            else:
+                df.iloc[:, :] = out
+        return None
+
+    return DataFrame(out, index=frame.index, columns=frame.columns, copy=False)
@@ -0,0 +1,328 @@
+''' Rebinning of Series/DataFrames (and Spectra) along either axis; used by
+utilities.boxcar, rebin and digitize_by, and TimeSpectra.resample.
+
+Instead of a pandas groupby (with a Python key function per label), every
+position along the axis gets an integer bin code, positions of a bin are
+made contiguous (free if the axis is sorted, either way; else one stable
+argsort) and the bins are summed with np.add.reduceat over the whole
+array (or, across the contiguous axis, one block sum per bin).  Means skip
+NaNs, like pandas.
+
+Bins are given by sorted edges of any spacing; like np.histogram, each bin
+holds [left, right) except the last, [left, right].  Results are labeled
+by bin centers, in an index of the same type and unit as the binned axis
+(datetime axes, eg a TimeSpectra in 'dti', are binned in nanoseconds and
+labeled with datetimes).  Empty bins are dropped.
+
+resample() bins a time axis into fixed intervals (eg '10s'), with bin codes
+from integer division of the int64 nanoseconds of its datetimes, so
+irregular timestamps are binned exactly.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import warnings
+from datetime import timedelta
+
+import numpy as np
+from pandas import DataFrame, Series, DatetimeIndex, Index
+from pandas.tseries.frequencies import to_offset
+
+from skspec.core.abcindex import ConversionIndex, CustomIndex
+
+HOW = ('mean', 'sum', 'median', 'weighted')
+
+
+def _datetimes(index):
+    ''' DatetimeIndex of a datetime axis, or None.'''
+    if isinstance(index, DatetimeIndex):
+        return index
+    dti = getattr(index, '_stored_dti', None)
+    if dti is not None and index.dtype == object:
+        return dti
+    return None
+
+
+def axis_values(index):
+    ''' Float values of an axis to bin (datetimes in ns since the epoch).'''
+    dti = _datetimes(index)
+    if dti is not None:
+        return dti.asi8.astype(float)
+    return np.asarray(index, dtype=float)
+
+
+def axis_like(index, values):
+    ''' Index of values (in the units of axis_values(index)) of the same
+    type and unit as index.'''
+    unit = getattr(index, '_unit', None)
+    if isinstance(index, ConversionIndex) and unit is not None:
+        unit = unit.short
+    if _datetimes(index) is not None:
+        dti = DatetimeIndex(np.round(values).astype('i8'))
+        if isinstance(index, DatetimeIndex):
+            return dti
+        return type(index)(dti, unit=unit)
+    if isinstance(index, (ConversionIndex, CustomIndex)):
+        return type(index)(values, unit=unit)
+    return Index(values)
+
+
+def _along(arr, ndim, axis):
+    ''' 1-d arr (one entry per bin) shaped to broadcast along axis.'''
+    if ndim == 1 or axis == 1:
+        return arr
+    return arr[:, None]
+
+
+def _sum_runs(values, starts, axis):
+    ''' np.add.reduceat(values, starts, axis).  reduceat is only fast along
+    the contiguous axis; along the other, each run is summed as a block of
+    whole rows (columns) instead.'''
+    strides = values.strides
+    if values.ndim == 1 or strides[axis] <= strides[1 - axis]:
+        return np.add.reduceat(values, starts, axis=axis)
+
+    shape = list(values.shape)
+    shape[axis] = len(starts)
+    out = np.empty(shape, dtype=np.add.reduce(values[:1], axis=axis).dtype)
+    stops = np.concatenate((starts[1:], [values.shape[axis]]))
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        if axis == 0:
+            np.add.reduce(values[start:stop], axis=0, out=out[i])
+        else:
+            np.add.reduce(values[:, start:stop], axis=1, out=out[:, i])
+    return out
+
+
+def _median_runs(values, starts, axis):
+    ''' Median (NaNs skipped) of each run of positions along axis; one block
+    per run.'''
+    stops = np.concatenate((starts[1:], [values.shape[axis]]))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All NaN runs
+        if axis == 0:
+            return np.array([np.nanmedian(values[start:stop], axis=0)
+                             for start, stop in zip(starts, stops)])
+        return np.column_stack([np.nanmedian(values[:, start:stop], axis=1)
+                                for start, stop in zip(starts, stops)])
+
+
+def reduce_groups(values, codes, axis=0, how='mean', weight_max=None):
+    ''' Reduce values (1 or 2-d) along axis over the groups of equal codes
+    (integers, one per position along axis).
+
+    Returns the sorted distinct codes and the reduced array (one entry per
+    code along axis).  how is 'mean', 'sum', 'median' or 'weighted' (the
+    mean divided by weight_max, or else by the maximum along axis).'''
+    if how not in HOW:
+        raise NotImplementedError('%s is not a valid rebinning, must be %s'
+                                  % (how, ', '.join(HOW)))
+    values = np.asarray(values)
+    codes = np.asarray(codes)
+    if values.ndim == 1:
+        axis = 0
+    if len(codes) != values.shape[axis]:
+        raise ValueError('Got %s bin codes for %s positions along axis %s'
+                         % (len(codes), values.shape[axis], axis))
+
+    # Make the groups contiguous (views if codes are monotonic)
+    step = np.diff(codes)
+    if (step < 0).any():
+        if (step <= 0).all():
+            order = slice(None, None, -1)
+            values = values[order] if axis == 0 else values[:, order]
+        else:
+            order = np.argsort(codes, kind='mergesort')
+            values = values.take(order, axis=axis)
+        codes = codes[order]
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    groups = codes[starts]
+
+    if how == 'median':
+        return groups, _median_runs(values, starts, axis)
+
+    # NaNs show up in the sums; only then redo them without
+    total = _sum_runs(values, starts, axis)
+    if total.dtype.kind == 'f' and np.isnan(total).any():
+        nulls = np.isnan(values)
+        total = _sum_runs(np.where(nulls, 0, values), starts, axis)
+        counts = _sum_runs((~nulls).astype(np.intp), starts, axis)
+    else:
+        counts = np.diff(np.concatenate((starts, [len(codes)])))
+        counts = _along(counts, values.ndim, axis)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if how == 'sum':
+            out = np.where(counts > 0, total, np.nan)
+        else:
+            out = total / counts
+
+        if how == 'weighted':
+            if weight_max is not None:
+                weight = weight_max
+                if np.ndim(weight_max):
+                    weight = _along(np.asarray(weight_max), out.ndim, axis)
+                out /= weight
+            elif out.ndim == 1:
+                out /= np.nanmax(out)
+            else:
+                out /= np.nanmax(out, axis=axis, keepdims=True)
+
+    return groups, out
+
+
+def _wrap(obj, out, axis, labels):
+    ''' out as obj's (pandas) type, with labels along axis.'''
+    if out.ndim == 1:
+        return Series(out, index=labels, name=obj.name)
+    if axis == 0:
+        return DataFrame(out, index=labels, columns=obj.columns)
+    return DataFrame(out, index=obj.index, columns=labels)
+
+
+def rebin_values(obj, x, edges, axis=0, how='mean', weight_max=None):
+    ''' rebin() with x, the (float) positions along axis, and edges in the
+    same units.'''
+    obj = getattr(obj, '_frame', obj)
+    if obj.ndim == 1:
+        axis = 0
+    edges = np.asarray(edges, dtype=float)
+    if edges.ndim != 1 or len(edges) < 2 or (np.diff(edges) <= 0).any():
+        raise ValueError('Bin edges must be an increasing sequence of at '
+                         'least 2 values')
+
+    nbins = len(edges) - 1
+    codes = np.searchsorted(edges, x, side='right') - 1
+    codes[x == edges[-1]] = nbins - 1
+    codes[codes >= nbins] = -1
+
+    # Values outside of the edges are dropped first, so they don't count in
+    # the maximum of 'weighted'
+    values = obj.values
+    inside = codes >= 0
+    if not inside.all():
+        values = values.compress(inside, axis=axis)
+        codes = codes[inside]
+    if len(codes):
+        groups, out = reduce_groups(values, codes, axis, how, weight_max)
+    else:
+        groups, out = codes, values
+
+    centers = (edges[groups] + edges[groups + 1]) / 2.0
+    return _wrap(obj, out, axis, axis_like(obj.axes[axis], centers))
+
+
+def rebin(obj, edges, axis=0, how='mean', weight_max=None):
+    ''' Bin obj (Series, DataFrame or Spectra) along axis into the bins
+    between consecutive edges (see module docstring).
+
+    Parameters:
+    -----------
+    edges: increasing bin edges, in the units of the axis (datetimes for a
+       datetime axis).
+    how: 'mean', 'sum', 'median' or 'weighted' (see reduce_groups).
+    '''
+    frame = getattr(obj, '_frame', obj)
+    index = frame.axes[axis if frame.ndim > 1 else 0]
+    if _datetimes(index) is not None:
+        edges = DatetimeIndex(edges).asi8
+    return rebin_values(obj, axis_values(index), edges, axis, how, weight_max)
+
+
+def uniform_edges(index, nbins):
+    ''' nbins + 1 edges spanning index evenly (np.histogram's), in the units
+    of axis_values(index).'''
+    x = axis_values(index)
+    return np.histogram([], bins=int(nbins),
+                        range=(np.nanmin(x), np.nanmax(x)))[1]
+
+
+def group(obj, codes, axis=0, how='mean', weight_max=None, labels=None):
+    ''' Reduce obj along axis over the groups of equal codes (see
+    reduce_groups); labeled by labels if there's one per group, else by the
+    codes.'''
+    obj = getattr(obj, '_frame', obj)
+    if obj.ndim == 1:
+        axis = 0
+    groups, out = reduce_groups(obj.values, codes, axis, how, weight_max)
+    if labels is None or len(labels) != len(groups):
+        labels = groups
+    return _wrap(obj, out, axis, Index(labels))
+
+
+def is_frequency(freq):
+    ''' True if freq is a time duration ('10s', a DateOffset or a
+    timedelta) rather than a plain number.'''
+    return isinstance(freq, (basestring, timedelta, np.timedelta64)) or \
+           hasattr(freq, 'nanos')
+
+
+def _nanos(freq):
+    ''' Length in ns of a fixed frequency ('10s', '1min', a DateOffset such
+    as Minute(5), or a timedelta).'''
+    if isinstance(freq, (timedelta, np.timedelta64)):
+        return int(np.timedelta64(freq).astype('m8[ns]').astype('i8'))
+    try:
+        return int(to_offset(freq).nanos)
+    except (AttributeError, ValueError):
+        raise ValueError('Can only resample to a fixed frequency (eg "10s", '
+                         '"1min"), got %s' % freq)
+
+
+def _unit_nanos(index):
+    ''' Length in ns of one unit of an interval time axis (eg 1e9 for 's').'''
+    unit = getattr(getattr(index, '_unit', None), 'short', None)
+    if not isinstance(index, ConversionIndex) or \
+       unit in (None, 'dti', 'intvl'):
+        raise ValueError('Resampling to a frequency needs a time axis with '
+                         'datetimes or a time unit (eg "s"), got %s' % unit)
+    return float(np.round(type(index)([1.0], unit=unit).convert('ns')[0]))
+
+
+def resample(obj, freq, axis=1, how='mean', label='left'):
+    ''' Bin obj along a time axis into consecutive intervals of length freq,
+    [left, right), aligned on multiples of freq (from the epoch for datetimes,
+    like pandas resample).  Empty intervals are dropped.
+
+    Parameters:
+    -----------
+    freq: a fixed frequency (eg '10s', '1min', or a timedelta), or a width 
+       in the units of an interval axis (eg seconds).  On an interval axis,
+       a frequency is converted to the axis' unit.
+    how: 'mean', 'sum', 'median' or 'weighted' (see reduce_groups).
+    label: label bins by their 'left' or 'right' edge.
+    '''
+    if label not in ('left', 'right'):
+        raise ValueError('label must be "left" or "right", got %s' % label)
+    frame = getattr(obj, '_frame', obj)
+    if frame.ndim == 1:
+        axis = 0
+    index = frame.axes[axis]
+
+    # A frequency on an interval axis: bin the times in (integer) ns, so 
+    # that bins don't depend on rounding in unit conversions
+    dti, scale = _datetimes(index), None
+    if dti is not None:
+        x, step = dti.asi8, _nanos(freq)
+    elif is_frequency(freq):
+        scale = _unit_nanos(index)
+        x = np.round(np.asarray(index, dtype=float) * scale).astype('i8')
+        step = _nanos(freq)
+    else:
+        x, step = np.asarray(index, dtype=float), float(freq)
+    if step <= 0:
+        raise ValueError('Resampling frequency must be positive, got %s' % freq)
+
+    groups, out = reduce_groups(frame.values, x // step, axis, how)
+    edges = groups * step
+    if label == 'right':
+        edges = edges + step
+    if scale is not None:
+        edges = edges / scale
+    return _wrap(frame, out, axis, axis_like(index, edges))
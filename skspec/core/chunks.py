@@ -0,0 +1,145 @@
+''' Chunked (out-of-core) execution of Spectra reductions.  A Spectra is
+processed a block of columns (eg timepoints) at a time, so that only one
+block has to be in memory; with a memory mapped Spectra (from_memmap), only
+that block's pages are read.  Chunks are views (iloc), never copies.
+
+Results agree with the in memory ones to rounding (relative 1e-14 or
+so), not bit for bit: numpy and BLAS pick their summation order from the
+shape of the block (pairwise sums along a contiguous axis, blocked matrix
+products for integrals), so a chunk of 1 or 7 columns is summed in
+another order than the whole frame.  Fixing one order would give up those
+fast paths in memory too.  Reductions along the columns (eg the mean
+spectrum, mean(axis=1)) are accumulated chunk by chunk.  Counts (countNaN)
+and extrema are exact.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import operator
+
+from pandas import concat
+
+import skspec.config as pvconfig
+from skspec.core.utilities import countNaN
+
+
+def chunk_size(columns=None):
+    ''' Validated number of columns per chunk (None: config.CHUNKCOLUMNS).'''
+    if columns is None:
+        return pvconfig.CHUNKCOLUMNS
+    columns = int(columns)
+    if columns < 1:
+        raise ValueError('Chunks need at least one column, got %s' % columns)
+    return columns
+
+
+def iter_chunks(spectra, columns=None):
+    ''' Views of spectra of (at most) columns columns each, in order.
+    Default chunk size is config.CHUNKCOLUMNS.'''
+    step = chunk_size(columns)
+    for start in range(0, spectra.shape[1], step):
+        yield spectra.iloc[:, start:start+step]
+
+
+def concat_columns(spectra, partials):
+    ''' Join per column results of the consecutive chunks of spectra (eg
+    chunk.mean() for every chunk) into the result for all of spectra.
+    Metadata is that of the first partial result.'''
+    frames = [getattr(p, '_frame', p) for p in partials]
+    out = concat(frames, axis=frames[0].ndim - 1)
+    if len(out.axes[-1]) != spectra.shape[1]:
+        raise ValueError('Partial results have %s columns; expected one '
+                         'per column of spectra (%s)' %
+                         (len(out.axes[-1]), spectra.shape[1]))
+
+    # concat drops custom Index types (TimeIndex...)
+    if out.ndim == 1:
+        out.index = spectra.columns
+    else:
+        out.columns = spectra.columns
+
+    first = partials[0]
+    if hasattr(first, '_transfer'):
+        return first._transfer(out)
+    return out
+
+
+def map_reduce(spectra, mapper, reducer=None, columns=None):
+    ''' Apply mapper to every chunk of spectra, then combine the results.
+
+    Parameters:
+    -----------
+    mapper: function of a chunk (a Spectra).
+    reducer: function(accumulated, result) folded over the results in
+       order (eg operator.add).  If None, the results must be per column
+       (Series/DataFrame/Spectra whose last axis are the chunk's columns);
+       they're joined with concat_columns().
+    columns: chunk size; default config.CHUNKCOLUMNS.
+    '''
+    results = (mapper(chunk) for chunk in iter_chunks(spectra, columns))
+    if reducer is None:
+        return concat_columns(spectra, list(results))
+    return reduce(reducer, results)
+
+
+# Reductions
+# ----------
+
+def _sum_count(spectra, columns):
+    ''' Row sums and counts of non-null values, and the (Spectrum) sum of
+    the first chunk, for metadata.'''
+    template = total = count = None
+    for chunk in iter_chunks(spectra, columns):
+        partial = chunk.sum(axis=1)
+        if template is None:
+            template = partial
+            total = partial._frame.copy()
+            count = chunk._frame.count(axis=1)
+        else:
+            total += partial._frame
+            count += chunk._frame.count(axis=1)
+    return template, total, count
+
+
+def chunked_sum(spectra, axis=0, columns=None):
+    ''' spectra.sum(axis), a chunk at a time.'''
+    if axis in (0, 'index'):
+        return map_reduce(spectra, lambda chunk: chunk.sum(axis=0),
+                          columns=columns)
+    template, total, count = _sum_count(spectra, columns)
+    return template._transfer(total)
+
+
+def chunked_mean(spectra, axis=0, columns=None):
+    ''' spectra.mean(axis), a chunk at a time.'''
+    if axis in (0, 'index'):
+        return map_reduce(spectra, lambda chunk: chunk.mean(axis=0),
+                          columns=columns)
+    template, total, count = _sum_count(spectra, columns)
+    return template._transfer(total / count)
+
+
+def count_nan(spectra, columns=None):
+    ''' utilities.countNaN(spectra), a chunk at a time.'''
+    return map_reduce(spectra, countNaN, operator.add, columns=columns)
+
+
+def area(spectra, apply_fcn='simps', columns=None):
+    ''' spectra.area(apply_fcn), a chunk at a time.'''
+    return map_reduce(spectra, lambda chunk: chunk.area(apply_fcn=apply_fcn),
+                      columns=columns)
+
+
+def wavelength_slices(spectra, ranges, apply_fcn='mean', columns=None,
+                      **applyfcn_kwds):
+    ''' spectra.wavelength_slices(ranges, apply_fcn, **applyfcn_kwds), a
+    chunk at a time.'''
+    def _slices(chunk):
+        return chunk.wavelength_slices(ranges, apply_fcn=apply_fcn,
+                                       **applyfcn_kwds)
+    return map_reduce(spectra, _slices, columns=columns)
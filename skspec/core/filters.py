@@ -0,0 +1,127 @@
+''' Smoothing and derivative filters along the spectral axis (see
+Spectra.smooth and Spectra.derivative).
+
+Every filter is a 1-d kernel convolved with all columns at once along the
+index (scipy.ndimage.convolve1d); unlike boxcar(), the index is kept.  Data
+stays in its floating point dtype (float32 in, float32 out).  Memory mapped
+Spectra are filtered a block of columns at a time into a temporary map,
+and so can any Spectra, by passing columns.
+
+Kernels:
+
+    'mean'      moving average over window points.
+    'savgol'    Savitzky-Golay: least squares polynomial of polyorder over
+                window points (window odd).
+    'gaussian'  gaussian of standard deviation sigma points, truncated at
+                4 sigma.
+
+Windows and sigmas are in points; derivatives assume an evenly spaced index
+and are with respect to its values (dy/dx in the units of the spectral
+axis).
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import numpy as np
+from pandas import DataFrame
+from scipy.ndimage import convolve1d
+from scipy.signal import savgol_coeffs
+
+import skspec.core.memmap as pvmemmap
+import skspec.core.chunks as pvchunks
+
+KERNELS = ('mean', 'savgol', 'gaussian')
+
+# Gaussian kernels are cut at TRUNCATE sigmas
+TRUNCATE = 4.0
+
+
+def _gaussian(sigma, deriv=0):
+    ''' Gaussian kernel (or its first/second derivative), for convolution.'''
+    if sigma is None or sigma <= 0:
+        raise ValueError('Gaussian kernel needs sigma > 0, got %s' % sigma)
+    radius = int(TRUNCATE * sigma + 0.5)
+    x = np.arange(-radius, radius + 1, dtype=float)
+    phi = np.exp(-0.5 * (x / sigma)**2)
+    phi /= phi.sum()
+    if deriv == 0:
+        return phi
+    # Sampled and truncated, the derivatives are rescaled to be exact on
+    # straight lines (parabolas)
+    if deriv == 1:
+        w = -x * phi
+        return w / -np.dot(x, w)
+    if deriv == 2:
+        w = (x**2 / sigma**2 - 1.0) * phi
+        w -= phi * w.sum()
+        return w / (0.5 * np.dot(x**2, w))
+    raise NotImplementedError('Gaussian derivatives are of order 1 or 2, '
+                              'got %s' % deriv)
+
+
+def kernel(kind='savgol', window=11, polyorder=2, sigma=None, deriv=0,
+           delta=1.0):
+    ''' Convolution weights of a filter (see module docstring).  deriv is
+    the order of the derivative and delta the spacing of the index.'''
+    if kind == 'savgol':
+        if deriv > polyorder:
+            raise ValueError('Savitzky-Golay of order %s has no derivative '
+                             'of order %s' % (polyorder, deriv))
+        return savgol_coeffs(window, polyorder, deriv=deriv, delta=delta)
+
+    if kind == 'gaussian':
+        return _gaussian(sigma, deriv) / delta**deriv
+
+    if kind == 'mean':
+        if deriv:
+            raise NotImplementedError('No derivative of a moving average; '
+                                      'use "savgol" or "gaussian"')
+        if window < 1:
+            raise ValueError('Window must be at least 1 point, got %s'
+                             % window)
+        return np.ones(int(window)) / float(window)
+
+    raise NotImplementedError('Filter kind must be one of %s; got "%s"' %
+                              (', '.join(KERNELS), kind))
+
+
+def spacing(index):
+    ''' Mean spacing of an (evenly spaced) index; negative if descending.'''
+    if len(index) < 2:
+        return 1.0
+    return (index[-1] - index[0]) / float(len(index) - 1)
+
+
+def apply(spectra, weights, mode='nearest', columns=None):
+    ''' Spectra of spectra's data convolved with weights along the index.
+
+    Parameters:
+    -----------
+    mode: how the edges are extended; see scipy.ndimage.convolve1d.
+    columns: filter columns columns at a time.  Default is all at once,
+       unless spectra is memory mapped (then config.CHUNKCOLUMNS).
+    '''
+    frame = spectra._frame
+    values = frame.values
+    if values.dtype.kind != 'f':
+        values = values.astype(float)
+
+    out = pvmemmap.empty_values(frame, values.dtype)
+    ncols = values.shape[1]
+    if columns is None and pvmemmap.memmap_base(frame) is None:
+        step = max(1, ncols)
+    else:
+        step = pvchunks.chunk_size(columns)
+
+    for start in range(0, ncols, step):
+        cols = slice(start, start + step)
+        convolve1d(values[:, cols], weights, axis=0, mode=mode,
+                   output=out[:, cols])
+
+    return spectra._transfer(DataFrame(out, index=frame.index,
+                                       columns=frame.columns, copy=False))
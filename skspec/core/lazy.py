@@ -0,0 +1,407 @@
+''' Deferred chains of Spectra operations (see Spectra.lazy()).
+
+    ts.lazy().sub_base().nearby[450:700].iloc[:, 100:].as_norm('a').compute()
+
+records each step instead of making an intermediate Spectra.  compute()
+then:
+
+    1. Moves slices ahead of the element-wise steps before them (baseline
+       subtraction, norm conversion, arithmetic with a scalar), so those
+       only touch the selected data.  Slices of the source are views.
+    2. Runs each stretch of consecutive element-wise steps in one pass,
+       into one new array: a block of columns at a time, the block is
+       copied from the source and every step is applied to it while it is
+       in cache.
+
+Other steps (boxcar, setting the reference, as_norm with a reference,
+arithmetic that pandas would have to align...) are done as usual, in order, so the result is the same
+as running the chain eagerly.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+from pandas import DataFrame
+
+import skspec.core.norms as pvnorms
+import skspec.core.memmap as pvmemmap
+
+# Bytes of output per block of columns in a fused pass
+BLOCKBYTES = 2**20
+
+# Ufuncs of flex arithmetic methods; reversed: ufunc(x, block)
+_UFUNCS = {'add':np.add, 'sub':np.subtract, 'mul':np.multiply,
+           'div':np.true_divide, 'truediv':np.true_divide}
+
+
+class _NotFusable(Exception):
+    ''' Raised by _Step.plan() to have the step run eagerly instead.'''
+
+
+class _Step(object):
+    ''' A recorded operation.  apply(spectra) runs it eagerly.  Element-wise
+    steps also have plan(out): update the metadata of out (the output of a
+    fused pass) and return a kernel(block, cols) that changes a block of
+    columns of out in place, or None if the data doesn't change.'''
+    __metaclass__ = ABCMeta
+
+    fusable = False
+    commutes = False     # May a later conserving slice run before it?
+    commutes_all = False # Or any later slice (eg ts[a:b])?
+
+    @abstractmethod
+    def apply(self, spectra):
+        ''' The operation run eagerly on spectra; returns its result.'''
+
+
+class _Slice(_Step):
+    ''' indexer[key], with indexer one of ix, iloc, loc, nearby, or None for
+    spectra[key].'''
+    def __init__(self, indexer, key):
+        self.indexer = indexer
+        self.key = key
+        self.name = indexer or '__getitem__'
+
+    @property
+    def pushable(self):
+        keys = self.key if isinstance(self.key, tuple) else (self.key,)
+        return all(isinstance(k, slice) for k in keys)
+
+    @property
+    def conserving(self):
+        ''' Slices the reference and baseline with the data.'''
+        return self.indexer is not None
+
+    def apply(self, spectra):
+        if self.indexer is None:
+            return spectra[self.key]
+        return getattr(spectra, self.indexer)[self.key]
+
+
+class _Call(_Step):
+    ''' spectra.name(*args, **kwargs), returning a new object.'''
+    def __init__(self, name, *args, **kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def apply(self, spectra):
+        return getattr(spectra, self.name)(*self.args, **self.kwargs)
+
+
+class _SetAttr(_Step):
+    ''' setattr(spectra, name, value), on a copy-on-write view.'''
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def apply(self, spectra):
+        out = spectra._view()
+        setattr(out, self.name, self.value)
+        return out
+
+
+class _Arith(_Step):
+    ''' spectra.opname(other, axis=axis); or other opname spectra if
+    reverse (eg 2 - ts).'''
+    fusable = True
+
+    def __init__(self, opname, other, axis=None, reverse=False):
+        self.opname = self.name = opname
+        self.other = other
+        self.axis = axis
+        self.reverse = reverse
+        self.commutes = self.commutes_all = np.isscalar(other)
+
+    def apply(self, spectra):
+        if self.reverse:
+            return getattr(spectra, '__r%s__' % self.opname)(self.other)
+        if self.axis is None:
+            return getattr(spectra, '__%s__' % self.opname)(self.other)
+        return getattr(spectra, self.opname)(self.other, axis=self.axis)
+
+    def plan(self, out):
+        rhs = out._iop_operand(self.other, self.axis)
+        if rhs is None:
+            raise _NotFusable
+        rhs = _blockwise(rhs, out.shape[1])
+        ufunc = _UFUNCS[self.opname]
+        if self.reverse:
+            return lambda block, cols: ufunc(rhs(cols), block, out=block)
+        return lambda block, cols: ufunc(block, rhs(cols), out=block)
+
+
+class _Base(_Step):
+    ''' spectra.sub_base() or add_base(), on a copy.'''
+    fusable = True
+    commutes = True
+
+    def __init__(self, name):
+        self.name = name
+
+    def apply(self, spectra):
+        out = spectra._view()
+        getattr(out, self.name)()
+        return out
+
+    def plan(self, out):
+        base = out._base_plan(self.name)
+        if base is None:
+            return None
+        rhs = out._iop_operand(base, axis=0)
+        if rhs is None:
+            raise _NotFusable
+        ufunc = np.subtract if self.name == 'sub_base' else np.add
+        return lambda block, cols: ufunc(block, rhs, out=block)
+
+
+class _Norm(_Step):
+    ''' spectra.as_norm(unit, reference).'''
+    fusable = True
+    name = 'as_norm'
+
+    def __init__(self, unit, reference=None):
+        self.unit = unit
+        self.reference = reference
+        self.commutes = reference is None
+
+    def apply(self, spectra):
+        return spectra.as_norm(self.unit, self.reference)
+
+    def plan(self, out):
+        # A reference (a column of the data) is read when the step runs; out
+        # isn't filled until the pass has run.
+        if self.reference is not None:
+            raise _NotFusable
+        plan = out._norm_plan(self.unit)
+        if plan is None:
+            return None
+        sin, sout, convref, newref, rout = plan
+        out._reference = rout
+        out._normtype = sout
+        def _convert(block, cols):
+            pvnorms.convert(block, sin, sout, ref=convref, newref=newref,
+                            out=block)
+        return _convert
+
+
+def _blockwise(rhs, ncols):
+    ''' Function of a column slice giving the part of rhs (an operand that
+    broadcasts to values of ncols columns) for those columns.'''
+    if np.ndim(rhs) == 0 or np.shape(rhs)[-1] == 1 or ncols == 1:
+        return lambda cols: rhs
+    if np.ndim(rhs) == 1:
+        return lambda cols: rhs[cols]
+    return lambda cols: rhs[:, cols]
+
+
+def pushdown(steps):
+    ''' Reorder steps so that slices run as early as they can.'''
+    out = []
+    for step in steps:
+        i = len(out)
+        if isinstance(step, _Slice) and step.pushable:
+            attr = 'commutes' if step.conserving else 'commutes_all'
+            while i and getattr(out[i-1], attr):
+                i -= 1
+        out.insert(i, step)
+    return out
+
+
+class _Pass(object):
+    ''' One fused pass of element-wise steps over a Spectra.'''
+    def __init__(self, source):
+        self.source = source
+        frame = source._frame
+        dtype = np.result_type(*[b.dtype for b in frame._data.blocks])
+        values = pvmemmap.empty_values(frame, dtype)
+        self.out = source._transfer(DataFrame(values, index=frame.index,
+                                              columns=frame.columns,
+                                              copy=False))
+        self.kernels = []
+        self.planned = 0
+
+    def add(self, kernel):
+        self.planned += 1
+        if kernel is not None:
+            self.kernels.append(kernel)
+
+    def run(self):
+        if not self.planned:
+            return self.source
+
+        # Only metadata changed; share the source's data
+        if not self.kernels:
+            out = self.out._transfer(self.source._frame)
+            self.source._share_buffer(out)
+            return out
+
+        src = self.source._frame.values
+        dst = self.out._frame.values
+        nspec, ncols = dst.shape
+        step = max(1, BLOCKBYTES // max(1, nspec * dst.dtype.itemsize))
+        for start in range(0, ncols, step):
+            cols = slice(start, start + step)
+            block = dst[:, cols]
+            block[...] = src[:, cols]
+            for kernel in self.kernels:
+                kernel(block, cols)
+        return self.out
+
+
+def _fusable(spectra):
+    frame = getattr(spectra, '_frame', None)
+    if frame is None or frame.ndim != 2:
+        return False
+    return all(b.dtype.kind == 'f' for b in frame._data.blocks)
+
+
+def compute(spectra, steps):
+    ''' Run steps on spectra (see module docstring).'''
+    current = spectra
+    fused = None
+    for step in pushdown(steps):
+        if step.fusable and (fused is not None or _fusable(current)):
+            if fused is None:
+                fused = _Pass(current)
+            try:
+                fused.add(step.plan(fused.out))
+                continue
+            except _NotFusable:
+                pass
+
+        if fused is not None:
+            current, fused = fused.run(), None
+        current = step.apply(current)
+
+    if fused is not None:
+        return fused.run()
+    if current is spectra:
+        return spectra._view()
+    return current
+
+
+class _LazyIndexer(object):
+    def __init__(self, lazy, name):
+        self.lazy = lazy
+        self.name = name
+
+    def __getitem__(self, key):
+        return self.lazy._then(_Slice(self.name, key))
+
+
+class LazySpectra(object):
+    ''' Chain of operations on a Spectra that runs on compute().  Every
+    operation returns a new LazySpectra; none changes the source, including
+    sub_base()/add_base(), which change a Spectra in place.'''
+
+    def __init__(self, spectra, steps=()):
+        self._spectra = spectra
+        self._steps = tuple(steps)
+
+    def _then(self, step):
+        return LazySpectra(self._spectra, self._steps + (step,))
+
+    def compute(self):
+        ''' Spectra resulting from the recorded operations.'''
+        return compute(self._spectra, self._steps)
+
+    # Slicing
+    @property
+    def ix(self):
+        return _LazyIndexer(self, 'ix')
+
+    @property
+    def iloc(self):
+        return _LazyIndexer(self, 'iloc')
+
+    @property
+    def loc(self):
+        return _LazyIndexer(self, 'loc')
+
+    @property
+    def nearby(self):
+        return _LazyIndexer(self, 'nearby')
+
+    def __getitem__(self, key):
+        return self._then(_Slice(None, key))
+
+    # skspec operations
+    def sub_base(self):
+        return self._then(_Base('sub_base'))
+
+    def add_base(self):
+        return self._then(_Base('add_base'))
+
+    def as_norm(self, unit, reference=None):
+        return self._then(_Norm(unit, reference))
+
+    def set_reference(self, reference):
+        ''' Like spectra.reference = reference.'''
+        return self._then(_SetAttr('reference', reference))
+
+    def boxcar(self, *args, **kwargs):
+        return self._then(_Call('boxcar', *args, **kwargs))
+
+    def pipe(self, name, *args, **kwargs):
+        ''' Record spectra.name(*args, **kwargs), any method returning a new
+        Spectra (run as is, in order).'''
+        return self._then(_Call(name, *args, **kwargs))
+
+    # Arithmetic
+    def add(self, other, axis=None):
+        return self._then(_Arith('add', other, axis))
+
+    def sub(self, other, axis=None):
+        return self._then(_Arith('sub', other, axis))
+
+    def mul(self, other, axis=None):
+        return self._then(_Arith('mul', other, axis))
+
+    def div(self, other, axis=None):
+        return self._then(_Arith('div', other, axis))
+
+    truediv = div
+
+    def __add__(self, other):
+        return self._then(_Arith('add', other))
+
+    def __sub__(self, other):
+        return self._then(_Arith('sub', other))
+
+    def __mul__(self, other):
+        return self._then(_Arith('mul', other))
+
+    def __div__(self, other):
+        return self._then(_Arith('div', other))
+
+    def __truediv__(self, other):
+        return self._then(_Arith('truediv', other))
+
+    def __radd__(self, other):
+        return self._then(_Arith('add', other, reverse=True))
+
+    def __rsub__(self, other):
+        return self._then(_Arith('sub', other, reverse=True))
+
+    def __rmul__(self, other):
+        return self._then(_Arith('mul', other, reverse=True))
+
+    def __rdiv__(self, other):
+        return self._then(_Arith('div', other, reverse=True))
+
+    def __rtruediv__(self, other):
+        return self._then(_Arith('truediv', other, reverse=True))
+
+    def __repr__(self):
+        return '%s(%s: %s)' % (self.__class__.__name__,
+                               getattr(self._spectra, 'name', None),
+                               ' -> '.join(s.name for s in self._steps) or 
+                               'no-op')
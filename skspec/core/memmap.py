@@ -0,0 +1,175 @@
+''' Memory-mapped storage of Spectra, for runs larger than RAM (see
+Spectra.to_memmap/from_memmap).
+
+A run is stored as two files:
+
+    path        raw intensities, C-order, shape (nvar, nspec); ie one
+                spectrum (eg one timepoint) after another.
+    path.mdf    pickled sidecar: shape, dtype, the index/columns (with
+                their units) and the Spectra metadata (reference, baseline,
+                norm, name...).
+
+The raw file is laid out like the (single) block of a pandas DataFrame, so
+a Spectra loaded from it holds the numpy.memmap itself as its data; nothing
+is read until it's used, and slices of it (iloc, nearby, ix...) are views
+that only page in the spectra they cover.  Full size outputs of memory
+mapped data (copy-on-write copies, norm conversions) are written to
+anonymous temporary maps in config.MEMMAP_TMPDIR rather than to RAM.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import cPickle
+import tempfile
+
+import numpy as np
+from pandas import DataFrame
+
+from skspec.core.abcindex import ConversionIndex, CustomIndex
+import skspec.config as pvconfig
+
+SIDECAR_EXT = '.mdf'
+SIDECAR_VERSION = 1
+
+# Bytes per chunk when copying between RAM and a map
+CHUNKBYTES = 64 * 1024**2
+
+
+def memmap_base(obj):
+    ''' The numpy.memmap (or a view of it) that a pandas object's (or a
+    MetaPandasObject's frame's) data lives in, or None if in RAM.'''
+    obj = getattr(obj, '_frame', obj)
+    for block in obj._data.blocks:
+        arr = block.values
+        while isinstance(arr, np.ndarray):
+            # ufunc outputs/copies of a memmap are memmaps without a map
+            if getattr(arr, '_mmap', None) is not None:
+                return arr
+            arr = arr.base
+    return None
+
+
+def _chunks(nrows, rowbytes):
+    ''' (start, stop) over nrows, CHUNKBYTES at a time.'''
+    step = max(1, CHUNKBYTES // max(1, rowbytes))
+    for start in range(0, nrows, step):
+        yield start, min(start + step, nrows)
+
+
+def _tempmap(shape, dtype):
+    ''' Anonymous (already unlinked) memmap of shape; the disk space is
+    freed when the map is garbage collected.'''
+    fileobj = tempfile.TemporaryFile(prefix='skspec', suffix='.dat',
+                                     dir=pvconfig.MEMMAP_TMPDIR)
+    return np.memmap(fileobj, dtype=dtype, mode='w+', shape=shape)
+
+
+def empty_values(frame, dtype):
+    ''' Uninitialized array of frame's shape, to build a new frame from
+    with DataFrame(values, copy=False).  If frame is memory mapped, this is
+    a temporary memmap (transposed, so that it is the new frame's block).
+    '''
+    nrows, ncols = frame.shape
+    if memmap_base(frame) is None:
+        return np.empty((nrows, ncols), dtype=dtype)
+    return _tempmap((ncols, nrows), dtype).T
+
+
+def copy_frame(frame):
+    ''' Copy of a DataFrame into a temporary memmap, a chunk of columns at
+    a time.  Axes are kept as is (custom Index attributes included).'''
+    values = frame.values
+    out = empty_values(frame, values.dtype)
+    rowbytes = values.shape[0] * values.dtype.itemsize
+    for start, stop in _chunks(values.shape[1], rowbytes):
+        out[:, start:stop] = values[:, start:stop]
+    return DataFrame(out, index=frame.index, columns=frame.columns,
+                     copy=False)
+
+
+# Axes pickle without their unit; store enough to rebuild them
+def _axis_state(axis):
+    unit = getattr(axis, '_unit', None)
+    if isinstance(axis, ConversionIndex) and unit is not None:
+        unit = unit.short
+    return (type(axis), np.asarray(axis), unit,
+            getattr(axis, '_stored_dti', None))
+
+
+def _axis_from_state(state):
+    cls, values, unit, dti = state
+    if dti is not None:
+        return cls(dti, unit=unit)
+    if issubclass(cls, (ConversionIndex, CustomIndex)):
+        return cls(values, unit=unit)
+    return cls(values)
+
+
+def sidecar_path(path):
+    return path + SIDECAR_EXT
+
+
+def save(spectra, path, dtype=None):
+    ''' Write spectra to path (raw data) and path.mdf (sidecar), a chunk of
+    columns at a time, so spectra itself may be memory mapped.
+
+    Parameters:
+    -----------
+    dtype: storage dtype.  Defaults to the dtype of spectra's data.  If
+       passed, it also becomes the dtype policy of the loaded Spectra.
+    '''
+    frame = spectra._frame
+    nspec, nvar = frame.shape
+    meta = spectra.__getstate__()
+    del meta['_frame']
+    if dtype is None:
+        dtype = np.result_type(*[b.dtype for b in frame._data.blocks])
+    else:
+        meta['_dtype'] = dtype = np.dtype(dtype)
+
+    out = np.memmap(path, dtype=dtype, mode='w+', shape=(nvar, nspec))
+    for start, stop in _chunks(nvar, nspec * dtype.itemsize):
+        out[start:stop] = frame.iloc[:, start:stop].values.T
+    out.flush()
+    del out
+
+    sidecar = {'version':SIDECAR_VERSION,
+               'cls':type(spectra),
+               'shape':(nvar, nspec),
+               'dtype':dtype.str,
+               'index':_axis_state(frame.index),
+               'columns':_axis_state(frame.columns),
+               'meta':meta}
+    with open(sidecar_path(path), 'wb') as f:
+        cPickle.dump(sidecar, f, cPickle.HIGHEST_PROTOCOL)
+
+
+def load(path, mode='r'):
+    ''' Spectra (of the class that was saved) whose data is a numpy.memmap
+    of path.  mode is that of numpy.memmap: 'r' (read-only), 'r+' (writes
+    go to the file) or 'c' (writes stay in memory).'''
+    with open(sidecar_path(path), 'rb') as f:
+        sidecar = cPickle.load(f)
+
+    if sidecar.get('version') != SIDECAR_VERSION:
+        raise IOError('%s: unsupported memmap sidecar version %s' %
+                      (sidecar_path(path), sidecar.get('version')))
+
+    data = np.memmap(path, dtype=np.dtype(sidecar['dtype']), mode=mode,
+                     shape=sidecar['shape'])
+    frame = DataFrame(data.T,
+                      index=_axis_from_state(sidecar['index']),
+                      columns=_axis_from_state(sidecar['columns']),
+                      copy=False)
+
+    # Like unpickling; data was validated when it was saved
+    cls = sidecar['cls']
+    obj = cls.__new__(cls)
+    obj.__dict__.update(sidecar['meta'])
+    obj._frame = frame
+    return obj
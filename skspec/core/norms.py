@@ -0,0 +1,154 @@
+''' Conversion of spectral intensities between normalizations (norms), eg
+transmittance to absorbance.  Used by Spectra.norm/as_norm.
+
+Every norm is a function of the referenced data, x = data / reference ('r'):
+
+    't'     1/x               (power law,   c * x**p)
+    '%t'    100/x
+    'r'     x
+    'a'     -log10(x)         (logarithm,   -log_b(x))
+    'a(ln)' -ln(x)
+
+so any norm-to-norm conversion composes into one or two ufunc passes (eg
+'a' --> '%t' is 100 * 10**a) instead of a round trip through 'r'.  All
+passes write into the output array, so the only allocation is the output
+itself, or none if converting in place (out=values).  Output keeps the 
+dtype of values (eg float32, see config.DTYPE); logs and exponentials of 
+single precision data are evaluated in float64, a block of rows at a time.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import numpy as np
+
+# norm: ('pow', c, p) for c * x**p, or ('log', base) for -log_base(x)
+NORMS = {'t':('pow', 1.0, -1),
+         '%t':('pow', 100.0, -1),
+         'r':('pow', 1.0, 1),
+         'a':('log', 10.0),
+         'a(ln)':('log', np.e)}
+
+# Elements per float64 block when promoting single precision data
+PROMOTE_BLOCKSIZE = 2**18
+
+
+def _as_column(ref, values):
+    ''' Reference (along the spectral index) shaped to broadcast against
+    values, which is 1d (a spectrum) or 2d (nspec x nvar).'''
+    ref = np.asarray(ref)
+    if values.ndim == 2:
+        return ref.reshape(-1, 1)
+    return ref
+
+
+def _output(values, out):
+    ''' Output array; floating point even if values are integers.'''
+    if out is None:
+        dtype = values.dtype if values.dtype.kind in 'fc' else np.float64
+        out = np.empty(values.shape, dtype=dtype)
+    return out
+
+
+def _promoted(fcn, values, out):
+    ''' fcn(src, dst) writes a function of src into dst.  Apply it from 
+    values to out, in float64 if out is single precision.'''
+    if out.dtype.itemsize >= 8 or out.dtype.kind != 'f':
+        fcn(values, out)
+        return out
+
+    rows = max(1, PROMOTE_BLOCKSIZE // max(1, values[0:1].size))
+    for start in range(0, len(values), rows):
+        block = values[start:start+rows].astype(np.float64)
+        fcn(block, block)
+        out[start:start+rows] = block
+    return out
+
+
+def _compose(values, sin, sout, out):
+    ''' Convert values from norm sin to norm sout (neither None), writing
+    the result to out.'''
+
+    fin, fout = NORMS[sin], NORMS[sout]
+
+    if sin == sout:
+        if out is not values:
+            out[...] = values
+        return out
+
+    # power --> power: c2 * (y/c1)**(p2/p1), where p2/p1 is +/- 1
+    if fin[0] == 'pow' and fout[0] == 'pow':
+        (_, c1, p1), (_, c2, p2) = fin, fout
+        if p1 == p2:
+            return np.multiply(values, c2 / c1, out)
+        return np.divide(c1 * c2, values, out)
+
+    # log --> log: change of base
+    if fin[0] == 'log' and fout[0] == 'log':
+        return np.multiply(values, np.log(fin[1]) / np.log(fout[1]), out)
+
+    # power --> log: -log_b((y/c)**(1/p)) = -(ln(y) - ln(c)) / (p ln(b))
+    if fin[0] == 'pow':
+        (_, c, p), base = fin, fout[1]
+        def _pow_to_log(src, dst):
+            np.log(src, dst)
+            if c != 1.0:
+                dst -= np.log(c)
+            dst *= -1.0 / (p * np.log(base))
+        return _promoted(_pow_to_log, values, out)
+
+    # log --> power: c * (b**-y)**p = c * exp(-p ln(b) y)
+    base, (_, c, p) = fin[1], fout
+    def _log_to_pow(src, dst):
+        np.multiply(src, -p * np.log(base), dst)
+        np.exp(dst, dst)
+        if c != 1.0:
+            dst *= c
+    return _promoted(_log_to_pow, values, out)
+
+
+def convert(values, sin, sout, ref=None, newref=None, out=None):
+    ''' Convert an array of spectral intensities between norms.
+
+    Parameters:
+    -----------
+    values: 1d or 2d (spectral index along axis 0) array.
+    sin, sout: current and desired norm; a key of NORMS or None (full data).
+    ref: reference, along the spectral index.  Required if sin or sout
+       is None.
+    newref: if passed when converting between two norms, the data is
+       re-referenced to newref (ie data * ref / newref).
+    out: output array.  Pass values to convert in place.  If None, a new
+       array is allocated.
+
+    Returns:
+    --------
+    out
+    '''
+    if sin is None and sout is None:
+        return values if out is None else _compose(values, 'r', 'r', out)
+
+    out = _output(values, out)
+
+    # Full data --> x --> sout
+    if sin is None:
+        np.divide(values, _as_column(ref, values), out)
+        return _compose(out, 'r', sout, out)
+
+    # sin --> x --> full data
+    if sout is None:
+        _compose(values, sin, 'r', out)
+        return np.multiply(out, _as_column(ref, values), out)
+
+    # Re-referencing
+    if newref is not None:
+        ratio = np.asarray(ref, dtype=out.dtype) / np.asarray(newref)
+        _compose(values, sin, 'r', out)
+        np.multiply(out, _as_column(ratio, values), out)
+        return _compose(out, 'r', sout, out)
+
+    return _compose(values, sin, sout, out)
@@ -0,0 +1,90 @@
+''' Batched integration along the spectral axis (see
+Spectra.wavelength_slices and area).
+
+The trapezoid and Simpson rules are linear in the data, so for a given x
+the integral of every column is one dot product with a vector of weights:
+
+    scipy.integrate.simps(y, x, even='last') == np.dot(weights(x, 'simps'), y)
+
+weights() builds that vector in O(len(x)), once per range; integrate()
+applies it to a (nspec x ncols) block of values with one matrix product
+instead of integrating column by column.  Sums are done in another order
+than scipy's, so results agree to rounding.
+
+A descending x (eg wavenumbers) is integrated in ascending order, so areas
+are positive either way.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import numpy as np
+
+RULES = ('simps', 'trapz')
+
+
+def trapz_weights(x):
+    ''' w such that np.dot(w, y) == scipy.integrate.trapz(y, x).'''
+    x = np.asarray(x, dtype=float)
+    w = np.zeros(len(x))
+    half = np.diff(x) / 2.0
+    w[:-1] += half
+    w[1:] += half
+    return w
+
+
+def _simps_pairs(w, x):
+    ''' Add the weights of Simpson's rule over x (odd length) to w; same
+    (non-uniform spacing) formula as scipy's.'''
+    stop = len(x) - 1
+    h = np.diff(x)
+    h0, h1 = h[0::2], h[1::2]
+    hsum = h0 + h1
+    w[0:stop-1:2] += hsum / 6.0 * (2.0 - h1 / h0)
+    w[1:stop:2] += hsum / 6.0 * hsum * hsum / (h0 * h1)
+    w[2:stop+1:2] += hsum / 6.0 * (2.0 - h0 / h1)
+
+
+def simps_weights(x):
+    ''' w such that np.dot(w, y) == scipy.integrate.simps(y, x, even='last');
+    ie for an even number of points, the first interval is a trapezoid.'''
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    w = np.zeros(n)
+    if n < 2:
+        return w
+    if n % 2:
+        _simps_pairs(w, x)
+    else:
+        if n > 2:
+            _simps_pairs(w[1:], x[1:])
+        first = (x[1] - x[0]) / 2.0
+        w[0] += first
+        w[1] += first
+    return w
+
+
+_WEIGHTS = {'simps':simps_weights, 'trapz':trapz_weights}
+
+
+def weights(x, rule='simps'):
+    ''' Integration weights of x for rule (one of RULES); see module
+    docstring.'''
+    try:
+        fcn = _WEIGHTS[rule]
+    except KeyError:
+        raise ValueError('Integration rule must be one of %s; got "%s"' %
+                         (', '.join(RULES), rule))
+    x = np.asarray(x, dtype=float)
+    if len(x) > 1 and x[0] > x[-1]:
+        return fcn(x[::-1])[::-1]
+    return fcn(x)
+
+
+def integrate(values, x, rule='simps'):
+    ''' Integral of every column of values (len(x) rows) over x.'''
+    return np.dot(weights(x, rule), values)
@@ -0,0 +1,90 @@
+''' Bounded least-recently-used cache of Spectra representations (see
+Spectra.enable_repcache).'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+from collections import OrderedDict
+
+
+def frame_nbytes(obj):
+    ''' Bytes held by the blocks of a pandas object (or a MetaPandasObject's
+    frame).'''
+    obj = getattr(obj, '_frame', obj)
+    return sum(block.values.nbytes for block in obj._data.blocks)
+
+
+class RepCache(object):
+    ''' Maps keys to objects, holding at most maxbytes in total.  When full,
+    the least recently used entries are evicted first.  An object larger
+    than maxbytes is never stored.
+
+    Attributes:
+    -----------
+    hits, misses, evictions: counts since creation (or reset_stats()).
+    nbytes: bytes currently held.
+    '''
+
+    def __init__(self, maxbytes):
+        self.maxbytes = maxbytes
+        self._entries = OrderedDict() # key: (obj, nbytes)
+        self.nbytes = 0
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        ''' Cached object or None; counts a hit or a miss.'''
+        try:
+            obj, nbytes = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[key] = (obj, nbytes) #Most recently used goes last
+        self.hits += 1
+        return obj
+
+    def put(self, key, obj, nbytes):
+        ''' Store obj, evicting old entries to stay under maxbytes.'''
+        self.discard(key)
+        if nbytes > self.maxbytes:
+            return
+        while self._entries and self.nbytes + nbytes > self.maxbytes:
+            oldkey, (oldobj, oldbytes) = self._entries.popitem(last=False)
+            self.nbytes -= oldbytes
+            self.evictions += 1
+        self._entries[key] = (obj, nbytes)
+        self.nbytes += nbytes
+
+    def discard(self, key):
+        if key in self._entries:
+            obj, nbytes = self._entries.pop(key)
+            self.nbytes -= nbytes
+
+    def clear(self):
+        ''' Drop all entries (statistics are kept).'''
+        self._entries.clear()
+        self.nbytes = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        ''' dict of hits, misses, evictions, entries and nbytes.'''
+        return {'hits':self.hits, 'misses':self.misses,
+                'evictions':self.evictions, 'entries':len(self),
+                'nbytes':self.nbytes, 'maxbytes':self.maxbytes}
+
+    def __repr__(self):
+        return ('%s(entries=%s, nbytes=%s, maxbytes=%s, hits=%s, misses=%s)' %
+                (self.__class__.__name__, len(self), self.nbytes,
+                 self.maxbytes, self.hits, self.misses))
@@ -0,0 +1,318 @@
+''' Moving window statistics along the columns of Spectra (eg time, see
+TimeSpectra.rolling): counts, sums, means, variances, min and max over the
+trailing window that ends at each column, for every row at once.
+
+Windows are either a number of samples, or a duration: the window ending
+at time t holds the columns in (t - width, t], so irregular acquisition
+times are handled exactly.
+
+Costs don't depend on the width of the window:
+
+    sums, means, variances   differences of running (prefix) sums.  The
+                             running sums restart every window length of
+                             columns and are of the values less a local
+                             mean (see _moments), so over a long, drifting
+                             run the differences don't cancel away the
+                             variance of short windows.
+    min, max (samples)       van Herk/Gil-Werman: running extrema within
+                             blocks of window columns, forward and
+                             backward; O(N*M).
+    min, max (durations)     the windows vary in length, so a sparse table
+                             of extrema over powers of 2 columns;
+                             O(N*M*log(window)).
+
+NaNs are skipped; windows with fewer than min_periods values are NaN.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import numbers
+import warnings
+
+import numpy as np
+from pandas import DataFrame
+
+import skspec.core.memmap as pvmemmap
+import skspec.core.chunks as pvchunks
+from skspec.core.binning import is_frequency, _nanos
+
+STATS = ('count', 'sum', 'mean', 'var', 'std', 'min', 'max')
+
+# Values per block of rows: the temporary running sums of a block stay in
+# cache (and are reused) rather than page faulting in for the whole frame.
+BLOCKVALUES = 2**16
+
+
+def window_starts(times, width):
+    ''' First position of the window (t - width, t] that ends at each
+    position of times (ascending).'''
+    times = np.asarray(times, dtype=float)
+    return np.searchsorted(times, times - width, side='right')
+
+
+def sample_starts(ncols, width):
+    ''' First position of the window of width samples ending at each of
+    ncols positions (clipped at 0).'''
+    return np.maximum(np.arange(ncols) - int(width) + 1, 0)
+
+
+def _prefix(values):
+    ''' Running sums along axis 1, with a leading column of zeros.'''
+    out = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=out[:, 1:])
+    return out
+
+
+def _window_sums(prefix, starts):
+    ''' Sums over [starts[j], j] of every row, from running sums.'''
+    return prefix[:, 1:] - prefix[:, starts]
+
+
+def _counts(nulls, starts):
+    ''' Non-NaN values per window; nulls is None if there are none.'''
+    if nulls is None:
+        return np.arange(len(starts)) - starts + 1
+    return _window_sums(_prefix(~nulls), starts)
+
+
+def _nulls(values):
+    ''' NaN mask of values, or None if there are none (the common case,
+    which skips the masking).'''
+    nulls = np.isnan(values)
+    return nulls if nulls.any() else None
+
+
+def _moments(values, starts, order):
+    ''' (count, sum, sum of squares) over the windows, of the values shifted
+    by a local mean, which is returned too (per value).
+
+    Columns are cut into segments as long as the longest window, so a
+    window ending in segment k lies within segments k-1 and k.  Its sums
+    are differences of running sums over just those two segments, of the
+    values less the mean of segment k: nothing is summed over more than two
+    windows' worth of columns, or far from the window's own mean.'''
+    nrows, ncols = values.shape
+    nulls = _nulls(values)
+    count = _counts(nulls, starts)
+    ends = np.arange(ncols)
+    span = int((ends - starts).max()) + 1 if ncols else 1
+    nseg = -(-ncols // span)
+
+    # Segment -1 (never inside a window) then the data, in whole segments
+    padded = np.zeros((nrows, (nseg + 1) * span))
+    padded[:, span:span+ncols] = values
+    segs = padded.reshape(nrows, nseg + 1, span)
+    if nulls is None:
+        valid = None
+        seglen = np.minimum(span, ncols - span * np.arange(nseg))
+    else:
+        present = np.zeros(padded.shape, dtype=bool)
+        present[:, span:span+ncols] = ~nulls
+        padded[~present] = 0.0
+        valid = present.reshape(segs.shape)
+        seglen = valid[:, 1:].sum(axis=2)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = segs[:, 1:].sum(axis=2) / seglen
+    shift[~np.isfinite(shift)] = 0.0  # All NaN segments
+
+    # Segments k-1 and k, less the mean of k
+    x = np.concatenate((segs[:, :-1], segs[:, 1:]), axis=2)
+    x -= shift[:, :, None]
+    if valid is None:
+        x[:, 0, :span] = 0.0  # Segment -1
+    else:
+        x[~np.concatenate((valid[:, :-1], valid[:, 1:]), axis=2)] = 0.0
+
+    seg = ends // span
+    stop = ends - (seg - 1) * span + 1
+    first = starts - (seg - 1) * span
+    def _sums(y):
+        prefix = np.zeros(y.shape[:2] + (y.shape[2] + 1,))
+        np.cumsum(y, axis=2, out=prefix[:, :, 1:])
+        return prefix[:, seg, stop] - prefix[:, seg, first]
+
+    s1 = _sums(x)
+    s2 = _sums(x * x) if order > 1 else None
+    return count, s1, s2, shift[:, seg]
+
+
+def _running(ufunc, blocks, reverse=False):
+    ''' ufunc.accumulate within each block (along the last axis).'''
+    if reverse:
+        return ufunc.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1]
+    return ufunc.accumulate(blocks, axis=-1)
+
+
+def _extrema_fixed(values, width, ufunc, fill):
+    ''' Running ufunc (np.maximum/np.minimum) over windows of width samples
+    (van Herk/Gil-Werman).'''
+    nrows, ncols = values.shape
+    width = max(1, min(int(width), ncols))
+    nblocks = -(-ncols // width)
+    padded = np.empty((nrows, nblocks * width))
+    padded[:, ncols:] = fill
+    padded[:, :ncols] = values
+    blocks = padded.reshape(nrows, nblocks, width)
+    forward = _running(ufunc, blocks).reshape(nrows, -1)[:, :ncols]
+    backward = _running(ufunc, blocks, reverse=True).reshape(nrows, -1)
+
+    # Window [j - width + 1, j] spans the end of one block and the start of
+    # the next (or is one whole block); the first ones are partial
+    out = forward.copy()
+    j = np.arange(width - 1, ncols)
+    out[:, j] = ufunc(backward[:, j - width + 1], forward[:, j])
+    return out
+
+
+def _extrema_table(values, starts, ufunc):
+    ''' Running ufunc over windows [starts[j], j] of any (nondecreasing)
+    starts, from a sparse table over 2**k columns.'''
+    nrows, ncols = values.shape
+    ends = np.arange(ncols)
+    lengths = ends - starts + 1
+    levels = np.floor(np.log2(lengths)).astype(int)
+    out = np.empty((nrows, ncols))
+
+    table = values
+    for k in range(levels.max() + 1 if ncols else 0):
+        span = 2**k
+        if k:
+            half = span // 2
+            table = ufunc(table[:, :-half], table[:, half:])
+        use = np.flatnonzero(levels == k)
+        if len(use):
+            out[:, use] = ufunc(table[:, starts[use]],
+                                table[:, ends[use] - span + 1])
+    return out
+
+
+class Rolling(object):
+    ''' Moving window statistics of a Spectra along its columns; see module
+    docstring.  Built by TimeSpectra.rolling().
+
+    Parameters:
+    -----------
+    window: int (samples), or a duration: a number in units of unit (or of
+       the columns' own interval unit), or a fixed frequency such as '30s',
+       '5min' or a timedelta.
+    unit: time unit of a numeric window (eg 's', 'm'); the columns are
+       converted to it with TimeIndex.convert.
+    min_periods: fewest values for a result; default is the whole window
+       for samples, else 1.
+    rows: rows at a time (bounds the temporary running sums).  Default is
+       about BLOCKVALUES values per block.
+    '''
+
+    def __init__(self, spectra, window, unit=None, min_periods=None,
+                 rows=None):
+        self.spectra = spectra
+        self.window = window
+        self.rows = rows
+        columns = spectra.columns
+        ncols = len(columns)
+
+        if is_frequency(window):
+            self.width = None
+            times = columns.convert('ns')
+            self.starts = window_starts(times, _nanos(window))
+        elif unit is not None or not isinstance(window, numbers.Integral):
+            if unit is not None:
+                times = columns.convert(unit)
+            elif getattr(columns, 'unit', None) in (None, 'dti'):
+                raise ValueError('A window of %s needs a time unit (eg '
+                                 'unit="s"), or a frequency like "30s"'
+                                 % window)
+            else:
+                times = columns
+            self.width = None
+            self.starts = window_starts(times, window)
+        else:
+            if window < 1:
+                raise ValueError('Window must be at least 1 sample, got %s'
+                                 % window)
+            self.width = int(window)
+            self.starts = sample_starts(ncols, window)
+
+        if min_periods is None:
+            min_periods = self.width if self.width else 1
+        self.min_periods = min_periods
+
+    def _apply(self, fcn):
+        ''' Spectra of fcn(block of rows) for all rows.'''
+        frame = self.spectra._frame
+        values = frame.values
+        out = pvmemmap.empty_values(frame, np.float64)
+
+        nrows, ncols = values.shape
+        if self.rows is None:
+            step = max(1, BLOCKVALUES // max(ncols, 1))
+        else:
+            step = pvchunks.chunk_size(self.rows)
+
+        for start in range(0, nrows, step):
+            block = np.asarray(values[start:start+step], dtype=float)
+            out[start:start+step] = fcn(block)
+
+        return self.spectra._transfer(DataFrame(out, index=frame.index,
+                                       columns=frame.columns, copy=False))
+
+    def _valid(self, count, result):
+        short = count < max(self.min_periods, 1)
+        result[np.broadcast_to(short, result.shape)] = np.nan
+        return result
+
+    def count(self):
+        ''' Non-NaN values per window.'''
+        return self._apply(lambda v: np.broadcast_to(
+            _counts(_nulls(v), self.starts), v.shape).astype(float))
+
+    def sum(self):
+        def _sum(v):
+            count, s1, _, shift = _moments(v, self.starts, 1)
+            return self._valid(count, s1 + count * shift)
+        return self._apply(_sum)
+
+    def mean(self):
+        def _mean(v):
+            count, s1, _, shift = _moments(v, self.starts, 1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return self._valid(count, s1 / count + shift)
+        return self._apply(_mean)
+
+    def _var(self, v, ddof):
+        count, s1, s2, _ = _moments(v, self.starts, 2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = (s2 - s1 * s1 / count) / (count - ddof)
+            out[out < 0] = 0.0  # Rounding of constant windows
+        out[np.broadcast_to(count <= ddof, out.shape)] = np.nan
+        return self._valid(count, out)
+
+    def var(self, ddof=1):
+        return self._apply(lambda v: self._var(v, ddof))
+
+    def std(self, ddof=1):
+        return self._apply(lambda v: np.sqrt(self._var(v, ddof)))
+
+    def _extrema(self, ufunc, fill):
+        def _ext(v):
+            nulls = _nulls(v)
+            filled = v if nulls is None else np.where(nulls, fill, v)
+            if self.width:
+                out = _extrema_fixed(filled, self.width, ufunc, fill)
+            else:
+                out = _extrema_table(filled, self.starts, ufunc)
+            count = _counts(nulls, self.starts)
+            return self._valid(count, out)
+        return self._apply(_ext)
+
+    def min(self):
+        return self._extrema(np.minimum, np.inf)
+
+    def max(self):
+        return self._extrema(np.maximum, -np.inf)
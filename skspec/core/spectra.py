@@ -21,6 +21,14 @@ from skspec.core.specstack import SpecStack
 from skspec.core.abcspectra import ABCSpectra, SpecError
 
 import skspec.core.utilities as pvutils
+import skspec.core.norms as pvnorms
+import skspec.core.memmap as pvmemmap
+import skspec.core.chunks as pvchunks
+import skspec.core.lazy as pvlazy
+import skspec.core.quadrature as pvquad
+import skspec.core.filters as pvfilters
+import skspec.peaks.peakfinder as pvpeaks
+from skspec.core.repcache import RepCache, frame_nbytes
 import skspec.config as pvconfig
 from skspec.units.abcunits import IUnit, Unit
 
@@ -54,7 +62,7 @@ from_T={'t':lambda x: 1.0/x,
 
 
 to_T={'t':lambda x: 1.0/x, 
-      '%t':lambda x: (1.0/ x) / 100.0, 
+      '%t':lambda x: 100.0 / x, 
       'r':lambda x: x, 
       'a':lambda x: np.power(10, -x), 
       'a(ln)':lambda x: np.exp(-x)} 
@@ -303,6 +311,10 @@ class Spectrum(ABCSpectra, MetaSeries):
                          'got %s' % type(series))
      
       out = cls(series.values, index=series.index)
+      out._frame.name = series.name  # Column label; self.name is metadata
+
+      # series.values is often a view into the spectra (eg ts[col])
+      spectra._share_buffer(out)
 
       def _transfer(attr):
          '''If attr not in kwargs, trasnfer from spectra object'''
@@ -345,6 +357,16 @@ class Spectra(ABCSpectra, MetaDataFrame):
    the current label object to generate teh next object.
    """
 
+   # Shared between self and outputs of _transfer(); never modified in place
+   _sharedattrs = ('_reference', '_baseline')
+
+   # Storage dtype policy (see dtype)
+   _dtype = None
+
+   # Representation cache (see enable_repcache); belongs to self only
+   _repcache = None
+   _transientattrs = ABCSpectra._transientattrs + ('_repcache',)
+
    def __init__(self, *dfargs, **dfkwargs):
 
       self._strict_index = dfkwargs.pop('strict_index', SpecIndex)
@@ -363,6 +385,9 @@ class Spectra(ABCSpectra, MetaDataFrame):
       
       # Intensity data-related stuff
       norm = dfkwargs.pop('norm', None)
+      dtype = dfkwargs.pop('dtype', None)
+      if dtype is None:
+         dtype = pvconfig.DTYPE
 
       # Time index-related keywords  (note, the are only used if a 
       # DatetimeIndex is not passed in)
@@ -376,6 +401,10 @@ class Spectra(ABCSpectra, MetaDataFrame):
 
       super(Spectra, self).__init__(*dfargs, **dfkwargs)        
 
+      # Storage dtype policy; counts are cast too, not just floats
+      self._dtype = None if dtype is None else np.dtype(dtype)
+      self._frame = self._as_dtype(self._frame, kinds='iuf')
+
       # Iunit
       self.iunit = iunit
 
@@ -549,7 +578,8 @@ class Spectra(ABCSpectra, MetaDataFrame):
    def reference(self):
       """ This is stored as a Series unless user has set it otherwise."""
       if self._reference is not None:
-         return Spectrum(self._reference.values, self._reference.index)
+         # Copy; _reference may be shared with other Spectra (see _transfer)
+         return Spectrum(self._reference.values.copy(), self._reference.index)
 
    @reference.setter
    def reference(self, reference, force_series=True):  
@@ -619,13 +649,14 @@ class Spectra(ABCSpectra, MetaDataFrame):
          return ref
 
       # First, try ref is itself a column name
+      # Column lookups are copied so reference doesn't view into self._frame
       if ref in self._frame.columns:
-         rout=self._frame[ref]
+         rout=self._frame[ref].copy()
 
       # If rtemp is an integer, return that column value.  
       # NOTE: IF COLUMN NAMES ARE ALSO INTEGERS, THIS CAN BE PROBLEMATIC.
       elif isinstance(ref, int):
-         rout=self._frame[self._frame.columns[ref]]        
+         rout=self._frame[self._frame.columns[ref]].copy()        
 
       # Finally if ref is itself a series, make sure it has the correct spectral index
       elif isinstance(ref, Series):
@@ -739,12 +770,13 @@ class Spectra(ABCSpectra, MetaDataFrame):
 
 
                # Integration isn't the same as sum because it takes the units of the x-axis into account through x
-               # parameter.  If interval is odd, last interval is used w/ trapezoidal rule
-               elif apply_fcn.lower() == 'simps':
-                  series=dfcut.apply(integrate.simps, x=xvals, even='last')
-
-               elif apply_fcn.lower() == 'trapz':
-                  series=dfcut.apply(integrate.trapz, x=xvals)     
+               # parameter.  If interval is odd, first interval is used w/ trapezoidal rule.  All columns at once,
+               # as one product with the rule's weights over the cut (see quadrature.py)
+               elif apply_fcn.lower() in pvquad.RULES:
+                  rule = apply_fcn.lower()
+                  area = pvquad.integrate(dfcut._frame.values, dfcut.index, rule)
+                  series = Spectrum.from_series(self, Series(area, index=self.columns))
+                  series.specifier = rule
 
                elif apply_fcn.lower() == 'romb':
                   series=dfcut.apply(integrate.romb, x=xvals)
@@ -769,7 +801,10 @@ class Spectra(ABCSpectra, MetaDataFrame):
       # Out is a series (e.g. Area)
       if len(dflist) == 1:
          return dflist[0]
-      return self._transfer(DataFrame(dflist, index=snames))
+      # Label by self.columns (a list of Spectrum isn't aligned by pandas)
+      dflist = [getattr(series, 'values', series) for series in dflist]
+      return self._transfer(DataFrame(dflist, index=snames, 
+                                      columns=self.columns))
 
 
    def boxcar(self, binwidth, axis=1):
@@ -781,14 +816,84 @@ class Spectra(ABCSpectra, MetaDataFrame):
          Width of the bin.  EG 10minutes or 5 seconds.
          
       axis: 0 or 1
-         Average over rows or columns, respectively.
+         Average over rows or columns, respectively.  Bins are labeled by 
+         their centers (datetimes on a DateTime axis).
       """
-      if axis == 0 and self.varunit == 'dti':
-         raise NotImplementedError('Cannot pvutils.boxcar along DateTime axis.')
-
       return self._transfer(pvutils.boxcar(self, binwidth=binwidth, axis=axis))
 
 
+   def smooth(self, kind='savgol', window=11, polyorder=2, sigma=None, 
+              mode='nearest', columns=None):
+      """ Smoothed copy; all spectra are filtered at once along the index,
+      which is kept (unlike boxcar()).  See filters.py.
+
+      Parameters
+      ----------
+      kind: 'savgol', 'mean' (moving average) or 'gaussian'.
+
+      window: int
+         Points per window ('savgol': odd).
+
+      polyorder: int
+         Order of the 'savgol' polynomial.
+
+      sigma: float
+         Width of the 'gaussian' kernel in points.
+
+      mode: str
+         Extension at the edges; see scipy.ndimage.convolve1d.
+
+      columns: int
+         Filter this many columns at a time (memory mapped data defaults to
+         pvconfig.CHUNKCOLUMNS).
+      """
+      weights = pvfilters.kernel(kind, window=window, polyorder=polyorder,
+                                 sigma=sigma)
+      return pvfilters.apply(self, weights, mode=mode, columns=columns)
+
+
+   def derivative(self, order=1, kind='savgol', window=11, polyorder=None,
+                  sigma=None, mode='nearest', columns=None):
+      """ Derivative spectra (d^order I / dx^order, x in specunits) of 
+      smoothed data.  The index is assumed evenly spaced.
+
+      Parameters
+      ----------
+      order: int
+         Order of the derivative.
+
+      kind: 'savgol' or 'gaussian'
+         Smoothing/differentiation kernel; see smooth().
+
+      polyorder: int
+         Order of the 'savgol' polynomial.  Defaults to order + 1, at least 
+         2.
+      """
+      if polyorder is None:
+         polyorder = max(2, order + 1)
+      delta = pvfilters.spacing(np.asarray(self.index, dtype=float))
+      weights = pvfilters.kernel(kind, window=window, polyorder=polyorder,
+                                 sigma=sigma, deriv=order, delta=delta)
+      return pvfilters.apply(self, weights, mode=mode, columns=columns)
+
+
+   def find_peaks(self, npeaks=1, refine='parabolic', window=1, 
+                  min_height=None, columns=None):
+      """ Position, height, FWHM and area of the npeaks highest peaks of 
+      every spectrum, found for all columns at once; see 
+      skspec.peaks.find_peaks.
+
+      Returns
+      -------
+      Panel of ('position', 'height', 'fwhm', 'area') x self.columns x peak
+      number (0 is the highest).  Pass it to skspec.peaks.track_peaks to 
+      follow peaks across columns.
+      """
+      return pvpeaks.find_peaks(self, npeaks=npeaks, refine=refine, 
+                                window=window, min_height=min_height,
+                                columns=columns)
+
+
    def area(self, apply_fcn='simps'):
       """ Returns total area under the spectra vs. time curve.  To choose a slice of the spectrum,
           call wavelength_slices with appropriate ranges and an apply_fcn appropriate to style of integration.
@@ -816,6 +921,50 @@ class Spectra(ABCSpectra, MetaDataFrame):
       return out
 
 
+   def lazy(self):
+      """ Deferred chain of operations on self, run by compute(); eg
+      ts.lazy().sub_base().nearby[450:700].as_norm('a').compute().  Slices
+      are moved ahead of element-wise steps and consecutive element-wise 
+      steps are done in one pass, so there are no intermediate Spectra.  
+      See skspec.core.lazy."""
+      return pvlazy.LazySpectra(self)
+
+
+   def chunks(self, columns=None):
+      """ Iterate over self a block of columns at a time, for out-of-core 
+      processing of memory mapped Spectra (see from_memmap).  
+
+      Parameters
+      ----------
+      columns: int
+         Columns per chunk; default config.CHUNKCOLUMNS.
+
+      Notes
+      -----
+         Chunks are copy-on-write views (iloc) of self.  For chunked 
+         mean/sum/area etc..., see skspec.core.chunks.
+      """
+      return pvchunks.iter_chunks(self, columns)
+
+
+   def map_reduce(self, mapper, reducer=None, columns=None):
+      """ Apply mapper to each of self.chunks(columns) and combine the 
+      results; eg ts.map_reduce(lambda c: c.area()) is ts.area(), but
+      only one chunk is in memory at a time.
+
+      Parameters
+      ----------
+      mapper: function of a chunk (Spectra).
+
+      reducer: function(accumulated, result), folded over the chunk results.
+         If None, results are per column, and are concatenated.
+
+      columns: int
+         Columns per chunk; default config.CHUNKCOLUMNS.
+      """
+      return pvchunks.map_reduce(self, mapper, reducer, columns)
+
+
    # Spectral column attributes/properties
    ### SPECUNIT IS JUST CARRIED THROUGH ON DF._INDEX.  ANYCHANGES WILL
    ### RETURN A NEW INDEX, AND ALSO UPDATE SPECUNIT IN SAID INDEX!
@@ -861,15 +1010,78 @@ class Spectra(ABCSpectra, MetaDataFrame):
 
    def as_specunit(self, unit):
       """ Returns new dataframe with different spectral unit on the index."""
-      tsout = self.deepcopy()
-      tsout.specunit = unit
-      return tsout       
+      def _convert():
+         tsout = self._view()
+         tsout.specunit = unit
+         return tsout       
+      return self._cached_rep(_convert, specunit=unit)
 
    def as_varunit(self, unit):
       """ Returns new dataframe with different spectral unit on the index."""
-      tsout = self.deepcopy()
-      tsout.varunit = unit
-      return tsout   
+      def _convert():
+         tsout = self._view()
+         tsout.varunit = unit
+         return tsout   
+      return self._cached_rep(_convert, varunit=unit)
+
+   # Representation cache
+   # --------------------
+   def enable_repcache(self, maxbytes=None):
+      """ Cache the outputs of as_norm(), as_specunit() and as_varunit(),
+      so repeated calls on unchanged data don't repeat the conversion. 
+      Entries are keyed by (norm, reference, specunit, varunit), held up to
+      maxbytes (default pvconfig.REPCACHE_BYTES) with least recently used
+      eviction, and dropped whenever the data, reference or baseline 
+      change.  Hit/miss statistics are in self.repcache.stats."""
+      if maxbytes is None:
+         maxbytes = pvconfig.REPCACHE_BYTES
+      self._repcache = RepCache(maxbytes)
+
+   def disable_repcache(self):
+      self._repcache = None
+
+   @property
+   def repcache(self):
+      """ RepCache of self (None unless enable_repcache() was called)."""
+      return self._repcache
+
+   def _clear_repcache(self):
+      if self._repcache is not None:
+         self._repcache.clear()
+
+   def _cached_rep(self, convert, **target):
+      """ Return convert(), a new Spectra in another representation, from
+      self.repcache if possible.  target holds the norm/specunit/varunit 
+      that convert() changes.  Callers get a copy-on-write view of the 
+      cached object, so changing it in place can't corrupt the cache."""
+      cache = self._repcache
+      if cache is None:
+         return convert()
+
+      key = (target.get('norm', self.norm), id(self._reference),
+             target.get('specunit', self.specunit), 
+             target.get('varunit', self.varunit))
+      out = cache.get(key)
+      if out is None:
+         out = convert()
+         cache.put(key, out, frame_nbytes(out))
+      return out._view()
+
+   def __setattr__(self, name, value):
+      """ Rebinding the data, axes, reference or baseline invalidates the 
+      representation cache."""
+      if name in ('_frame', 'index', 'columns', '_reference', '_baseline'):
+         self._clear_repcache()
+      super(Spectra, self).__setattr__(name, value)
+
+   def _cow_gate(self):
+      """ Called before every in place write to self._frame.  A shared 
+      memory mapped frame is copied to a temporary map, not to RAM."""
+      self._clear_repcache()
+      if pvmemmap.memmap_base(self._frame) is not None and self._shared():
+         self._frame = pvmemmap.copy_frame(self._frame)
+         self._unshare()
+      super(Spectra, self)._cow_gate()
 
    # Still want this?
    def set_specindex(self, start=None, stop=None, spacing=None, unit=None):
@@ -942,7 +1154,7 @@ class Spectra(ABCSpectra, MetaDataFrame):
       if not start or not stop:
          raise badcount_error(2,1,3, argnames='start, stop, keywords')
 
-      self._frame.index = self._strict_index(np.linspace(start, stop, numpts), unit=unit)
+      self.index = self._strict_index(np.linspace(start, stop, numpts), unit=unit)
 
 
    ###################################
@@ -965,36 +1177,44 @@ class Spectra(ABCSpectra, MetaDataFrame):
             calling ts.sub() from an outside program does in fact work.  Behavior is due
             to way in which python classes deal with overwrites of self."""
 
+      baseline = self._base_plan('sub_base')
+      if baseline is not None:
+         self._frame_iop('sub', baseline, axis=0)
+
+   def add_base(self):
+      """ Adds baseline to data that currently has it subtracted."""
+      baseline = self._base_plan('add_base')
+      if baseline is not None:
+         self._frame_iop('add', baseline, axis=0)
+
+   def _base_plan(self, method):
+      """ Metadata half of sub_base()/add_base() (method): updates the 
+      reference and base_sub, and returns the baseline to subtract from/add
+      to the data, or None if there is nothing to do."""
+
       # self._baseline is not none
       self._base_gate()
 
-      # Only subtract if baseline isn't currently subtracted
-      if not self._base_sub:
+      if method == 'sub_base':
+         # Only subtract if baseline isn't currently subtracted
+         if self._base_sub:
+            logger.warn('Baseline is already subtracted.')
+            return None
          # Index, although should be correct, is type object and is getting falses for entries...
          logger.critical('Subtracting baseline, but may not have all: elements being equal.  Fix index')
-         self._frame = self._frame.sub(self._baseline, axis=0)
          if self._reference is not None:
             self._reference = self._reference.sub(self._baseline, axis=0)
          self._base_sub = True
 
       else:
-         logger.warn('Baseline is already subtracted.')
-
-   def add_base(self):
-      """ Adds baseline to data that currently has it subtracted."""
-
-      # self._baseline is not none
-      self._base_gate()
-
-      # Only add if baseline is currently in a subtracted state
-      if self._base_sub:
-         self._frame = self._frame.add(self._baseline, axis=0)   
+         # Only add if baseline is currently in a subtracted state
+         if not self._base_sub:
+            return None
          if self._reference is not None:
             self._reference = self._reference.add(self._baseline, axis=0)
-            self._base_sub = False
+         self._base_sub = False
 
-      #else:
-         #print 'raise waring? already added'        
+      return self._baseline
 
    @property
    def base_sub(self):
@@ -1073,7 +1293,7 @@ class Spectra(ABCSpectra, MetaDataFrame):
    def baseline(self):
       # Should these be stored as specrum?  Cause right now, just converting on return
       if self._baseline is not None:
-         return Spectrum(self._baseline.values, index=self._baseline.index)
+         return Spectrum(self._baseline.values.copy(), index=self._baseline.index)
 
 
    @baseline.setter
@@ -1126,81 +1346,101 @@ class Spectra(ABCSpectra, MetaDataFrame):
             unit=None
 
 
-      tsout = self.deepcopy()        
-      tsout._set_normtype(unit, reference)
-      return tsout
+      def _convert():
+         # Shares self's data until _set_normtype() writes the output
+         tsout = self._view()
+         tsout._set_normtype(unit, reference)
+         return tsout
+
+      # An explicit reference isn't part of the cache key
+      if reference is not None:
+         return _convert()
+      return self._cached_rep(_convert, norm=_valid_norm(unit))
 
 
    def _set_normtype(self, sout, ref=None):
       """Function used to change spectral intensity representation in a convertible manner. Not called on
-      initilization of Spectra(); rather, only called by as_norm() method."""
+      initilization of Spectra(); rather, only called by as_norm() method.
 
-      sout = _valid_norm(sout)
-      sin = self._normtype
-      df = self._frame #Could also work just by calling self...
+      Conversions are done by skspec.core.norms.convert(), in place in the
+      frame's buffer unless it's shared (copy-on-write, see _transfer and
+      MetaPandasObject.__init__) or read-only.  New outputs of memory mapped data go to a temporary map."""
+
+      plan = self._norm_plan(sout, ref)
 
       # Corner case, for compatibility with reference.setter
-      if sin==None and sout==None:
+      if plan is None:
          return
+      sin, sout, convref, newref, rout = plan
+
+      df = self._frame
+      blocks = df._data.blocks
+      values = df.values
+      inplace = (not self._shared() and len(blocks) == 1 and 
+                 values.dtype.kind == 'f' and values.flags.writeable and
+                 np.may_share_memory(values, blocks[0].values))
+
+      if inplace:
+         self._clear_repcache()
+         pvnorms.convert(values, sin, sout, ref=convref, newref=newref, 
+                         out=values)
+      else:
+         dtype = values.dtype if values.dtype.kind in 'fc' else np.float64
+         out = pvmemmap.empty_values(df, dtype)
+         pvnorms.convert(values, sin, sout, ref=convref, newref=newref, 
+                         out=out)
+         self._frame = DataFrame(out, index=df.index, columns=df.columns,
+                                 copy=False)
+         self._unshare()
 
-      ########################################################################
-      # Case 1: User converting from full data down to referenced data.#####
-      ########################################################################
-      if sin==None and sout != None:
-         rout=self._reference_valid(ref)
-
-         # If user tries to downconvert but doesn't pass reference, use stored one
-         if rout == None:
-            rout = self._reference
-
-         # If ref not passed, use current reference.  Want to make sure it is 
-         # not none, but have to roundabout truthtest
-         if isinstance(rout, NoneType):
-            raise TypeError('Cannot convert spectrum to norm %s without a reference'%sout)                
-         else:
-            df=pvutils.divby(df, divisor=rout)
-            df=df.apply(from_T[sout])                    
-         #Assumes typeerror is due to rout not being a series/array, but doesn't further test it.  EG do another
-         #typeerror check of try: if rout == None: raise error
-
-
-      ##############################################################   
-      # Case 2: Changing spectral representation of converted data.#
-      ##############################################################     
-      elif sin !=None and sout != None:
+      self._reference=rout       
+      self._normtype=sout        
 
-         # If user changing reference on the fly, need to change ref ###
-         if not isinstance(ref, NoneType): #and ref != self._reference:
-            rout=self._reference_valid(ref)
+   def _norm_plan(self, sout, ref=None):
+      """ What _set_normtype(sout, ref) does, without touching the data:
+      (sin, sout, convref, newref, rout), where the first four are the
+      arguments of skspec.core.norms.convert() and rout is the reference
+      afterwards.  None if there is nothing to convert."""
 
-            # Make this it's own method called change reference?
-            df=df.apply(to_T[sin])
-            df=df.mul(self._reference, axis=0)  
-            df=pvutils.divby(df, divisor=rout)
-            df=df.apply(from_T[sout])                        
+      sout = _valid_norm(sout)
+      sin = self._normtype
+      newref = None
 
+      if sin is None and sout is None:
+         return None
 
+      # Case 1: User converting from full data down to referenced data.
+      # If user tries to downconvert but doesn't pass reference, use stored one
+      if sin is None and sout is not None:
+         rout = self._reference_valid(ref)
+         if rout is None:
+            rout = self._reference
+         if rout is None:
+            raise TypeError('Cannot convert spectrum to norm %s without a reference'%sout)                
+         convref = rout
+
+      # Case 2: Changing spectral representation of converted data.  If user 
+      # changing reference on the fly, data is re-referenced
+      elif sin is not None and sout is not None:
+         if ref is not None:
+            rout = self._reference_valid(ref)
+            newref = rout
          else:
-            rout=self._reference #For sake of consistent transferring at end of this function
-            df=df.apply(to_T[sin])
-            df=df.apply(from_T[sout])        
-
-
-      ###########################################################    
-      # Case 3: User converting referenced data up to full data.#
-      #############################################################
-      elif sin !=None and sout==None:
-         rout=self._reference_valid(ref)
-
-         if rout == None:
-            rout=self._reference
+            rout = self._reference 
+         convref = self._reference
 
-         df=df.apply(to_T[sin])
-         df=df.mul(rout, axis=0)  #Multiply up!
+      # Case 3: User converting referenced data up to full data.
+      else:
+         rout = self._reference_valid(ref)
+         if rout is None:
+            rout = self._reference
+         convref = rout
 
-      self._reference=rout       
-      self._normtype=sout        
-      self._frame=df    
+      if convref is not None:
+         convref = np.asarray(convref)
+      if newref is not None:
+         newref = np.asarray(newref)
+      return sin, sout, convref, newref, rout
 
    ############################################ 
    #####Overwrite MetaDataFrame behavior ########
@@ -1342,6 +1582,14 @@ class Spectra(ABCSpectra, MetaDataFrame):
       attribute (such as reference) will end with a name=_reference afterwards.  Added a hack
       to intercept this highly common attribute and apply to output."""
 
+      if attr == '_slice' and attr in self._cnsvdmeth:
+         tsout = self._slice_view(*fcnargs, **fcnkwargs)
+         if tsout is not None:
+            return tsout
+
+      if fcnkwargs.get('inplace', False):
+         self._cow_gate()
+
       out=getattr(self._frame, attr)(*fcnargs, **fcnkwargs)
 
       # If operation returns a dataframe, return new Spectra
@@ -1396,6 +1644,74 @@ class Spectra(ABCSpectra, MetaDataFrame):
       else:
          return out
       
+   @property
+   def dtype(self):
+      """ Storage dtype policy (None if not set); see pvconfig.DTYPE."""
+      return self._dtype
+
+   def _as_dtype(self, frame, kinds='f'):
+      """ frame cast to self.dtype, if frame is all numeric data of kinds
+      (numpy dtype.kind; default floating point only, so comparisons etc...
+      aren't cast).  Otherwise, frame is returned as is."""
+      dtype = self._dtype
+      if dtype is None:
+         return frame
+      blocks = frame._data.blocks
+      if all(b.dtype.kind in kinds for b in blocks) and \
+         any(b.dtype != dtype for b in blocks):
+         return frame.astype(dtype)
+      return frame
+
+   def _transfer(self, dfnew):
+      """ Keeps the dtype policy: outputs that pandas upcast (eg by
+      alignment with a float64 Series) are cast back to self.dtype."""
+      return super(Spectra, self)._transfer(self._as_dtype(dfnew))
+
+   def astype(self, dtype, **kwargs):
+      """ Copy of self cast to dtype.  An explicit cast overrides the dtype
+      policy: the output keeps dtype (its policy is dtype, or None if dtype
+      isn't floating point)."""
+      out = super(Spectra, self)._transfer(self._frame.astype(dtype, **kwargs))
+      dtype = np.dtype(dtype)
+      out._dtype = dtype if dtype.kind == 'f' else None
+      return out
+
+   def _iop(self, opname, x):
+      """ In place operators (ts -= x, ts *= x...).  The frame is changed 
+      in place (see MetaPandasObject._frame_iop).  As in _framegetattr(), 
+      conserved attributes are only operated on if opname (eg 'sub') is in
+      self._cnsvdmeth; since they may be shared with other Spectra, they
+      are rebound rather than changed in place.
+      """
+      self._frame_iop(opname, x)
+      if opname in self._cnsvdmeth:
+         x = getattr(x, '_frame', x)
+         for attr, value in self.cnsvdattr.iteritems():
+            if value is not None:
+               setattr(self, attr, getattr(value, opname)(x))
+      return self
+
+   def _slice_view(self, slobj, axis=0, typ=None):
+      """ Fast path of _framegetattr('_slice'), which backs ix, loc, iloc and
+      nearby range slicing.  The sliced frame is a view (copy-on-write, see 
+      _transfer).  Conserved attributes share self.index, so each is sliced
+      the same way (also a view) rather than aligned into a new DataFrame 
+      first.  Column slices leave them untouched.  Returns None if a 
+      conserved attribute doesn't share self.index.
+      """
+      nrows = len(self._frame.index)
+      cnsvd = dict((k, v) for k, v in self.cnsvdattr.iteritems() 
+                   if v is not None)
+      if not all(isinstance(v, Series) and len(v) == nrows
+                 for v in cnsvd.values()):
+         return None
+
+      tsout = self._transfer(self._frame._slice(slobj, axis=axis, typ=typ))
+      if axis == 0:
+         for attr, value in cnsvd.iteritems():
+            setattr(tsout, attr, value._slice(slobj, typ=typ))
+      return tsout
+
    @property
    def _header(self):
       
@@ -1483,19 +1799,46 @@ class Spectra(ABCSpectra, MetaDataFrame):
 
 
    def split_by(self, n, axis=1, stack=True, **stackkwargs):
-      """ Slice data into n subsets.
+      """ Slice data into n contiguous subsets along axis (1: columns, 0: 
+      spectral index).  Subsets are copy-on-write views of self, so 
+      splitting copies no data (eg to farm the pieces out to workers); when
+      splitting the index, reference and baseline are sliced with it.
 
       Notes
       -----
-      If n does not evenly divide the axis, the final element returned tends
-      to be larger than the others (culmination of rounding down iteratively)
-      and a warning is raised.
+      If n does not evenly divide the axis, the first subsets are one 
+      longer than the others (see utilities.split_bounds) and a warning is 
+      logged.
       """
-      ts_split = pvutils.split_by(self, n, axis=1, astype=list)
+      size = self.shape[axis]
+      bounds = pvutils.split_bounds(size, n)
+      if size % n:
+         logger.warn("Returning uneven sampling for (n=%s) along axis %s "
+                     "of size %s" % (n, axis, size))
+      return self._split(bounds, axis, stack, **stackkwargs)
+
+
+   def _split(self, bounds, axis=1, stack=True, **stackkwargs):
+      """ Views of self from [bounds[i], bounds[i+1]) along axis, as a
+      SpecStack (keys spec_0, spec_1...) or a list."""
+      pieces = []
+      frames = pvutils.split_at(self._frame, bounds, axis=axis)
+      for start, stop, piece in zip(bounds[:-1], bounds[1:], frames):
+         out = self._transfer(piece)
+         # Reference and baseline are aligned with the index (see 
+         # _reference_valid); slice them the same way
+         if axis == 0:
+            for attr in ('_reference', '_baseline'):
+               value = getattr(self, attr)
+               if value is not None:
+                  setattr(out, attr, value.iloc[start:stop])
+         pieces.append(out)
+
+      if not stack:
+         return pieces
       stackkwargs.setdefault('name', self.name)
-      if stack:
-         ts_split = SpecStack(ts_split, **stackkwargs)
-      return ts_split
+      keys = [SpecStack.itemlabel + str(i) for i in range(len(pieces))]
+      return SpecStack(pieces, keys=keys, **stackkwargs)
 
 
    # Output
@@ -1543,6 +1886,26 @@ class Spectra(ABCSpectra, MetaDataFrame):
          o.close()
 
 
+   def to_memmap(self, path, dtype=None):
+      """ Output to a raw binary file that can be memory mapped by 
+      from_memmap(), for runs too big to analyze in RAM.
+
+          Parameters:
+          ----------
+             path: string path to outfile destination.  Metadata (axes, 
+                reference, baseline...) is written to path.mdf
+
+             dtype: storage dtype, eg 'float32' to halve the file.  
+                Defaults to the dtype of the data.
+
+          Notes:
+          ------
+             Data is written a chunk of columns at a time, so self may 
+             itself be memory mapped.  See skspec.core.memmap.
+      """
+      pvmemmap.save(self, path, dtype=dtype)
+
+
    # CLASS METHODS
    # -------------
 
@@ -1575,7 +1938,8 @@ class Spectra(ABCSpectra, MetaDataFrame):
           set the specunit to 'dti' automatically, unles specifically set
           as None.
 
-      **kwargs: Any valid spectra or pandas readcsv() kwargs.       
+      **kwargs: Any valid spectra or pandas readcsv() kwargs.  dtype 
+          (unless a dict of column:dtype) sets the Spectra dtype.
 
       Returns: Spectra
       """
@@ -1640,6 +2004,11 @@ class Spectra(ABCSpectra, MetaDataFrame):
             _CSVKWDS[kw] = kwargs[kw]
             del kwargs[kw]
 
+      # A single dtype is the Spectra dtype; only dicts go to the parser
+      if _CSVKWDS['dtype'] is not None and not isinstance(_CSVKWDS['dtype'], dict):
+         kwargs['dtype'] = _CSVKWDS['dtype']
+         _CSVKWDS['dtype'] = None
+
       df = read_csv(filepath_or_buffer, **_CSVKWDS)
 
       if header_datetime:
@@ -1670,8 +2039,36 @@ class Spectra(ABCSpectra, MetaDataFrame):
                                "specunit = 'dti' or 'None', received %s" % kwargs['specunit'])
 
          else:
-            kwargs['specunit'] = 'dti' 
-      return cls(df, **kwargs) 
+            kwargs['specunit'] = 'dti'
+
+      # The parsed frame isn't anyone else's; writes can go into it
+      out = cls(df, **kwargs)
+      out._cow = False
+      return out
+
+
+   @classmethod
+   def from_memmap(cls, path, mode='r'):
+      """ Read a file written by to_memmap().  The data is a numpy.memmap
+      of the file, so only the pages that are used get read; eg
+      ts.nearby[500:600] or ts.iloc[:, 0:100] page in just that slice.
+
+      Parameters:
+      ----------
+      path: string path to the data file (metadata is read from path.mdf).
+
+      mode: numpy.memmap mode.  'r' (default) is read-only, so in place
+         operations (ts -= ...) raise; 'r+' writes them to the file; 'c' 
+         keeps them in memory.  Once a slice shares the data, the object
+         written to first gets a copy, as for in memory Spectra.
+
+      Notes:
+      ------
+      Returns an object of the class that was saved.  New full size
+      outputs (eg as_norm()) are stored in temporary memmaps, in
+      config.MEMMAP_TMPDIR; see skspec.core.memmap.
+      """
+      return pvmemmap.load(path, mode=mode)
 
 
    @classmethod
@@ -171,6 +171,7 @@ class TimeIndex(ConversionIndex):
                          "datetimeindex %s and object %s" % (len(dti), len(self)))
                 
         self._stored_dti = dti
+        self._monotonic = None
 
 
     def __getslice__(self, start, stop) :
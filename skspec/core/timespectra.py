@@ -1,11 +1,14 @@
 """Provides core "TimeSpectra" class and associated utilities."""
 
 import logging
+import numpy as np
 from skspec.logger import decode_lvl, logclass
 from pandas import DatetimeIndex, Index
 from skspec.core.spectra import _valid_xunit
 from skspec.units.intvlunit import INTVLUNITS, DatetimeCanonicalError
 from skspec.core.timeindex import TimeIndex
+import skspec.core.binning as pvbinning
+import skspec.core.rolling as pvrolling
 from spectra import Spectra
 
 logger = logging.getLogger(__name__) 
@@ -37,6 +40,71 @@ class TimeSpectra(Spectra):
         super(TimeSpectra, self).__init__(*dfargs, **dfkwargs)
         
 
+    def resample(self, freq, how='mean', label='left'):
+        """ Bin the spectra into fixed time intervals, eg to downsample a long
+        run before correlation analysis.  Intervals are [left, right), aligned
+        on multiples of freq like pandas resample; empty ones are dropped.
+        Irregular acquisition times are binned by their exact timestamps.
+
+        Parameters
+        ----------
+        freq: str, DateOffset or timedelta
+            Interval length, eg '10s', '1min'; with an interval varunit 
+            (eg 's'), it may also be a width in units of varunit.
+
+        how: str
+            'mean', 'sum', 'median' or 'weighted' (see binning.reduce_groups).
+
+        label: str
+            Label each interval by its 'left' or 'right' edge.
+        """
+        return self._transfer(pvbinning.resample(self, freq, axis=1, how=how, 
+                                                 label=label))
+
+
+    def split_by(self, n, axis=1, stack=True, **stackkwargs):
+        """ Slice data into n contiguous subsets along axis, as views (see
+        Spectra.split_by).  n may also be a duration such as '5min' or a
+        timedelta: the time axis is then cut into consecutive intervals of
+        that length from the first acquisition time, [t0, t0 + n), 
+        [t0 + n, t0 + 2n)... (empty intervals are skipped).
+        """
+        if axis == 1 and pvbinning.is_frequency(n):
+            times = np.asarray(self.columns.convert('ns'), dtype=float)
+            codes = times // pvbinning._nanos(n)
+            bounds = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1,
+                                     [len(codes)]))
+            return self._split(bounds, axis, stack, **stackkwargs)
+        return super(TimeSpectra, self).split_by(n, axis=axis, stack=stack,
+                                                 **stackkwargs)
+
+
+    def rolling(self, window, unit=None, min_periods=None):
+        """ Moving window statistics along the time axis, eg for drift
+        detection or moving-window 2D correlation.  Returns a Rolling object
+        whose count(), sum(), mean(), var(), std(), min() and max() give a
+        TimeSpectra of the same shape, units and metadata; each column holds
+        the statistic of the trailing window ending there.  Costs are
+        independent of the window size (see core.rolling).
+
+        Parameters
+        ----------
+        window: int, float, str or timedelta
+            Samples (int), or a duration: '30s', '5min', a timedelta, or a
+            number in units of unit (default: the varunit, if an interval).
+
+        unit: str
+            Time unit of a numeric window, eg 's' or 'm'.  The columns are
+            converted with TimeIndex.convert.
+
+        min_periods: int
+            Fewest values in a window for a result (else NaN).  Defaults to
+            the full window for samples, 1 for durations.
+        """
+        return pvrolling.Rolling(self, window, unit=unit,
+                                 min_periods=min_periods)
+
+
 
 ## TESTING ###
 if __name__ == '__main__':
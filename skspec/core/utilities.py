@@ -12,6 +12,7 @@ from types import GeneratorType
 from skspec.pandas_utils.dataframeserial import _get_metadict
 from skspec.exceptions import badvalue_error
 import skspec.config as pvconfig
+import skspec.core.binning as pvbinning
 
 import logging
 logger = logging.getLogger(__name__) 
@@ -152,126 +153,81 @@ def divby(df, divisor=0, axis=0, sameshape=True):
 
 def boxcar(df, binwidth, axis=0):
     ''' Only works on boxcar for now.  Also, want binwidth and/or binnumber
-    to be inputs but not both. '''
-    if axis==1:
-        binnumber=len(df.columns)/binwidth    
-        counts, binarray=np.histogram(df.columns, bins=binnumber)
-        digiarray=np.digitize(np.asarray(df.columns, dtype=float), binarray)          
-        mapped_series=Series(digiarray, index=df.columns)       
-        dfout=df.groupby(mapped_series, axis=1).mean()
-        dfout.columns=binarray
-    
-    elif axis==0:
-        binnumber=len(df.index)/binwidth  #Converted to int when np.histogram called
-        counts, binarray=np.histogram(df.index, bins=binnumber)
-        digiarray=np.digitize(np.asarray(df.index, dtype=float), binarray)    
-        
-        mapped_series=Series(digiarray, index=df.index)
-        
-        dfout=df.groupby(mapped_series, axis=0).mean()
-        dfout.index=binarray   
-        
-    else:
+    to be inputs but not both.  Averages over len(axis)/binwidth equally 
+    wide bins along axis (0: rows, 1: columns), labeled by bin centers; see
+    binning.py. '''
+    if axis not in (0, 1):
         raise AttributeError('Axis must be 0 (column binning) or 1 (index/row) binning.  You entered %s'%axis)
-    
-    return dfout
+
+    index = getattr(df, '_frame', df).axes[axis]
+    binnumber = len(index)/binwidth
+    edges = pvbinning.uniform_edges(index, binnumber)
+    return pvbinning.rebin_values(df, pvbinning.axis_values(index), edges,
+                                  axis=axis, how='mean')
 
                     
                                 
 
 def digitize_by(df, digitized_bins, binarray, axis=0, avg_fcn='mean', weight_max=None):
     ''' Takes in an array of digitized bins, and then restructures a dataframe
-    based on the bin array'''
-    
-    ### Map the digitized bins to series data with axis same as one that will be collapsed ###
-    if axis == 0:
-        mapped_series=Series(digitized_bins, index=df.index) #No, this isn't wrong, just weird
-    else:
-        #mapped_series=Series(digitized_bins, index=df.columns)
-        mapped_series=Series(digitized_bins, index=df.index)
-    
-    if len(df.shape)==1:
-        if avg_fcn.lower() == 'mean':
-            dfout=df.groupby(mapped_series).mean()  #// is importanmt
-    
-        elif avg_fcn.lower() == 'sum':
-            dfout=df.groupby(mapped_series).sum()
-    
-        ### Rebins according to the sum, and then divides axis or rows by their maxes.
-        ### If I want a normalized array, can call this with bindwidth=1.0
-        elif avg_fcn.lower() == 'weighted':
-            dfout=df.groupby(mapped_series).mean()
-            if weight_max:
-                dfout= dfout.apply(lambda x: x / weight_max)  #These should be float division
-            else:
-                dfout= dfout.apply(lambda x: x/ x.max())
-            
-        else:
-            raise NotImplementedError('%s is not a valid key to df_rebin, must \
-                                     be mean, sum or weighted'%avg_fcn)        
-    
-    elif len(df.shape)==2:
-        if avg_fcn.lower() == 'mean':
-            dfout=df.groupby(mapped_series, axis=axis).mean()
-            dfout.index=binarray
-            
-    
-        elif avg_fcn.lower() == 'sum':
-            dfout=df.groupby(mapped_series, axis=axis).sum()
-    
-        ### Rebins according to the sum, and then divides axis or rows by their maxes.
-        ### If I want a normalized array, can call this with bindwidth=1.0
-        elif avg_fcn.lower() == 'weighted':
-            dfout=df.groupby(mapped_series, axis=axis).mean()
-            if weight_max:                
-                dfout=dfout.apply(lambda x:x / weight_max, axis=axis)
-            else:
-                dfout=dfout.apply(lambda x: x / x.max(), axis=axis)            
-            
-        else:
-            raise NotImplementedError('%s is not a valid key to df_rebin, must \
-                                     be mean, sum or weighted'%avg_fcn)
+    based on the bin array.  Positions along axis with the same digitized 
+    bin are averaged/summed (see binning.reduce_groups for avg_fcn and 
+    weight_max); the result is labeled by binarray if it has one label per 
+    bin, otherwise by the bins themselves.'''
+    return pvbinning.group(df, digitized_bins, axis=axis, 
+                           how=avg_fcn.lower(), weight_max=weight_max, 
+                           labels=binarray)
+
+
+def split_bounds(size, n):
+    """ Boundaries of n contiguous pieces of size positions, as even as 
+    possible: the first size % n pieces are one longer (like 
+    numpy.array_split).  Piece i is [bounds[i], bounds[i+1]).
+    """
+    n = int(n)
+    if n < 1 or n > size:
+        raise UtilsError("Can't split %s positions into n=%s pieces" 
+                         % (size, n))
+    q, r = divmod(size, n)
+    return np.concatenate(([0], np.cumsum([q+1]*r + [q]*(n-r))))
 
-    else:
-        raise NotImplementedError('df_rebin only works with 1-d or 2-d arrays')        
-        
-    return dfout   
+
+def split_at(df, bounds, axis=1):
+    """ Pieces [bounds[i], bounds[i+1]) of df along axis.  These are 
+    positional slices, so they are views of df's data, not copies."""
+    if axis == 0:
+        return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    elif axis == 1:
+        return [df.iloc[:, a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    raise UtilsError('axis must be 0 or 1, got %s' % axis)
 
 
 def split_by(df, n, axis=1, astype=list):
     """ Returns a list of dataframes sampled by n.  For example, a datframe
-    of 20 columns, sampled by n=4, will return 5 evenly spaced dataframes.
-    If uneven samples, will raise warning.  axis=1 for column sampling, axis=0
-    for row sampling.
+    of 20 columns, sampled by n=4, will return 4 dataframes of 5 columns.
+    If uneven samples, the first pieces are one longer (see split_bounds) 
+    and a warning is logged.  axis=1 for column sampling, axis=0 for row 
+    sampling.  Pieces are views of df (see split_at).
     """
-    
-    if n > df.shape[1]:
-        raise UtilsError("Requested samplesize (n=%s) exceeds size along axis %s"
-                         % (n,axis))
-    
-    # Integery guarantees rounding down
-    m = int(float(df.shape[axis]) / n)
-    df_out=[]
-    for i in range(n):
-        if i==n-1:
-            df_out.append(df[df.columns[i*m::]])
-        else:
-            df_out.append(df[df.columns[i*m:(i+1)*m]])
+    size = df.shape[axis]
+    bounds = split_bounds(size, n)
+
+    if size % n:
+        logger.warn("Returning uneven sampling for (n=%s) along axis %s "
+                    "of size %s" % (n, axis, size))
+
+    return astype(split_at(df, bounds, axis=axis))
 
-    if n % df.shape[axis]:
-        logger.warn("Returning uneven sampling for (n=%s) along axis %s"
-                    "of size %s" % (n, axis, df.shape[axis]))
-                    
-    return df_out     
-    
 
 def rebin(df, binwidth, axis=0, avg_fcn='weighted', weight_max=None):
     ''' Pass in an array, this slices and averages it along some spacing increment (bins).
     Axis=0 means averages are computed along row.  axis=1 means averages are computed along column.
     Dataframe already handles most issues, such as if binning in unequal and/or binning is larger than 
     actual length of data along axis.  Aka bin 100 rows by 200 rows/bin.
-    Binwidth is the spacing as in every X entries, take an average.  Width of 3 would be
-    every 3 entries, take an average.
+    Binwidth is the spacing in units of the axis: bins are [k*binwidth, (k+1)*binwidth),
+    labeled by their centers (eg binwidth=10 on an index in nm averages 400-410nm into
+    405nm).  A sequence of (increasing, not necessarily even) bin edges can be passed
+    instead.
     
     Redundant because if series is passed in, the axis keyword causes errors.
     
@@ -285,51 +241,21 @@ def rebin(df, binwidth, axis=0, avg_fcn='weighted', weight_max=None):
     and divide all other column(or row values) by the max.  
     This is not the statistical normaization, which should be added later (X-u / sigma).'''
 
+    frame = getattr(df, '_frame', df)
+    if frame.ndim == 1:
+        axis = 0
+    elif frame.ndim != 2:
+        raise NotImplementedError('df_rebin only works with 1-d or 2-d arrays')        
 
-    if len(df.shape)==1:
-        if avg_fcn.lower() == 'mean':
-            dfout=df.groupby(lambda x:x//binwidth).mean()  #// is importanmt
-    
-        elif avg_fcn.lower() == 'sum':
-            dfout=df.groupby(lambda x:x//binwidth).sum()
-    
-        ### Rebins according to the sum, and then divides axis or rows by their maxes.
-        ### If I want a normalized array, can call this with bindwidth=1.0
-        elif avg_fcn.lower() == 'weighted':
-            dfout=df.groupby(lambda x:x//binwidth).mean()  #Groupby uses int division
-            if weight_max:
-                dfout=dfout.apply(lambda x: x / weight_max)      #Apply uses float division
-            else:
-                dfout=dfout.apply(lambda x: x/ x.max())
-            
-        else:
-            raise NotImplementedError('%s is not a valid key to df_rebin, must \
-                                     be mean, sum or weighted'%avg_fcn)        
-    
-    elif len(df.shape)==2:
-        if avg_fcn.lower() == 'mean':
-            dfout=df.groupby(lambda x:x//binwidth, axis=axis).mean()
-    
-        elif avg_fcn.lower() == 'sum':
-            dfout=df.groupby(lambda x:x//binwidth, axis=axis).sum()
-    
-        ### Rebins according to the sum, and then divides axis or rows by their maxes.
-        ### If I want a normalized array, can call this with bindwidth=1.0
-        elif avg_fcn.lower() == 'weighted':
-            dfout=df.groupby(lambda x:x//binwidth, axis=axis).mean()
-            if weight_max:                
-                dfout=dfout.apply(lambda x:x / weight_max, axis=axis)
-            else:
-                dfout=dfout.apply(lambda x: x / x.max(), axis=axis)            
-            
-        else:
-            raise NotImplementedError('%s is not a valid key to df_rebin, must \
-                                     be mean, sum or weighted'%avg_fcn)
+    if np.ndim(binwidth):
+        return pvbinning.rebin(df, binwidth, axis=axis, how=avg_fcn.lower(), 
+                               weight_max=weight_max)
 
-    else:
-        raise NotImplementedError('df_rebin only works with 1-d or 2-d arrays')        
-        
-    return dfout   
+    x = pvbinning.axis_values(frame.axes[axis])
+    first, last = np.floor(np.nanmin(x) / binwidth), np.floor(np.nanmax(x) / binwidth)
+    edges = binwidth * np.arange(first, last + 2)
+    return pvbinning.rebin_values(df, x, edges, axis=axis, how=avg_fcn.lower(), 
+                                  weight_max=weight_max)
 
 def maxmin_xy(obj, style='max', arg=False, idx=True, val=True):
     ''' Return arg (eg integer index position), index val, and object val
@@ -39,15 +39,22 @@ import logging
 import pandas
 logger = logging.getLogger(__name__) 
 
+from collections import deque
 from math import pi
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 import numpy as np
+from scipy.linalg.blas import get_blas_funcs
 
 from skspec.core.anyspectra import AnyFrame 
 from skspec.plotting.correlation_plot import corr2d, corr3d, corr_multi
 import skspec.config as pvconfig
 import skspec.core.utilities as pvutils
+import skspec.core.chunks as pvchunks
+import skspec.core.memmap as pvmemmap
 from skspec.core.specindex import SpecIndex
-from skspec.pandas_utils.metadframe import MetaDataFrame
+from skspec.core.abcindex import nearest, ConversionIndex
+from skspec.pandas_utils.metadframe import MetaDataFrame, MetaSeries
 from pca_lite import PCA
 #from pcakernel import PCA
 
@@ -56,21 +63,223 @@ from pca_lite import PCA
 #     data_trans = matrix.transpose()
 #    return (data_trans - vector).transpose()
 
-def noda_matrix(length):
+# Last noda_matrix (length, dtype): matrix; see noda_matrix
+_NODA_CACHE = {}
+
+def noda_matrix(length, dtype=float):
     ''' Length is the number of timepoints/columns in the dataframe. 
-       Returns the hilbert noda Transformation matrix.'''
-
-    # XXX: how to vectorize?
-    Njk = np.empty( (length,length))
-    for j in range(length):
-        for k in range(length):
-            if j==k:
-                Njk[j,k]=0
-            else:
-                Njk[j, k]=1.0 /  ( pi * (k-j)  )  #DOUBLE CHECK j-i with old verison.    
+       Returns the hilbert noda Transformation matrix.
+
+       The most recent matrix is cached, so it is read-only; copy it to 
+       modify it.  Corr2d doesn't need it (see noda_transform).'''
+    key = (length, np.dtype(dtype))
+    Njk = _NODA_CACHE.get(key)
+    if Njk is None:
+        Njk = _noda_block(slice(0, length), slice(0, length), dtype)
+        Njk.flags.writeable = False
+        _NODA_CACHE.clear()
+        _NODA_CACHE[key] = Njk
     return Njk
 
 
+def _noda_block(rows, cols, dtype=float):
+    ''' Block noda_matrix(M)[rows, cols] for slices rows, cols.'''
+    j = np.arange(rows.start, rows.stop).reshape(-1, 1)
+    k = np.arange(cols.start, cols.stop)
+    diff = pi * (k - j)
+    diff[diff == 0] = np.inf
+    return (1.0 / diff).astype(dtype)
+
+
+# Values per block of rows in noda_transform(method='fft')
+FFTBLOCK = 2**22
+
+def noda_transform(dyn, method='fft'):
+    ''' Hilbert-Noda transform of each row of dyn (N x M) along the 
+    perturbation axis: np.dot(dyn, noda_matrix(M).T), ie 
+    sum_k dyn[:, k] / (pi * (k - j)).  The asynchronous spectrum is
+    np.dot(dyn, noda_transform(conj(dyn)).T) / (M - 1).
+
+    method='fft' convolves the rows with the kernel -1 / (pi * m) by FFT,
+    padded so that nothing wraps around; this is exact (to rounding), 
+    O(N M log M) and only needs memory for a block of rows.  'dense' 
+    multiplies by noda_matrix: O(N M**2) time and O(M**2) memory, kept for
+    validation.
+    '''
+    dyn = np.asarray(dyn)
+    nrows, M = dyn.shape
+    if method == 'dense':
+        return np.dot(dyn, noda_matrix(M, dtype=dyn.dtype).T)
+    elif method != 'fft':
+        raise CorrError('method must be "fft" or "dense", got "%s"' % method)
+
+    # Linear convolution needs 2M - 1 points; the result for j is at j + M-1
+    L = 2**int(np.ceil(np.log2(max(2 * M - 1, 1))))
+    m = np.arange(1 - M, M)
+    m[M - 1] = 1
+    kernel = -1.0 / (pi * m)
+    kernel[M - 1] = 0.0
+
+    if np.iscomplexobj(dyn):
+        fft, ifft = np.fft.fft, np.fft.ifft
+    else:
+        fft, ifft = np.fft.rfft, np.fft.irfft
+    kernel = fft(kernel, L)
+
+    out = np.empty(dyn.shape, dtype=dyn.dtype)
+    step = max(1, FFTBLOCK // L)
+    for start in range(0, nrows, step):
+        block = fft(dyn[start:start+step], L, axis=1)
+        block *= kernel
+        out[start:start+step] = ifft(block, L, axis=1)[:, M-1:2*M-1]
+    return out
+
+
+def chunked_correlation(spec, columns=None, asynchronous=True):
+    ''' Unscaled, mean centered synchronous and asynchronous spectra of 
+    spec (Corr2d(spec).sync_noscale and async_noscale), accumulated
+    spec.chunks(columns) at a time so that spec (eg memory mapped, see 
+    Spectra.from_memmap) is never in memory all at once.
+
+    Reads spec twice.  The first pass, over blocks of rows holding as many
+    values as a chunk, finds the mean spectrum and the Hilbert-Noda 
+    transform of the dynamic spectrum (noda_transform); the transform is 
+    kept in a temporary memmap if spec is memory mapped.  The second pass,
+    over chunks, accumulates both spectra.  Agrees with Corr2d to rounding.
+
+    Returns:
+    --------
+    (sync, async) arrays; async is None if asynchronous is False.
+    '''
+    nspec, M = spec.shape
+    step = pvchunks.chunk_size(columns)
+    values = spec._frame.values
+    dtype = values.dtype
+
+    # Pass 1: mean and Hilbert transform, block by block over rows.  The 
+    # transform is stored transposed, so that pass 2 reads it by columns.
+    center = np.empty((nspec, 1), dtype=dtype)
+    hilbert = None
+    if asynchronous:
+        if pvmemmap.memmap_base(spec._frame) is not None:
+            hilbert = pvmemmap._tempmap((M, nspec), dtype)
+        else:
+            hilbert = np.empty((M, nspec), dtype=dtype)
+    rowstep = max(1, (step * nspec) // M)
+    for start in range(0, nspec, rowstep):
+        rows = slice(start, start + rowstep)
+        block = np.asarray(values[rows])
+        center[rows, 0] = block.mean(axis=1)
+        if asynchronous:
+            dyn = block - center[rows]
+            if np.iscomplexobj(dyn):
+                dyn = np.conj(dyn)
+            hilbert[:, rows] = noda_transform(dyn).T
+
+    # Pass 2: sync = D D', async = D H' summed over chunks of columns
+    sync = np.zeros((nspec, nspec), dtype=dtype)
+    asyn = np.zeros((nspec, nspec), dtype=dtype) if asynchronous else None
+    for i, chunk in enumerate(pvchunks.iter_chunks(spec, step)):
+        dyn = chunk._frame.values - center
+        sync += np.dot(dyn, dyn.T)
+        if asynchronous:
+            asyn += np.dot(dyn, hilbert[i * step:i * step + dyn.shape[1]])
+
+    sync /= (M - 1.0)
+    if asynchronous:
+        asyn /= (M - 1.0)
+    return sync, asyn
+
+
+def _tile_size(nspec, threads, itemsize, tile=None):
+    ''' Rows/columns per square tile: tile, or the largest whose working 
+    arrays (about 6 tiles' worth per thread) fit config.CORRTILE_BYTES.'''
+    if tile is None:
+        budget = pvconfig.CORRTILE_BYTES / float(6 * threads * itemsize)
+        tile = int(np.sqrt(budget))
+    return max(1, min(int(tile), nspec))
+
+
+def tiled_correlation(spec, asynchronous=True, alpha=None, beta=0.0, 
+                      tile=None, threads=None, out=None, memmap=False):
+    ''' Mean centered synchronous and asynchronous spectra of spec 
+    (Corr2d(spec).sync_noscale and async_noscale, or the scaled sync and 
+    async if alpha is set; see Corr2d.scale), computed tile by tile in a
+    pool of threads (BLAS releases the GIL) and written straight into the
+    outputs.  For large spectral dimensions, where Corr2d's N x N 
+    intermediates don't fit in memory.
+
+    Sync is Hermitian and async anti-Hermitian, so only tiles on and above
+    the diagonal are computed.  Besides the outputs, memory is the dynamic
+    spectrum and its Hilbert-Noda transform (N x M each) plus 
+    config.CORRTILE_BYTES for the tiles in progress.
+
+    Parameters:
+    -----------
+    alpha, beta: scaling exponents (see Corr2d.scale); None for unscaled.
+    tile: rows/columns per tile (default from config.CORRTILE_BYTES).
+    threads: default config.CORRTHREADS (None: one per CPU).
+    out: (sync, async) arrays to write into (eg np.memmap of files).
+    memmap: if True (and out not given), outputs are temporary memmaps.
+
+    Returns:
+    --------
+    (sync, async) arrays; async is None if asynchronous is False.
+    '''
+    dyn = np.asarray(spec)
+    nspec, M = dyn.shape
+    dyn = dyn - dyn.mean(axis=1).reshape(-1, 1)
+    dynh = np.conj(dyn) if np.iscomplexobj(dyn) else dyn
+    hilbert = noda_transform(dynh) if asynchronous else None
+    std = dyn.std(axis=1, ddof=1) if alpha is not None else None
+
+    if out is None:
+        empty = pvmemmap._tempmap if memmap else np.empty
+        out = (empty((nspec, nspec), dyn.dtype), 
+               empty((nspec, nspec), dyn.dtype) if asynchronous else None)
+    sync, asyn = out
+
+    if threads is None:
+        threads = pvconfig.CORRTHREADS or cpu_count()
+    step = _tile_size(nspec, threads, dyn.itemsize, tile)
+    starts = range(0, nspec, step)
+    tiles = [(i, j) for i in starts for j in starts if j >= i]
+
+    def _scaled(noscale, rows, cols):
+        joint_var = np.outer(std[rows], std[cols])
+        return noscale * joint_var**(-1.0 * alpha) * \
+            abs(noscale / joint_var)**(beta)
+
+    def _write(outarray, block, rows, cols, sign):
+        outarray[rows, cols] = block
+        if rows != cols:
+            outarray[cols, rows] = sign * np.conj(block).T
+
+    def _tile(ij):
+        rows, cols = slice(ij[0], ij[0] + step), slice(ij[1], ij[1] + step)
+        block = np.dot(dyn[rows], dynh[cols].T) / (M - 1.0)
+        if alpha is not None:
+            block = _scaled(block, rows, cols)
+        _write(sync, block, rows, cols, 1)
+        if asynchronous:
+            block = np.dot(dyn[rows], hilbert[cols].T) / (M - 1.0)
+            if alpha is not None:
+                block = _scaled(block, rows, cols)
+            _write(asyn, block, rows, cols, -1)
+
+    if threads > 1 and len(tiles) > 1:
+        pool = ThreadPool(threads)
+        try:
+            pool.map(_tile, tiles, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for ij in tiles:
+            _tile(ij)
+    return sync, asyn
+
+
 class CorrError(Exception):
     """ """
     
@@ -105,6 +314,9 @@ class Spec2d(AnyFrame):
         spec: Optional (original dataset ie Spectra, TimeSpectra)
             Access the original data allows for more detailed output like
             sideplots in the plot calls and instructive headers.  
+
+        spec2: Optional (original dataset along the columns)
+            If not spec (region of interest or heterospectral correlation).
             
         scaled: str
             Status of scaling, ie "no scaling", "alpha=1" etc... just a string
@@ -117,6 +329,7 @@ class Spec2d(AnyFrame):
         
         # Access to original data is helpful (SHOULD THIS BE DEEP COPY?)
         self.spec = kwargs.pop('spec', None)
+        self.spec2 = kwargs.pop('spec2', None)
         self.scaled = kwargs.pop('scaled', '')
         self.centered = kwargs.pop('centered', '')
 
@@ -147,11 +360,13 @@ class Spec2d(AnyFrame):
                    scaled = corr2d._scale_string, 
                    centered = corr2d.center,
                    spec=corr2d.spec,
+                   spec2=corr2d.spec2,
                    *args, **kwargs
                    )
-        # Set columns and index both to index
+        # Set index and columns to the spectral index of the rows and columns
+        # (the same unless corr2d is a region of interest/heterospectral)
         specout.index = corr2d.index
-        specout.columns = corr2d.index
+        specout.columns = corr2d.index2
         return specout
         
         
@@ -253,6 +468,16 @@ class Spec2d(AnyFrame):
 
 
 
+def _roi(index, roi):
+    """ Positional slice of index for a spectral range roi (start, stop),
+    from the values nearest start and stop (like nearby slicing); the whole
+    index if roi is None."""
+    if roi is None:
+        return slice(None)
+    start, stop = np.sort(nearest(index, list(roi)))
+    return slice(start, stop + 1)
+
+
 # Keep this independt of TS; just numpy then more flexible
 class Corr2d(object):
     """ Computed 2d correlation spectra, including synchronous and asynchronus,
@@ -260,9 +485,25 @@ class Corr2d(object):
     and columns.  Index and columns are necessary for plotting, so made them
     a mandatory requirement."""
 
+    # Hilbert-Noda transform for the asynchronous spectrum: 'fft' or 
+    # 'dense' (noda_matrix; for validation).  See noda_transform.
+    hilbert = 'fft'
+
     # Columns aren't used; should I eliminate
-    def __init__(self, spec, refspec=None):
-        """ refspec is if you want custom centering.  """
+    def __init__(self, spec, refspec=None, other=None, rows=None, 
+                 cols=None):
+        """ refspec is if you want custom centering.  
+
+        Region of interest (ROI) and heterospectral correlation: rows and
+        cols are spectral ranges (start, stop) in specunit, resolved to the
+        nearest values like nearby slicing, eg rows=(500, 560), 
+        cols=(600, 700).  Only that block of the 2D spectra is computed, so
+        cost scales with the ROI; None is the whole spectrum.  other is a
+        second Spectra on the same perturbation axis (same number of 
+        columns): the columns of the 2D spectra are then other's (cols 
+        selects from it).  refspec is of spec's full index; with other, 
+        pass a pair (refspec, refspec of other).
+        """
         if spec.ndim != 2:
             raise CorrError('Data must be 2d!')
 
@@ -270,18 +511,29 @@ class Corr2d(object):
             raise CorrError('Corr2d requires skspec data structures (Metadataframe,'
                             'Spectra, etc... got %s') % type(data)
 
+        spec2 = spec if other is None else other
+        if spec2.shape[1] != spec.shape[1]:
+            raise CorrError('Heterospectral correlation requires the same '
+                            'perturbation axis; got %s and %s columns' 
+                            % (spec.shape[1], spec2.shape[1]))
+        rowslice, colslice = _roi(spec.index, rows), _roi(spec2.index, cols)
+        self._square = other is None and rowslice == colslice
 
-        # MAKE AN ACTUAL COPY OF DATA, NOT PASSING BY REFERENCE
-        self.spec = spec.deepcopy()
+        # MAKE AN ACTUAL COPY OF DATA, NOT PASSING BY REFERENCE (of the ROI)
+        self.spec = spec.iloc[rowslice].deepcopy()
+        self.spec2 = self.spec if self._square else \
+            spec2.iloc[colslice].deepcopy()
 
         # Promote spec attributes for convenience
-        self.index = spec.index   
+        self.index = self.spec.index   
+        self.index2 = self.spec2.index
         self.columns = spec.columns
         self.specunit = spec.specunit
         self.varunit = spec.varunit
 
-        # Better to store than compute as a property over and over
-        self._noda = noda_matrix(self.M)
+        # Cached intermediates (see _cached); reset whenever dyn_spec is set
+        self._cache = {}
+        self._dyn_spec2 = None
 
         # Defaults
         self._scaled = False
@@ -291,20 +543,26 @@ class Corr2d(object):
 
         # Ref spectrum/dynamic spectrum/centering
         if refspec is not None:
-            # QUICKEST VAILDATION OF REF_SPEC (WHY CLASS NOT WORKING WIT NP.NDARRAY)
+            if other is not None:
+                refspec, refspec2 = refspec
+            else:
+                refspec2 = refspec
             
+            # QUICKEST VAILDATION OF REF_SPEC (WHY CLASS NOT WORKING WIT NP.NDARRAY)
             #INSTEAD OF TYPE CHECK, JUST FORCE CONVERT BY DOING array(REFSPEC)
-            refspec = np.array(refspec)
-            if refspec.shape != self.index.shape:
-                raise CorrError('Shape mismatch: spectral data index %s and'
-                                ' reference spec shape %.' % \
-                                (self.index.shape, refspec.shape))
+            refspec, refspec2 = np.array(refspec), np.array(refspec2)
+            for ref, full in ((refspec, spec), (refspec2, spec2)):
+                if ref.shape != full.index.shape:
+                    raise CorrError('Shape mismatch: spectral data index %s '
+                                    'and reference spec shape %s.' % \
+                                    (full.index.shape, ref.shape))
 
             # Ref spectrum must be stored as an array for subtraction to work 
             # as defined here!
-            self.ref_spectrum = np.array(refspec)           
             self._center = 'Pre-centered'
-            self.dyn_spec = self.spec.subtract(self.ref_spectrum, axis=0)
+            self.ref_spectrum = refspec[rowslice]
+            self.ref_spectrum2 = refspec2[colslice]
+            self._set_dyn_spec()
 
         else:
             self.set_center('mean')
@@ -361,38 +619,102 @@ class Corr2d(object):
 
     def set_center(self, style, *args, **kwargs):
         """ User sets centering, this updates the  """
+        self.ref_spectrum = self._ref_spectrum(self.spec, style, *args, 
+                                               **kwargs)
+        if self._square:
+            self.ref_spectrum2 = self.ref_spectrum
+        else:
+            self.ref_spectrum2 = self._ref_spectrum(self.spec2, style, *args, 
+                                                    **kwargs)
+        self._set_dyn_spec()
+
 
+    def _ref_spectrum(self, spec, style, *args, **kwargs):
+        """ Reference spectrum of spec for centering style (see set_center)."""
         try:
 
             if not style:
                 self._center = None
-                # Instead of np.zeros, I will just multiply 0 times a column
-                # To get spectrum of 0's
-                ref_spectrum = self.spec[0] * 0.0  
+                ref_spectrum = np.zeros(spec.shape[0])
 
             elif style == 'mean':
                 self._center = 'mean'
-                ref_spectrum = self.spec.mean(axis=1)
+                ref_spectrum = spec.mean(axis=1)
 
             # style is understood as a function, but not inspected
             else:            
                 self._center = 'custom fcn.'           
-                ref_spectrum = style(self.spec, *args, **kwargs)
+                ref_spectrum = style(spec, *args, **kwargs)
 
         except Exception:
 
             raise CorrError('Center requires style of "mean", None or a '
                             ' a function, got "%s".' % style)
 
-        self.ref_spectrum = np.array(ref_spectrum)
+        ref_spectrum = np.array(ref_spectrum)
 
-        if len(self.ref_spectrum) != self.shape[0]:
+        if len(ref_spectrum) != spec.shape[0]:
             raise CorrError('ref. spectrum should be of spectral length (%s)'
-                            ' got "%s".' % (self.shape[0], len(self.ref_spectrum)))
+                            ' got "%s".' % (spec.shape[0], len(ref_spectrum)))
+        return ref_spectrum
 
-        # Set dynamic spectrum.  Should just be able to subtract but numpy messing up        
+
+    def _set_dyn_spec(self):
+        """ Dynamic spectra of the rows and columns from the ref spectra."""
+        # Should just be able to subtract but numpy messing up        
         self.dyn_spec = self.spec.subtract(self.ref_spectrum, axis=0)
+        if not self._square:
+            self.dyn_spec2 = self.spec2.subtract(self.ref_spectrum2, axis=0)
+
+
+    # Cached intermediates
+    # --------------------
+    # Each product is computed once, on first use, and stored in self._cache
+    # as name: (key, value).  Everything depends on the dynamic spectra, so
+    # setting dyn_spec or dyn_spec2 (eg set_center()) empties the cache.  Scaled spectra 
+    # are keyed by (alpha, beta) too, so scale() or changing alpha/beta only
+    # recomputes those, never the matrix products.  Everything built from 
+    # async_noscale is keyed by self.hilbert.  Cached arrays are shared
+    # with the Spec2d outputs, which are copy-on-write.
+
+    def _cached(self, name, compute, key=None):
+        """ Value of compute() stored under name, recomputed if key changed."""
+        hit = self._cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        value = compute()
+        self._cache[name] = (key, value)
+        return value
+
+    def _spec2d(self, matrix, name, iunit):
+        """ Spec2d.from_corr2d of a (possibly cached) matrix."""
+        specout = Spec2d.from_corr2d(matrix, corr2d=self, name=name, 
+                                     iunit=iunit)
+        specout._cow = True
+        return specout
+
+    @property
+    def dyn_spec(self):
+        """ Dynamic spectrum: spec minus the reference (centering) spectrum."""
+        return self._dyn_spec
+
+    @dyn_spec.setter
+    def dyn_spec(self, dyn_spec):
+        self._dyn_spec = dyn_spec
+        self._cache = {}
 
+    @property
+    def dyn_spec2(self):
+        """ Dynamic spectrum of the columns of the 2D spectra (cols, other); 
+        dyn_spec unless a region of interest or heterospectral."""
+        if self._dyn_spec2 is None:
+            return self.dyn_spec
+        return self._dyn_spec2
+
+    @dyn_spec2.setter
+    def dyn_spec2(self, dyn_spec):
+        self._dyn_spec2 = dyn_spec
+        self._cache = {}
 
     @property
     def shape(self):
@@ -408,34 +730,52 @@ class Corr2d(object):
     @property
     def sync_noscale(self):
         """ Return unscaled, synchronous spectrum as a numpy array. """
-        return np.dot(self.dyn_spec, self._dynconjtranspose) / (self.M - 1.0)  #ORDER OF OPERATIONS DEPENDENT (aka np.dot(t_dyn, dyn) doesn't work)
+        #ORDER OF OPERATIONS DEPENDENT (aka np.dot(t_dyn, dyn) doesn't work)
+        return self._cached('sync_noscale', lambda: np.dot(
+            np.asarray(self.dyn_spec), self._dynconjtranspose) / (self.M - 1.0))
 
 
     @property
     def async_noscale(self):
         """ """
-        return np.dot(self.dyn_spec, np.dot(self._noda, self._dynconjtranspose) ) / (self.M-1.0)
+        # dyn (N dyn*)  =  dyn (dyn* N')'
+        return self._cached('async_noscale', lambda: np.dot(
+            np.asarray(self.dyn_spec), 
+            noda_transform(self._dynconjtranspose.T, self.hilbert).T
+            ) / (self.M - 1.0), self.hilbert)
+
+    @property
+    def _noda(self):
+        """ Hilbert-Noda matrix; only built on request (O(M**2) memory)."""
+        return noda_matrix(self.M, dtype=self.spec._frame.values.dtype)
 
 
     @property
     def coeff_corr(self):
         """ Correlation coefficient (pg 78) """   
-        return np.divide(self.sync_noscale, self.joint_var) 
+        return self._cached('coeff_corr', lambda: 
+                            np.divide(self.sync_noscale, self.joint_var))
 
 
     @property
     def coeff_disr(self):
         """ Disrelation coefficient (pg 79) """
         # Not the same as np.sqrt( 1 - coef_corr**2), only same in magnitude!
-        return np.divide(self.async_noscale, self.joint_var)
+        return self._cached('coeff_disr', lambda: 
+                            np.divide(self.async_noscale, self.joint_var),
+                            self.hilbert)
 
     @property
     def joint_var(self):
         """ Product of standard devations of dynamic spectrum. 
         s1 * s2 or sqrt(siag(sync*sync)).
         """
-        std = self.dyn_spec.std(axis=1) #sigma(lambda)
-        return np.outer(std, std)
+        def _joint_var():
+            std = np.asarray(self.dyn_spec.std(axis=1)) #sigma(lambda)
+            if self._square:
+                return np.outer(std, std)
+            return np.outer(std, np.asarray(self.dyn_spec2.std(axis=1)))
+        return self._cached('joint_var', _joint_var)
         #return Spec2d(np.outer(std, std),
                       #corr2d = self,
                       #name='Joint Variance',
@@ -450,74 +790,86 @@ class Corr2d(object):
 
     @property
     def _dynconjtranspose(self):
-        """ Dynamic spectrum conjugate transpose; helpful to be cached"""
-        return np.conj(self.dyn_spec).transpose()
+        """ Dynamic spectrum (of the columns) conjugate transpose; helpful to
+        be cached"""
+        def _conjt():
+            dyn = np.asarray(self.dyn_spec2)
+            if np.iscomplexobj(dyn):
+                dyn = np.conj(dyn)
+            return dyn.transpose()
+        return self._cached('dynconjtranspose', _conjt)
+
+
+    def _scaled_matrix(self, name, noscale, coeff, key=None):
+        """ noscale * joint_var**-alpha * |coeff|**beta (REF 1), cached for
+        the current alpha, beta and key; noscale if not scaled."""
+        if not self._scaled:
+            return noscale()
+        alpha, beta = self.alpha, self.beta
+        weight = self._cached('joint_var_alpha', 
+                              lambda: self.joint_var**(-1.0 * alpha), alpha)
+        # ** faster than np.power but abs and np.abs same        
+        return self._cached(name, lambda: 
+                            noscale() * weight * abs(coeff())**(beta),
+                            (alpha, beta, key))
+
+    @property
+    def _sync_matrix(self):
+        return self._scaled_matrix('sync', lambda: self.sync_noscale,
+                                   lambda: self.coeff_corr)
+
+    @property
+    def _async_matrix(self):
+        return self._scaled_matrix('async', lambda: self.async_noscale,
+                                   lambda: self.coeff_disr, self.hilbert)
 
 
     # 2D Correlation Spectra
     # ----------------------
     @property
     def sync(self):
-        """ """
-        if self._scaled:
-            matrixout = self.sync_noscale * self.joint_var**(-1.0 * self.alpha) * \
-                abs(self.coeff_corr)**(self.beta)
-                    # ** faster than np.power but abs and np.abs same        
-        else:
-            matrixout = self.sync_noscale
-
-        return Spec2d.from_corr2d(matrixout, 
-                      corr2d = self,
-                      name='Synchronous Correlation',
-                      iunit='synchronicity')   
+        """ Synchronous spectrum as a Spec2d (unscaled; see corr2d() for
+        scaling)."""
+        return self._spec2d(self._sync_matrix, 
+                            name='Synchronous Correlation',
+                            iunit='synchronicity')   
 
     @property
     def async(self):
         """ """     
-        if self._scaled:
-            matrixout = self.async_noscale * self.joint_var**(-1.0 * self.alpha) * \
-                abs(self.coeff_disr)**(self.beta)
-        else:
-            matrixout = self.async_noscale
-
-        return Spec2d.from_corr2d(matrixout, 
-                      corr2d = self,
-                      name='Asynchronous Correlation',
-                      iunit='asynchronicity')   
+        return self._spec2d(self._async_matrix, 
+                            name='Asynchronous Correlation',
+                            iunit='asynchronicity')   
 
     @property
     def phase(self):
         """ Global phase angle (pg 79).  This will use scaled data."""
-        phase = np.arctan(self.async/self.sync)
-        phase.name = 'Phase Map' 
-        phase.iunit = 'phase angle'
-        return phase    
+        return self._spec2d(np.arctan(self._async_matrix / self._sync_matrix),
+                            name='Phase Map', 
+                            iunit='phase angle')
     
     
     @property
     def modulous(self):
         """ Effective lengh the vector with components Sync/Async"""
-        modulous = np.sqrt(self.sync**2 + self.async**2)
-        modulous.name = 'Modulous'
-        modulous.iunit = 'mod'
-        return modulous
+        return self._spec2d(np.hypot(self._sync_matrix, self._async_matrix),
+                            name='Modulous', 
+                            iunit='mod')
         
 
     @property
     def correlation(self):
         """ 2D Correlation Spectrum"""
-        return Spec2d.from_corr2d(self.coeff_corr, 
-                      corr2d = self,
-                      name = 'Correlation Coefficient',
-                      iunit='corr. coefficient')                
+        return self._spec2d(self.coeff_corr, 
+                            name = 'Correlation Coefficient',
+                            iunit='corr. coefficient')                
 
     @property
     def disrelation(self):
         """ 2D Disrelation Spectrum"""
-        return Spec2d.from_corr2d(self.coeff_disr,
-                      corr2d = self,
-                      name = 'Disrelation Coefficient',
-                      iunit='disr. coefficient')   
+        return self._spec2d(self.coeff_disr,
+                            name = 'Disrelation Coefficient',
+                            iunit='disr. coefficient')   
 
 
     # 2DCodistribution Spectroscopy
@@ -529,21 +881,20 @@ class Corr2d(object):
 
         Returns: Spectrum of length equivalent to spectral index.
         """
+        return self._char_index(self.dyn_spec, self.ref_spectrum)
+
+    def _char_index(self, dyn_spec, ref_spectrum):
+        """ char_index of dyn_spec (rows or columns of the 2D spectra)."""
         m = self.M
 
 #        if self._center is None: #pre-center also has this case
-        if np.count_nonzero(self.ref_spectrum) == 0:
+        if np.count_nonzero(ref_spectrum) == 0:
             raise CorrError('CoDistribution divides by ref spectrum.  If'
                             ' not centring, the ref spec is 0 and you get infinities!')
-        coeff = 1.0 / (m * self.ref_spectrum)
-
-        summation = 0 
-        k_matrix = np.empty(m)
-        for k in range(1, m+1): #m+1 to include m in sum
-            k_matrix.fill(k) # in place
-            # df.mul is same as dotting:
-                #http://stackoverflow.com/questions/15753916/dot-products-in-pandas
-            summation += self.dyn_spec.dot(k_matrix) + ((m+1) / 2)
+        coeff = 1.0 / (m * ref_spectrum)
+
+        # Sum over k = 1...m of dyn_spec.dot(k * ones) + (m+1) / 2, at once
+        summation = (dyn_spec.dot(np.ones(m)) + 1) * (m * (m + 1) / 2)
         return coeff * summation
 
     @property
@@ -553,34 +904,28 @@ class Corr2d(object):
 
         Returns: Spectrum of length equivalent to spectral index.
         """
+        return self._char_perturb(self.char_index)
+
+    def _char_perturb(self, Kj):
         tm, t1 = self.columns[-1], self.columns[0]
-        Kj = self.char_index
-        
         return ((tm-t1) * ((Kj-1) / (self.M -1))) + t1
 
 
-    # TO	VECTORIZE:
-    
     @property
     def async_codist(self):
         """ Asynchronous codistribution """
-        
-        # Empty asyn matrix
-        numrows = self.shape[0]        
-        async = np.empty((numrows,numrows))
-
         tm, t1 = self.columns[-1], self.columns[0]
         
-        # Numpy arrays to speed up loop/indexer?
-        tbar = self.char_perturb.values
-        var = self.joint_var
-        
-        # broadcast this?
-        for i in range(numrows):
-            for j in range(numrows):
-                coeff = (tbar[j] - tbar[i]) / (tm -t1)
-                # I believe std[i] std[j] is correct way
-                async[i][j] = coeff * var[i,j]
+        tbar = np.asarray(self.char_perturb)
+        if self._square:
+            tbar2 = tbar
+        else:
+            tbar2 = np.asarray(self._char_perturb(
+                self._char_index(self.dyn_spec2, self.ref_spectrum2)))
+
+        # I believe std[i] std[j] is correct way
+        coeff = (tbar2[np.newaxis, :] - tbar[:, np.newaxis]) / (tm - t1)
+        async = coeff * self.joint_var
 
         return Spec2d.from_corr2d(async, 
                       corr2d=self, 
@@ -590,16 +935,9 @@ class Corr2d(object):
     @property
     def sync_codist(self):
         """ Syncrhonous codistribution.  Computed from asyn_codist"""
-        numrows = self.shape[0]                    
-
-        # Numpy arrays to speed up calculation
         var = self.joint_var
         async_cod = self.async_codist.values
-        
-        sync = np.empty((numrows,numrows))
-        for i in range(numrows):
-            for j in range(numrows):
-                sync[i][j] = np.sqrt(var[i,j]**2 - async_cod[i,j]**2 )
+        sync = np.sqrt(var**2 - async_cod**2)
                  
         return Spec2d.from_corr2d(sync, 
                       corr2d=self, 
@@ -733,6 +1071,193 @@ class Corr2d(object):
         return outstring
 
 
+class StreamingCorr2d(object):
+    """ Synchronous 2D correlation spectrum of spectra that arrive one at a
+    time (live acquisition), updated in O(N**2) per spectrum rather than
+    rebuilding a Corr2d (copy, centering and N x N x M product) per frame.
+
+    Keeps the running mean (Corr2d's 'mean' reference spectrum) and the 
+    co-moment matrix, sum over spectra of (x - mean)(x - mean)', with 
+    Welford's rank-1 updates (BLAS ger, in place; both triangles are kept
+    so reading the synchronous spectrum is a single scaling).  
+    With a window of W, only the last W spectra count: as each new one 
+    arrives, the oldest is removed by the reverse update.  Removals add up
+    rounding error over long runs; recompute() starts over from the window.
+
+    The asynchronous spectrum needs the Hilbert transform along the whole
+    window, so it isn't updated; corr2d() builds a Corr2d of the window for
+    that (and for everything else Corr2d does).
+
+    Parameters
+    ----------
+    spec: Spectra whose columns are the first spectra (at least one); sets
+        the spectral index, units and metadata.
+    window: int
+        Number of most recent spectra to correlate (None: all of them; the
+        spectra themselves are then not kept).
+    """
+
+    def __init__(self, spec, window=None):
+        if window is not None and window < 2:
+            raise CorrError('Window must hold at least 2 spectra, got %s' 
+                            % window)
+        self.window = window
+        self.index = self.index2 = spec.index
+        self.specunit = spec.specunit
+        self.varunit = spec.varunit
+        self._template = spec.iloc[:, :0]
+        self._scale_string = 'False'
+        self.center = 'mean'
+
+        nspec = spec.shape[0]
+        self.n = 0
+        self._mean = np.zeros(nspec)
+        self._comoment = np.zeros((nspec, nspec), order='F')
+        self._ger = get_blas_funcs('ger', (self._comoment,))
+        if window is not None:
+            self._buffer = np.empty((nspec, window))
+            self._labels = deque()
+            self._next = 0   # Slot of the next spectrum in _buffer
+        self.append(spec)
+
+
+    def append(self, values, label=None):
+        """ Add a spectrum (array, Series or Spectrum of the spectral index),
+        or several (2d array or Spectra, one per column), and update the 
+        mean and synchronous spectrum.  label labels a single spectrum 
+        (Spectra and Series bring their own).
+        """
+        if isinstance(values, MetaDataFrame):
+            labels = list(values.columns)
+        elif isinstance(values, (pandas.Series, MetaSeries)) and \
+             label is None:
+            # Spectrum.name is its metadata name, not the column label
+            labels = [getattr(values, '_frame', values).name]
+        else:
+            labels = None
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+        if values.shape[0] != len(self.index):
+            raise CorrError('Spectra must be of spectral length %s, got %s'
+                            % (len(self.index), values.shape[0]))
+        if labels is None:
+            labels = [label] * values.shape[1]
+
+        for k in range(values.shape[1]):
+            x = values[:, k]
+            if self.window is not None:
+                if self.n == self.window:
+                    self._remove(self._buffer[:, self._next])
+                    self._labels.popleft()
+                self._buffer[:, self._next] = x
+                self._labels.append(labels[k])
+                self._next = (self._next + 1) % self.window
+            self._add(x)
+
+
+    def _add(self, x):
+        """ Welford update: mean and co-moment of the spectra and x."""
+        self.n += 1
+        delta = x - self._mean
+        self._mean += delta / self.n
+        # (x - old mean)(x - new mean)' = (n-1)/n delta delta'
+        self._comoment = self._ger((self.n - 1.0) / self.n, delta, delta,
+                                   a=self._comoment, overwrite_a=True)
+
+    def _remove(self, x):
+        """ Reverse of _add(x), for a spectrum x already counted."""
+        if self.n == 1:
+            self.n = 0
+            self._mean[:] = 0.0
+            self._comoment[:] = 0.0
+            return
+        mean = (self.n * self._mean - x) / (self.n - 1.0)
+        delta = x - mean
+        self._comoment = self._ger(-(self.n - 1.0) / self.n, delta, delta,
+                                   a=self._comoment, overwrite_a=True)
+        self._mean = mean
+        self.n -= 1
+
+
+    def recompute(self):
+        """ Mean and co-moment from the spectra in the window, to discard the
+        rounding error accumulated by removals.  O(N**2 * window)."""
+        dyn = self._window_values()
+        self._mean = dyn.mean(axis=1)
+        dyn -= self._mean.reshape(-1, 1)
+        self._comoment = np.asfortranarray(np.dot(dyn, dyn.T))
+
+    def _window_values(self):
+        """ Spectra in the window, oldest first."""
+        if self.window is None:
+            raise CorrError('Spectra are only kept with a window')
+        if self.n < self.window:
+            return self._buffer[:, :self.n].copy()
+        return np.roll(self._buffer, -self._next, axis=1)
+
+
+    @property
+    def ref_spectrum(self):
+        """ Mean spectrum of the spectra correlated."""
+        return self._mean.copy()
+
+    @property
+    def M(self):
+        return self.n
+
+    @property
+    def spec(self):
+        """ Spectra in the window (as the class of the first ones), or if 
+        there is no window, their mean as a single spectrum."""
+        if self.window is None:
+            values, columns = self._mean.reshape(-1, 1), [self.n]
+        else:
+            values, columns = self._window_values(), list(self._labels)
+        frame = pandas.DataFrame(values, index=self.index, 
+                                 columns=self._columns(columns))
+        return self._template._transfer(frame)
+
+    def _columns(self, labels):
+        """ labels as an index of the type and unit of the first spectra's
+        columns (a plain index doesn't keep the varunit)."""
+        columns = self._template.columns
+        if isinstance(columns, ConversionIndex):
+            unit = getattr(columns, '_unit', None)
+            try:
+                return type(columns)(labels, unit=getattr(unit, 'short', unit))
+            except (TypeError, ValueError):
+                pass  # Labels that don't fit the unit
+        return pandas.Index(labels)
+
+    spec2 = spec
+
+    @property
+    def sync_noscale(self):
+        """ Unscaled, mean centered synchronous spectrum (same as 
+        Corr2d(spec).sync_noscale of the spectra in the window)."""
+        if self.n < 2:
+            raise CorrError('Synchronous spectrum needs at least 2 spectra')
+        return self._comoment / (self.n - 1.0)
+
+    @property
+    def sync(self):
+        """ Synchronous spectrum as a Spec2d (unscaled; see corr2d() for
+        scaling)."""
+        return Spec2d.from_corr2d(self.sync_noscale, 
+                      corr2d = self,
+                      name='Synchronous Correlation',
+                      iunit='synchronicity')   
+
+    def corr2d(self, **kwargs):
+        """ Corr2d of the spectra in the window (kwargs passed on)."""
+        return Corr2d(self.spec, **kwargs)
+
+    def __repr__(self):
+        return '%s (%s X %s, window %s)' % (self.__class__.__name__, 
+            len(self.index), self.n, self.window)
+
+
 if __name__ == '__main__':
     from skspec.data import aunps_glass, solvent_evap, aunps_water
     import numpy as np
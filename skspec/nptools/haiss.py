@@ -5,22 +5,36 @@
     Nanoparticles from UV-Vis Spectra Anal. Chem, 79, 2007.
 
     Three functions are build based on the results of this paper, as well as a utility
-    for estimating nanoparticle concentration.'''
+    for estimating nanoparticle concentration.
+
+    Every method sizes all the spectra (columns) of a TimeSpectra in one NumPy pass:
+    peaks, reference absorbances and window averages are read for all columns at once,
+    and the Haiss formulae take arrays.  Results are a Spectrum of diameters (or
+    concentrations) over the columns, eg time.  Passing a SpecStack of runs returns a
+    SpecStack of the results of each run.'''
 
-import math
-import numpy as np
 import warnings
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+from pandas import Series
+
+from skspec.core.utilities import rebin
+from skspec.core.specstack import Stack
 
 def _haiss_preformat(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
     '''Called by other haiss method to preforma the timespectra before calling
-       haiss functions.
-       
+       haiss functions.  ts itself is left alone: units are set on a view, and
+       slices are views.
+
         See description under haiss_m1 for explanation of parameters.  '''
 
 
     ### Ensure ts is in units of absorbance and has nanometer spectral unit
     if ts.iunit != 'a':
         try:
+            ts=ts._view()
             ts.iunit='a'
         except Exception:
             raise TypeError('%s must be in absorbance units for quick_haiss_m1 to function.'%ts.name)
@@ -30,7 +44,7 @@ def _haiss_preformat(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
     
     if ts.specunit != 'nm':
         try:
-            ts.specunit='nm'
+            ts=ts.as_specunit('nm')
         except Exception:
             raise TypeError('%s must have specunits of nm to be consistent with published formulae.'%ts.name)
         else:
@@ -44,10 +58,8 @@ def _haiss_preformat(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
     ### Smoothing    
     if width:
         if style=='boxcar':
-            try:
-                ts=ts.boxcar(width)
-            except AttributeError:
-                raise AttributeError('Cannot find boxcar() method on %s object.'%ts.name)
+            # Bins of width nm along the spectrum, labeled by their centers
+            ts=ts._transfer(rebin(ts, width, axis=0, avg_fcn='mean'))
         else:
             raise NotImplementedError('Only boxcar smoothing is available')
     
@@ -56,10 +68,103 @@ def _haiss_preformat(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
         if len(limit_range) != 2:
             raise AttributeError('Limit_range must be a length-2 iterable.')
         
-        ts=ts.ix[ limit_range[0]:limit_range[1] ]    
-        
+        ts=ts.ix[ limit_range[0]:limit_range[1] ]
+
     return ts
 
+
+def _stackwise(func):
+    ''' Let a haiss method take a Stack (eg SpecStack) of runs: each run is
+        sized in one pass, and a Stack of the results is returned.'''
+    @wraps(func)
+    def wrapper(ts, *args, **kwargs):
+        if isinstance(ts, Stack):
+            return ts.__class__(OrderedDict([(k, func(v, *args, **kwargs))
+                                             for k, v in ts.items()]))
+        return func(ts, *args, **kwargs)
+    return wrapper
+
+
+def _arrays(ts):
+    ''' Wavelengths (ascending) and the (nspec x ncols) values of ts; views.'''
+    frame=ts._frame
+    x=np.asarray(frame.index, dtype=float)
+    values=frame.values
+    if len(x) > 1 and x[0] > x[-1]:
+        x, values = x[::-1], values[::-1]
+    return x, values
+
+
+def _peak_rows(values):
+    ''' Row of the maximum of every column, skipping NaNs (like idxmax).'''
+    rows=values.argmax(axis=0)
+    if values.dtype.kind == 'f':
+        # argmax stops at NaNs; only redo those columns
+        nulls=np.isnan(values[rows, np.arange(values.shape[1])])
+        if nulls.any():
+            sub=values[:, nulls]
+            rows[nulls]=np.where(np.isnan(sub), -np.inf, sub).argmax(axis=0)
+    return rows
+
+
+def _nearest(x, value):
+    ''' Row of x (ascending) closest to value.'''
+    if len(x) < 2:
+        return 0
+    i=np.clip(np.searchsorted(x, value), 1, len(x) - 1)
+    if abs(x[i-1] - value) <= abs(x[i] - value):
+        return i - 1
+    return i
+
+
+def _window_mean(x, values, center, width):
+    ''' Mean of every column over center +/- width (one center, or one per
+        column), NaNs skipped.  Only the rows in the windows are read.'''
+    ncols=values.shape[1]
+    cols=np.arange(ncols)
+    center=np.asarray(center, dtype=float) * np.ones(ncols)
+    lo=np.searchsorted(x, center - width, side='left')
+    hi=np.searchsorted(x, center + width, side='right')
+
+    total=np.zeros(ncols)
+    count=np.zeros(ncols)
+    for k in range(int((hi - lo).max()) if ncols else 0):
+        rows=lo + k
+        v=values[np.minimum(rows, len(x) - 1), cols].astype(float)
+        inside=(rows < hi) & ~np.isnan(v)
+        total+=np.where(inside, v, 0.0)
+        count+=inside
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def _a_spr(x, values, peak_width=None):
+    ''' Absorbance at the SPR maximum of every column: the maximum, or the
+        average over Xspr +/- peak_width.'''
+    rows=_peak_rows(values)
+    if peak_width:
+        return _window_mean(x, values, x[rows], peak_width)
+    return values[rows, np.arange(values.shape[1])].astype(float)
+
+
+def _a_ref(x, values, ref, ref_width=None):
+    ''' Absorbance at ref (the closest wavelength) of every column, or the
+        average over ref +/- ref_width.'''
+    if ref_width:
+        return _window_mean(x, values, ref, ref_width)
+    return values[_nearest(x, ref)].astype(float)
+
+
+def _result(ts, values, specifier):
+    ''' Spectrum of values (one per column of ts), over ts.columns.'''
+    from skspec.core.spectra import Spectrum
+    out=Spectrum.from_series(ts, Series(values, index=ts.columns))
+    out.iunit=None
+    out.specifier=specifier
+    return out
+
+
+@_stackwise
 def haiss_m1(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
     ''' Wrapper function for Haiss method  1.  Allows for range slicing/smoothing and applies
         haiss_m1 over the entire timespectra object.
@@ -81,18 +186,26 @@ def haiss_m1(ts, style='boxcar', width=None, limit_range=(400.0,700.0)):
         Boxcar is an INSTANCE METHOD of TimeSpectra.  A boxcar function that returns a dataframe can 
         be found in skspec.core.utilities.
         
-        Code may error if user passes a curve with
-        a maximum very far from 510 (lam0 in haiss_m1) as the log will blowup.         
-    
+        Curves with a maximum at or below 512nm (lam0 in haiss_m1) have no
+        diameter, as the log blows up; these are NaN.
+
+        Returns a Spectrum of diameters, one per column of ts (for a SpecStack,
+        a SpecStack of them).
+
     '''
 
     ts=_haiss_preformat(ts, style=style, width=width, limit_range=limit_range)
+    x, values = _arrays(ts)
 
     ### Feed index at maxiumum. to haiss function
-    spr=ts.idxmax()    
-    return spr.apply(_haiss_m1)
-        
+    rows=_peak_rows(values)
+    spr=x[rows]
+    spr[np.isnan(values[rows, np.arange(values.shape[1])])]=np.nan
+    d=_haiss_m1(spr)
+    return _result(ts, d, 'Haiss M1 diameter (nm)')
+
 
+@_stackwise
 def haiss_m2(ts, ref=450.0, width=None, style='boxcar', ref_width=None, 
                     peak_width=None, limit_range=(400.0,700.0), exp=True):
     ''' Wrapper for haiss_m2 to return diamter of nanoparticles based on features of its
@@ -121,62 +234,47 @@ def haiss_m2(ts, ref=450.0, width=None, style='boxcar', ref_width=None,
         Boxcar is an INSTANCE METHOD of TimeSpectra.  A boxcar function that returns a dataframe can 
         be found in skspec.core.utilities.
 
-        Code may error if user passes a curve with
-        a maximum very far from 510 (lam0 in haiss_m1) as the log will blowup.
+        The reference absorbance is read at the wavelength closest to ref.
+        Curves where Aspr or Aref is zero have no diameter (NaN).
+
+        Returns a Spectrum of diameters, one per column of ts (for a SpecStack,
+        a SpecStack of them).
     '''
     
     ts=_haiss_preformat(ts, style=style, width=width, limit_range=limit_range)
-    
-    return ts.apply(_m2_haiss, ref=ref, peak_width=peak_width, ref_width=ref_width, exp=exp)
-
+    x, values = _arrays(ts)
 
-def _m2_haiss(curve, ref=450.0, peak_width=None, ref_width=None, exp=True):
-    ''' Private method to quick_haiss_m2.  This separation is necessary to allow
-        haissm2 (with 2 required arguments) to be compatable with quick_haiss_m2.
-        In other words, because we need to compute Aspr and Aref separately, can't
-        just call .apply() method in the normal fashion as done for example
-        in _haiss_m1/_haiss_m3. This handles the single curve/series operations.
-    '''
+    Aspr=_a_spr(x, values, peak_width)
+    Aref=_a_ref(x, values, ref, ref_width)
 
-	
-    ### Get Aspr from peak value with or w/o averaging neighbors    
-    if peak_width:
-        Xspr=curve.idxmax(axis=0)
-        Aspr=curve[Xspr-peak_width : Xspr+peak_width].mean() 
-    else:
-        Aspr=curve.max(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        d=_haiss_m2(Aspr, Aref, exp=exp)
+    d[(Aspr == 0.0) | (Aref == 0.0)]=np.nan
+    return _result(ts, d, 'Haiss M2 diameter (nm)')
 
-    ### Get Aref from peak value with or w/o averaging neighbors
-    if ref_width:
-        Aref=curve[ref-ref_width : ref+ref_width].mean()
-    else:
-        Aref=curve.ix[ref]   #FIND CLOSEST WAVELENGTH
-                
- 
-    if Aspr==0.0 or Aref==0.0:
-        d=np.NaN
-    else:
-        d= _haiss_m2(Aspr, Aref, exp=exp)
-    return d
 
 def _haiss_m1(lambda_spr):
     ''' Return diameter from wavelength at spr maximum of absorbance curve.
 
     Parameters:
     -----------
-    lambda_spr: the wavelength at spr absorbance maximum.
+    lambda_spr: the wavelength at spr absorbance maximum (number or array).
 
     Notes:
     -----------
     this method is not accurate for particles with diameter less than 25nm.
+    At or below lambda_0 (512nm), there is no diameter (NaN).
 
     '''
     lambda_0=512
     L1=6.53
     L2=0.0216
 
-    d=(math.log((lambda_spr-lambda_0)/L1))/L2
-    return d
+    spr=np.asarray(lambda_spr, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        d=(np.log((spr-lambda_0)/L1))/L2
+    d=np.where(spr > lambda_0, d, np.nan)
+    return d[()]
 
 
 def _haiss_m2(Aspr, A450, exp=True):
@@ -200,16 +298,17 @@ def _haiss_m2(Aspr, A450, exp=True):
     if exp:
         B1=3.00 
         B2=2.20
-        d=math.exp( (B1 * (Aspr/A450) - B2) )
+        d=np.exp( (B1 * (Aspr/A450) - B2) )
 
     ### Calculate diameter from theoretical fit parameters 
     else:
         B1=3.55
         B2=3.11
-        d=math.exp( (B1 * (Aspr/A450) - B2) )
+        d=np.exp( (B1 * (Aspr/A450) - B2) )
 
     return d
 
+@_stackwise
 def haiss_m3(ts, Cau, dilution=None, style='boxcar', width=None, limit_range=(400.0,700.0), peak_width=None, exp=True):
     ''' Wrapper function for Haiss method  3.  Estimates diamter of gold nanoparticles
         based on the SPR max of the absorbance and the initial concentration of gold use to synthesize
@@ -245,27 +344,22 @@ def haiss_m3(ts, Cau, dilution=None, style='boxcar', width=None, limit_range=(40
         In extremely dilute or concentrate solutions, this linearity may breakdown and the accuracy of this 
         function is reduced.
 
+        Returns a Spectrum of diameters, one per column of ts (for a SpecStack,
+        a SpecStack of them).
+
     '''
 
     ts=_haiss_preformat(ts, style=style, width=width, limit_range=limit_range)
+    x, values = _arrays(ts)
 
-    ### Feed index at maxiumum. to haiss function
     ### Get Aspr from peak value with or w/o averaging neighbors    
-    if peak_width:
-        ### Need to compute a slice average based on SPR xvalue (bit tricky when ts not a single curve)
-        Xspr=ts.idxmax(axis=0)
-        xrng0=Xspr-peak_width
-        xrng1=Xspr+peak_width
-        xavg=(xrng0 + xrng1) / 2.0
-        Aspr=ts.ix[xavg].mean()
-    else:
-        Aspr=ts.max(axis=0)
+    Aspr=_a_spr(x, values, peak_width)
         
     ### Scale up Aspr based on dilution factor.
     if dilution:
         Aspr=Aspr/dilution
 
-    return Aspr.apply(_haiss_m3, Cau=Cau, exp=exp)
+    return _result(ts, _haiss_m3(Aspr, Cau, exp=exp), 'Haiss M3 diameter (nm)')
 
 
 def _haiss_m3(Aspr, Cau, exp=True):
@@ -283,8 +377,9 @@ def _haiss_m3(Aspr, Cau, exp=True):
         C1=-4.70
         C2=0.300
 
-    return ( (Aspr * term )/ (Cau * math.exp(C1) ) )**(1.0/C2)
+    return ( (Aspr * term )/ (Cau * np.exp(C1) ) )**(1.0/C2)
 
+@_stackwise
 def haiss_conc(ts, d, style='boxcar', width=None, limit_range=(400.0,700.0), ref=450.0, ref_width=None, exp=True):
     ''' Return estimation of AuNP concentration given the diameter of gold nanoparticles as the Absorbance
         at 450nm (or other wavelength controlled by ref).  Should be valid for particles with diameters ranging
@@ -294,7 +389,8 @@ def haiss_conc(ts, d, style='boxcar', width=None, limit_range=(400.0,700.0), ref
         ---------
   
         ts: TimeSpectra.
-        d: Size of gold nanoparticles in nm
+        d: Size of gold nanoparticles in nm; a number, or one per column of ts (eg
+           the result of haiss_m1).
         style: Smoothing style.  For now, only boxcar is used.
         width: Smoothing binwidth in units of ts.specunit.  If None or 0, no smoothing is performed.
         limit_range: width of the range used (default is (400.0,700.0)
@@ -307,21 +403,25 @@ def haiss_conc(ts, d, style='boxcar', width=None, limit_range=(400.0,700.0), ref
           I verified that dilution is not a factor by including it into some trials.  Since N scales linearly 
           with A450, then a dilution of .1 yeilds 1/10th N and so forth.  Therefore, uses can take results form
           this function, and scale them up by the dilution factor to get the full-batch number density.
+
+          The reference absorbance is read at the wavelength closest to ref.  Returns
+          a Spectrum of concentrations, one per column of ts (for a SpecStack, a
+          SpecStack of them).
         
         '''
     ts=_haiss_preformat(ts, style=style, width=width, limit_range=limit_range)
+    x, values = _arrays(ts)
+
     ### Get Aref from peak value with or w/o averaging neighbors
-    if ref_width:
-        Aref=ts.ix[ref-ref_width : ref+ref_width]  #Stil slices by wavelength
-    else:
-        Aref=ts.ix[ref]  #FIND CLOSEST WAVELENGTH    
-    
-    return Aref.apply(_haiss_conc, d=d)
+    Aref=_a_ref(x, values, ref, ref_width)
+
+    N=_haiss_conc(Aref, np.asarray(d, dtype=float))
+    return _result(ts, N, 'Haiss concentration')
 
 
 def _haiss_conc(Aref, d):
     ''' See haiss conc '''
     num=Aref * 10**14
-    t1=1.36 * math.exp(-( (d-96.8)/(78.2))**2 )
+    t1=1.36 * np.exp(-( (d-96.8)/(78.2))**2 )
     den=d**2 * (-0.295+ t1)
     return num/den
@@ -6,6 +6,7 @@ and upon derialization.'''
 
 from types import MethodType
 import copy
+import weakref
 import functools
 import cPickle
 import collections
@@ -13,6 +14,7 @@ import collections
 from pandas.core.indexing import _IXIndexer, _iLocIndexer, _LocIndexer
 
 from pandas import DataFrame, Series
+import numpy as np
 
 # for testing
 from numpy.random import randn
@@ -26,7 +28,80 @@ logger = logging.getLogger(__name__)
 # Store attributes/methods of dataframe for later inspection with __setattr__
 # Note: This is preferred to a storing individual instances of self._frame with custom 
 #       attr as if user tried self.a and self._frame.a existed, it would call this...
-_dfattrs=[x for x in dir(DataFrame) if '__' not in x]
+_dfattrs=frozenset(x for x in dir(DataFrame) if '__' not in x)
+
+#----------------------------------------------------------------------
+# Method dispatch table.  For each cousin (DataFrame, Series), maps the name
+# of every method to a wrapper function calling self._framegetattr(name...),
+# so __getattr__ only has to bind it (see MetaPandasObject.__getattr__).
+_dispatch = {}
+
+def _framemethod(attr, doc=None):
+    ''' Function that calls self._framegetattr(attr, ...); bound to a 
+    MetaPandasObject instance, it stands in for the frame's method "attr".'''
+    def framemethod(self, *fcnargs, **fcnkwargs):
+        return self._framegetattr(attr, *fcnargs, **fcnkwargs)
+    framemethod.__name__ = attr
+    framemethod.__doc__ = doc
+    return framemethod
+
+def _dispatch_table(cousin):
+    ''' name:wrapper for methods of cousin class; built on first use.'''
+    try:
+        return _dispatch[cousin]
+    except KeyError:
+        pass
+
+    table = {}
+    for name in dir(cousin):
+        try:
+            attr = getattr(cousin, name)
+        except Exception:
+            continue
+        if isinstance(attr, MethodType):
+            table[name] = _framemethod(name, attr.__doc__)
+    _dispatch[cousin] = table
+    return table
+
+#----------------------------------------------------------------------
+# Buffer sharing between pandas objects (see MetaPandasObject._cow_gate)
+
+# ufuncs for in place arithmetic, keyed by pandas flex method name
+_IOPS = {'add':np.add, 'sub':np.subtract, 'mul':np.multiply, 
+         'div':np.divide, 'truediv':np.true_divide}
+
+def _shares_buffer(new, old):
+    ''' Could any block of pandas object "new" share memory with a block of
+    "old"?  Only compares array bounds (np.may_share_memory), so it is cheap
+    and may report false positives, which only cost an extra copy.'''
+    try:
+        newblocks, oldblocks = new._data.blocks, old._data.blocks
+    except AttributeError:
+        return False
+    return any(np.may_share_memory(nb.values, ob.values) 
+               for nb in newblocks for ob in oldblocks)
+
+def _wraps_buffer(frame, data):
+    ''' Could pandas object frame share memory with data, the ndarray,
+    pandas or MetaPandasObject it was built from?'''
+    data = getattr(data, '_frame', data)
+    if isinstance(data, np.ndarray):
+        return any(np.may_share_memory(b.values, data) 
+                   for b in frame._data.blocks)
+    return _shares_buffer(frame, data)
+
+def _copy_frame(frame, deep=True):
+    ''' Copy of pandas object frame.  A shallow copy shares frame's data,
+    but its axes can be rebound independently (frame.copy(deep=False) 
+    shares the whole BlockManager).  A deep copy keeps frame's own axes;
+    frame.copy() views them, which drops custom Index attributes.'''
+    if not deep:
+        data = frame._data.copy(deep=False)
+        return frame._constructor(data).__finalize__(frame)
+    newframe = frame.copy()
+    for axis in frame._AXIS_ORDERS:
+        setattr(newframe, axis, getattr(frame, axis))
+    return newframe
 
 #----------------------------------------------------------------------
 # Loading (perhaps change name?) ... Doesn't work correctly as instance methods
@@ -42,17 +117,58 @@ def mloads(string):
     return cPickle.loads(string)        
         
 
+#----------------------------------------------------------------------
+# Indexers.  Assignment through an indexer (eg df.iloc[0:5] = 0.0) writes
+# into obj._frame in place, so these call obj._cow_gate() first.
+
+class _CowIndexerMixin(object):
+    def __setitem__(self, key, value):
+        self.obj._cow_gate()
+        super(_CowIndexerMixin, self).__setitem__(key, value)
+
+class _MetaIXIndexer(_CowIndexerMixin, _IXIndexer):
+    pass
+
+class _MetaiLocIndexer(_CowIndexerMixin, _iLocIndexer):
+    pass
+
+class _MetaLocIndexer(_CowIndexerMixin, _LocIndexer):
+    pass
+
+
 # Log all public/private methods to debug
 #@logclass(public_lvl='debug', log_name=__name__, skip=['_transfer'])
 class MetaPandasObject(object):
     ''' Base composition for subclassing pandas DataFrame and Series.'''
     
     cousin = None #OVERWRITE
+
+    # Attributes shared (not copied) between an object and the outputs of
+    # _transfer().  Subclasses list large, rebind-only attributes here.
+    _sharedattrs = ()
+
+    # Attributes bound to a particular instance; never transferred.
+    _transientattrs = ('_ix', '_iloc', '_loc', '_cow', '_sharers')
+
+    # Copy-on-write flag.  True when self._frame may share its buffer with 
+    # the frame of another object (eg a slice and its parent).
+    _cow = False
+
+    # Weak references to the objects self._frame's buffer was shared with by
+    # _share_buffer(), so the flag can be dropped once they're gone.  None
+    # if _cow was set for a buffer that isn't tracked (eg the caller's).
+    _sharers = None
     
     def __init__(self, *dfargs, **dfkwargs):
         ''' Stores a dataframe under reserved attribute name, self._frame'''      
         self._frame = self.cousin(*dfargs, **dfkwargs)
 
+        # pandas wraps an ndarray/frame passed in without copying; that 
+        # buffer is the caller's, so in place writes must copy it first.
+        data = dfargs[0] if dfargs else dfkwargs.get('data')
+        if _wraps_buffer(self._frame, data):
+            self._cow = True
+
     ### Save methods    
     def save(self, outname):
         ''' Takes in str or opened file and saves. cPickle.dump wrapper.'''
@@ -79,13 +195,66 @@ class MetaPandasObject(object):
         except TypeError:
             return frameout
         else:
-            return self._transfer(self._frame.__getitem__(keyslice) )               
+            return self._transfer(frameout)               
 
     def __setitem__(self, key, value):
+        self._cow_gate()
         self._frame.__setitem__(key, value)    
 
+    def _cow_gate(self):
+        ''' Call before writing into self._frame in place.  If the frame's
+        buffer may be shared with another object (see _share_buffer()), 
+        replace it with a private copy first so the write doesn't leak into
+        the parent/slices.'''
+        if self._shared():
+            self._frame = _copy_frame(self._frame)
+            self._unshare()
+
+    def _shared(self):
+        ''' Does self._frame's buffer still need copy-on-write?  Sharers that
+        were deleted, or have since copied their frame, don't count; if none
+        is left, the flag is dropped.'''
+        if not self._cow or self._sharers is None:
+            return self._cow
+        live = [ref for ref in self._sharers if ref() is not None and
+                _shares_buffer(ref()._frame, self._frame)]
+        if live:
+            self.__dict__['_sharers'] = live
+        else:
+            self._unshare()
+        return bool(live)
+
+    def _unshare(self):
+        ''' self._frame is self's own (eg a private copy was just made).'''
+        self.__dict__['_cow'] = False
+        self.__dict__.pop('_sharers', None)
+
+    def _track_sharer(self, other):
+        ''' Flag self copy-on-write, sharing its buffer with other.'''
+        if self._cow and self._sharers is None:
+            return  # Also shared with something untracked; stays flagged
+        self.__dict__['_cow'] = True
+        self.__dict__.setdefault('_sharers', []).append(weakref.ref(other))
+
+    def _view(self):
+        ''' New object sharing self's data, copy-on-write, but not its frame,
+        so that changing its index/columns leaves self alone.'''
+        return self._transfer(_copy_frame(self._frame, deep=False))
+
+    def _share_buffer(self, other):
+        ''' Flag self and other (MetaPandasObjects) copy-on-write if their 
+        frames may share memory.  Returns True if so.'''
+        if _shares_buffer(other._frame, self._frame):
+            self._track_sharer(other)
+            other._track_sharer(self)
+            return True
+        return False
+
     ### These tell python to ignore __getattr__ when pickling; hence, treat this like a normal class    
-    def __getstate__(self): return self.__dict__
+    ### Transient attributes (indexers, caches...) are bound to self; don't pickle/deepcopy them
+    def __getstate__(self): 
+        return dict((k, v) for k, v in self.__dict__.iteritems() 
+                    if k not in self._transientattrs)
     def __setstate__(self, d): self.__dict__.update(d)    
 
     def __getattr__(self, attr, *fcnargs, **fcnkwargs):
@@ -94,6 +263,17 @@ class MetaPandasObject(object):
         instance methods (like df.corr() ) are handled specially using a
         special private parsing method, _framegetattr().'''
 
+        # Not set yet (eg unpickling); don't recurse on self._frame below
+        if attr == '_frame':
+            raise AttributeError(attr)
+
+        # Methods of the cousin class: bind the prebuilt wrapper 
+        cousin = self.cousin
+        table = _dispatch.get(cousin) or _dispatch_table(cousin)
+        framemethod = table.get(attr)
+        if framemethod is not None:
+            return MethodType(framemethod, self)
+
         # Return basic attribute        
         try:
             refout = getattr(self._frame, attr)
@@ -128,17 +308,34 @@ class MetaPandasObject(object):
     def _transfer(self, dfnew):
         """ Copy current attributes into a new dataframe.  For methods that
         return a dataframe and need to append current attributes/columns/index.
+
+        Only the metadata is copied; self._frame is never touched, since it
+        is replaced by dfnew anyway.  Attributes in _sharedattrs (large arrays
+        like a reference spectrum) are shared by reference rather than copied.
+        This is safe because skspec only ever rebinds these (eg sub_base() 
+        does self._reference = self._reference.sub(...)), so they behave as
+        copy-on-write.  Cached indexers (self._ix etc...) are bound to self,
+        so they are dropped and rebuilt lazily on the new object.
+
+        Slices (loc, iloc, ix...) of self._frame are usually views, so dfnew
+        may share self's buffer; if so, both objects are flagged copy-on-write
+        and whichever is written to first copies its frame (see _cow_gate).
         """
-        newobj = copy.deepcopy(self)  #This looks like None, but is it type (MetaPandasObject, just __union__ prints None
-        newobj._frame = dfnew
+        newobj = self.__class__.__new__(self.__class__)
         
-        # THESE ARE NEVER TRANSFERED AT DF LEVEL, JUST CREATED NEW.  TRY
-        # df.loc
-        # a = df*50
-        # a._loc  ---> Will be None
-        #newobj._loc = self._loc
-        #newobj._iloc = self._iloc
-        #newobj._ix = self._ix         
+        # Memo maps self --> newobj, for any metadata that refers back to self
+        memo = {id(self):newobj, id(self._frame):dfnew}
+        newdict = newobj.__dict__
+        for attr, value in self.__dict__.iteritems():
+            if attr == '_frame' or attr in self._transientattrs:
+                continue
+            if attr in self._sharedattrs:
+                newdict[attr] = value
+            else:
+                newdict[attr] = copy.deepcopy(value, memo)
+
+        newdict['_frame'] = dfnew
+        self._share_buffer(newobj)
         return newobj
 
 
@@ -163,6 +360,9 @@ class MetaPandasObject(object):
         try to add this at the __getattr__ level; however, may not be worth it.
         '''
 
+        if fcnkwargs.get('inplace', False):
+            self._cow_gate()
+
         out=getattr(self._frame, attr)(*fcnargs, **fcnkwargs)
 
         ### If operation returns a dataframe, return new TimeSpectra
@@ -202,6 +402,93 @@ class MetaPandasObject(object):
     def __truediv__(self, x):
         return self._transfer(self._frame.__truediv__(x))
 
+    def __iadd__(self, x):
+        return self._iop('add', x)
+
+    def __isub__(self, x):
+        return self._iop('sub', x)
+
+    def __imul__(self, x):
+        return self._iop('mul', x)
+
+    def __idiv__(self, x):
+        return self._iop('div', x)
+
+    def __itruediv__(self, x):
+        return self._iop('truediv', x)
+
+    def _iop(self, opname, x):
+        ''' In place operator (ts -= x).  Subclasses extend this to update
+        their own attributes; see _frame_iop() for how the frame is changed.'''
+        self._frame_iop(opname, x)
+        return self
+
+    def _frame_iop(self, opname, x, axis=None):
+        ''' Apply pandas flex arithmetic method opname ('add', 'sub', 'mul',
+        'div', 'truediv') to self._frame in place.  Alignment is the same as
+        the out of place operator (or self._frame.opname(x, axis=axis)).
+
+        When the result is unchanged by alignment (x is a scalar, an array 
+        that broadcasts to self.shape, or a pandas object whose labels 
+        equal self's) and self._frame is a single float block, the ufunc
+        writes into the existing buffer, keeping its dtype as numpy does
+        (eg float32 -= float64).  Otherwise, self._frame is replaced by the
+        pandas result.'''
+
+        self._cow_gate()
+        frame = self._frame
+        if len(frame._data.blocks) == 1:
+            values = frame.values
+            rhs = self._iop_operand(x, axis)
+            if (rhs is not None and values.dtype.kind in 'fc' and 
+                np.can_cast(np.result_type(values, rhs), values.dtype, 
+                            casting='same_kind') and
+                np.may_share_memory(values, frame._data.blocks[0].values)):
+                _IOPS[opname](values, rhs, out=values)
+                return
+
+        x = getattr(x, '_frame', x)
+        if axis is None:
+            self._frame = getattr(frame, opname)(x)
+        else:
+            self._frame = getattr(frame, opname)(x, axis=axis)
+
+    def _iop_operand(self, x, axis=None):
+        ''' x as a scalar or array that broadcasts to self._frame.values the
+        way pandas would align it, or None if pandas alignment would reorder
+        or reindex (see _frame_iop()).'''
+        frame = self._frame
+        x = getattr(x, '_frame', x)
+        rowwise = axis in (0, 'index', 'rows')
+
+        if np.isscalar(x):
+            return x
+
+        if isinstance(x, DataFrame):
+            if (isinstance(frame, DataFrame) and 
+                x.index.equals(frame.index) and 
+                x.columns.equals(frame.columns)):
+                return x.values
+            return None
+
+        if isinstance(x, Series):
+            if isinstance(frame, Series) or rowwise:
+                if x.index.equals(frame.index):
+                    return x.values if frame.ndim == 1 else x.values[:, None]
+            elif x.index.equals(frame.columns):
+                return x.values
+            return None
+
+        if isinstance(x, np.ndarray):
+            if rowwise and x.ndim == 1 and frame.ndim == 2:
+                x = x[:, None]
+            try:
+                if np.broadcast(frame.values, x).shape == frame.shape:
+                    return x
+            except ValueError:
+                pass
+        return None
+
     ### From what I can tell, __pos__(), __abs__() builtin to df, just __neg__()    
     def __neg__(self):  
         return self._transfer(self._frame.__neg__() )
@@ -300,10 +587,10 @@ class MetaPandasObject(object):
         subclass.'''
         if self._ix is None:
             try:
-                self._ix=_IXIndexer(self)
+                self._ix=_MetaIXIndexer(self)
             #New versions of _IXIndexer require "name" attribute.
             except TypeError as TE:
-                self._ix=_IXIndexer(self, 'ix')
+                self._ix=_MetaIXIndexer(self, 'ix')
         return self._ix   
 
     @property	  	
@@ -311,10 +598,10 @@ class MetaPandasObject(object):
         """ See pandas.Index.iloc; preserves metadata"""
         if self._iloc is None:
             try:
-                self._iloc =_iLocIndexer(self)
+                self._iloc =_MetaiLocIndexer(self)
             #New versions of _IXIndexer require "name" attribute.
             except TypeError as TE:
-                self._iloc=_iLocIndexer(self, 'iloc')
+                self._iloc=_MetaiLocIndexer(self, 'iloc')
         return self._iloc   
     
 
@@ -323,10 +610,10 @@ class MetaPandasObject(object):
         """See pandas.Index.loc; preserves metadata"""
         if self._loc is None:
             try:
-                self._loc = _LocIndexer(self)
+                self._loc = _MetaLocIndexer(self)
             #New versions of _IXIndexer require "name" attribute.
             except TypeError as TE:
-                self._loc= _LocIndexer(self, 'loc')
+                self._loc= _MetaLocIndexer(self, 'loc')
         return self._loc         
     
             
@@ -0,0 +1 @@
+from skspec.peaks.peakfinder import find_peaks, track_peaks
@@ -0,0 +1,273 @@
+''' Vectorized peak finding on Spectra: the highest peaks of every spectrum
+(column) at once, with sub-pixel positions, heights, widths and areas, and
+tracking of the peaks from one spectrum to the next (eg a plasmon peak over
+a run).
+
+find_peaks() works on whole blocks of columns: local maxima are found with
+array comparisons along the index, the top npeaks of each column with one
+argpartition, and positions are refined from the neighbouring points:
+
+    'parabolic'  vertex of the parabola through the maximum and its two
+                 neighbours (non-uniform spacing is fine).
+    'centroid'   intensity weighted mean of x over window points on either
+                 side of the maximum.
+    None         the index value of the maximum.
+
+Widths (FWHM) are measured between the points where the spectrum crosses
+half the peak height (linearly interpolated), heights being above zero;
+so subtract baselines first.  Areas are trapezoid integrals from the local
+minimum on the left of a peak to the one on its right (or the ends of the
+spectrum); smooth noisy spectra first (Spectra.smooth).  Both are found by
+walking out from the peaks, so only the points around them are read.
+
+Results are a pandas Panel: items FIELDS, major axis the columns of the
+Spectra (eg time), minor axis the peak number, ordered by height (or, with
+track_peaks(), by track).  Missing peaks are NaN.
+'''
+
+__author__ = "Adam Hughes"
+__copyright__ = "Copyright 2012, GWU Physics"
+__license__ = "Free BSD"
+__maintainer__ = "Adam Hughes"
+__email__ = "hugadams@gwmail.gwu.edu"
+__status__ = "Development"
+
+import numpy as np
+from pandas import Panel
+
+import skspec.core.chunks as pvchunks
+
+FIELDS = ('position', 'height', 'fwhm', 'area')
+REFINE = ('parabolic', 'centroid', None)
+
+
+def _top_rows(v, npeaks, min_height=None):
+    ''' (npeaks, ncols) rows of the highest local maxima of each column of
+    v, highest first; -1 where a column has fewer peaks.'''
+    nrows, ncols = v.shape
+    cols = np.arange(ncols)
+
+    # The maximum of a column, unless it's at an end, is its highest peak.
+    # argmax stops at the first NaN, so those columns take the masked path.
+    if npeaks == 1:
+        rows = v.argmax(axis=0)
+        edge = (rows == 0) | (rows == nrows - 1) | np.isnan(v[rows, cols])
+        if min_height is not None:
+            edge |= v[rows, cols] < min_height
+        if not edge.any():
+            return rows[None, :]
+        rows[edge] = _top_rows_masked(v[:, edge], 1, min_height)[0]
+        return rows[None, :]
+    return _top_rows_masked(v, npeaks, min_height)
+
+
+def _top_rows_masked(v, npeaks, min_height=None):
+    ''' _top_rows() from the mask of all local maxima; a plateau counts at
+    its first point.'''
+    nrows, ncols = v.shape
+    cols = np.arange(ncols)
+    inner = v[1:-1]
+    mask = (inner > v[:-2]) & (inner >= v[2:])
+    if min_height is not None:
+        mask &= inner >= min_height
+    heights = np.where(mask, inner, -np.inf)
+
+    k = min(npeaks, nrows - 2)
+    if k == 1:
+        rows = heights.argmax(axis=0)[None, :]
+    else:
+        rows = np.argpartition(-heights, k - 1, axis=0)[:k]
+        order = np.argsort(-heights[rows, cols], axis=0, kind='mergesort')
+        rows = rows[order, cols]
+
+    missing = ~np.isfinite(heights[rows, cols])
+    rows += 1
+    rows[missing] = -1
+    if k < npeaks:
+        rows = np.vstack((rows, -np.ones((npeaks - k, ncols), dtype=int)))
+    return rows
+
+
+def _parabolic(x, v, rows, cols):
+    ''' Vertex (position, height) of the parabola through each peak and its
+    neighbours.'''
+    u0, u2 = x[rows - 1] - x[rows], x[rows + 1] - x[rows]
+    y0, y1, y2 = v[rows - 1, cols], v[rows, cols], v[rows + 1, cols]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = (u2 * (y0 - y1) - u0 * (y2 - y1)) / (u0 * u2 * (u0 - u2))
+        b = (y0 - y1 - a * u0**2) / u0
+        position = x[rows] - b / (2.0 * a)
+        height = y1 - b**2 / (4.0 * a)
+    flat = ~(a < 0)
+    position[flat] = x[rows][flat]
+    height[flat] = y1[flat]
+    return position, height
+
+
+def _centroid(x, v, rows, cols, window):
+    ''' Intensity weighted mean position over rows +/- window.'''
+    offsets = np.arange(-window, window + 1)[:, None]
+    near = np.clip(rows[None, :] + offsets, 0, len(x) - 1)
+    y = v[near, cols[None, :]]
+    return (x[near] * y).sum(axis=0) / y.sum(axis=0)
+
+
+def _walk(x, v, rows, cols, step, half):
+    ''' Walk from every peak (rows, cols) along the index, one point at a
+    time for all columns at once (so only the points near the peaks are
+    read).  Returns:
+
+        crossing   x where the column first falls below half (linearly
+                   interpolated), NaN if it doesn't;
+        area       trapezoid integral from the peak to the next local
+                   minimum (or end), positive whatever the direction.
+    '''
+    nrows = len(x)
+    crossing = np.empty(len(rows))
+    crossing.fill(np.nan)
+    area = np.zeros(len(rows))
+
+    pos = rows.copy()
+    current = v[pos, cols].astype(float)
+    falling = np.ones(len(rows), dtype=bool)  # Not past the valley yet
+    above = falling.copy()                    # Nor below half
+    while True:
+        active = np.flatnonzero(falling | above)
+        nxt = pos[active] + step
+        inside = (nxt >= 0) & (nxt < nrows)
+        if not inside.all():
+            falling[active[~inside]] = above[active[~inside]] = False
+            active, nxt = active[inside], nxt[inside]
+        if not len(active):
+            break
+
+        y0 = current[active]
+        y1 = v[nxt, cols[active]].astype(float)
+        x0, x1 = x[pos[active]], x[nxt]
+
+        # Half height crossings
+        cross = above[active] & (y1 < half[active])
+        if cross.any():
+            hit = active[cross]
+            crossing[hit] = (x0 + (half[active] - y0) * (x1 - x0) / 
+                             (y1 - y0))[cross]
+            above[hit] = False
+
+        # Areas down to the valley (stop where it rises again)
+        down = falling[active] & (y1 <= y0)
+        area[active[down]] += (np.abs(x1 - x0) * (y0 + y1) / 2.0)[down]
+        falling[active[~down]] = False
+
+        pos[active] = nxt
+        current[active] = y1
+
+    return crossing, area
+
+
+def _block_peaks(x, v, npeaks, refine, window, min_height):
+    ''' (len(FIELDS), ncols, npeaks) array of the peaks of a block.'''
+    nrows, ncols = v.shape
+    out = np.empty((len(FIELDS), ncols, npeaks))
+    out.fill(np.nan)
+    if nrows < 3:
+        return out
+
+    top = _top_rows(v, npeaks, min_height)
+    for k in range(npeaks):
+        cols = np.flatnonzero(top[k] >= 0)
+        if not len(cols):
+            continue
+        rows = top[k][cols]
+
+        height = v[rows, cols].astype(float)
+        if refine == 'parabolic':
+            position, height = _parabolic(x, v, rows, cols)
+        elif refine == 'centroid':
+            position = _centroid(x, v, rows, cols, window)
+        else:
+            position = x[rows]
+
+        left, lower = _walk(x, v, rows, cols, -1, height / 2.0)
+        right, upper = _walk(x, v, rows, cols, 1, height / 2.0)
+
+        out[0, cols, k] = position
+        out[1, cols, k] = height
+        out[2, cols, k] = np.abs(right - left)
+        out[3, cols, k] = lower + upper
+    return out
+
+
+def find_peaks(spectra, npeaks=1, refine='parabolic', window=1,
+               min_height=None, columns=None):
+    ''' The npeaks highest peaks of every column of spectra (see module
+    docstring).
+
+    Parameters:
+    -----------
+    refine: 'parabolic', 'centroid' or None.
+    window: points on either side of the maximum for 'centroid'.
+    min_height: ignore maxima lower than this.
+    columns: columns per block; default config.CHUNKCOLUMNS (bounds the
+       temporary arrays, and what is paged in for memory mapped data).
+
+    Returns:
+    --------
+    Panel of FIELDS x spectra.columns x peak number (0 highest).
+    '''
+    if refine not in REFINE:
+        raise NotImplementedError('refine must be one of %s; got "%s"' %
+                                  (', '.join(map(str, REFINE)), refine))
+    frame = getattr(spectra, '_frame', spectra)
+    x = np.asarray(frame.index, dtype=float)
+    values = frame.values
+
+    step = pvchunks.chunk_size(columns)
+    blocks = [_block_peaks(x, values[:, start:start+step], npeaks, refine,
+                           window, min_height)
+              for start in range(0, values.shape[1], step)]
+    out = np.concatenate(blocks, axis=1) if blocks else \
+          np.empty((len(FIELDS), 0, npeaks))
+    return Panel(out, items=list(FIELDS), major_axis=frame.columns,
+                 minor_axis=range(npeaks))
+
+
+def track_peaks(peaks, max_jump=None):
+    ''' Relabel the peaks of every column (a find_peaks() Panel) so that
+    peak k follows the same feature from one column to the next: each
+    peak is matched to the nearest position of the previous columns (last
+    seen), closest pairs first.  A peak farther than max_jump (index units)
+    from every track starts a free one.'''
+    values = peaks.values.copy()
+    position = values[0]
+    ncols, npeaks = position.shape
+    last = position[0].copy() if ncols else np.empty(0)
+
+    for t in range(1, ncols):
+        current = position[t]
+        cost = np.abs(current[:, None] - last[None, :])
+        cost[np.isnan(cost)] = np.inf
+        if max_jump is not None:
+            cost[cost > max_jump] = np.inf
+
+        # Greedy matching, closest pairs first
+        slot = -np.ones(npeaks, dtype=int)
+        taken = np.zeros(npeaks, dtype=bool)
+        for flat in np.argsort(cost, axis=None, kind='mergesort'):
+            i, j = divmod(flat, npeaks)
+            if not np.isfinite(cost[i, j]):
+                break
+            if slot[i] < 0 and not taken[j]:
+                slot[i], taken[j] = j, True
+
+        # Unmatched peaks go to free tracks (new, or not seen yet)
+        free = [j for j in np.argsort(~np.isnan(last), kind='mergesort')
+                if not taken[j]]
+        for i in np.flatnonzero(slot < 0):
+            slot[i] = free.pop(0)
+
+        values[:, t, slot] = values[:, t, :].copy()
+        seen = ~np.isnan(values[0, t])
+        last[seen] = values[0, t, seen]
+
+    return Panel(values, items=peaks.items, major_axis=peaks.major_axis,
+                 minor_axis=peaks.minor_axis)
@@ -171,7 +171,10 @@ def corr2d(spec2d, sideplots='mean', **pltkwargs):
 
         # Side plots    
         data_orig_top = spec2d.spec.loc[spec2d.index[0]:spec2d.index[-1], :]
-        data_orig_side = spec2d.spec.loc[spec2d.columns[0]:spec2d.columns[-1], :]
+        spec2 = getattr(spec2d, 'spec2', None)
+        if spec2 is None:
+            spec2 = spec2d.spec
+        data_orig_side = spec2.loc[spec2d.columns[0]:spec2d.columns[-1], :]
 
         top =  None
 
@@ -0,0 +1,35 @@
+""" Tests for skspec.core.baseline."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec.core.baseline import dynamic_baseline
+from skspec.data import aunps_glass
+
+
+class TestBaseline(tm.TestCase):
+    def setUp(self):
+        self.ts = aunps_glass()
+
+    def test_dynamic_baseline(self):
+        ts = self.ts
+        slices = ((440.0, 460.0), (600.0, 620.0), (670.0,))
+        x = np.asarray(ts.index)
+        rows = np.flatnonzero(((x >= 440.0) & (x <= 460.0)) | 
+                              ((x >= 600.0) & (x <= 620.0)))
+        rows = np.append(rows, np.abs(x - 670.0).argmin())
+        values = ts._frame.values
+
+        # One solve for all columns, same as polyfit column by column
+        for style, order in (('linear', 1), ('cubic', 3)):
+            expected = np.vander(x, order + 1).dot(
+                np.polyfit(x[rows], values[rows], order))
+            out = dynamic_baseline(ts, slices, style=style)
+            assert_allclose(out.values, expected, rtol=1e-9, atol=1e-6)
+            self.assertTrue(out.columns.equals(ts.columns))
+
+        expected = dynamic_baseline(ts, slices, style='poly', order=2)
+        tm.assert_frame_equal(dynamic_baseline(ts, slices, order=2, columns=7),
+                              expected)
+        ts1 = ts.copy()
+        self.assertIsNone(dynamic_baseline(ts1, slices, order=2, inplace=True))
+        assert_array_almost_equal(ts1._frame.values, values - expected.values)
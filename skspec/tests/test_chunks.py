@@ -0,0 +1,45 @@
+""" Tests for skspec.core.chunks and chunked_correlation."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+import skspec.core.chunks as pvchunks
+from skspec.core.timeindex import TimeIndex
+from skspec.core.utilities import countNaN
+from skspec.correlation import Corr2d
+from skspec.correlation.corr import chunked_correlation
+from skspec.data import aunps_glass, solvent_evap
+
+
+class TestChunks(tm.TestCase):
+    def test_chunked_reductions(self):
+        for ts1 in (aunps_glass(), solvent_evap()):
+            ix = ts1.index
+            ranges = [(ix[10], ix[50]), (ix[100], ix[200]), (ix[300], ix[301])]
+            for n in (1, 7, 1000):
+                chunks = list(ts1.chunks(columns=n))
+                self.assertEqual(sum(c.shape[1] for c in chunks), ts1.shape[1])
+
+                # Sums are in another order per block shape (see chunks.py)
+                out = pvchunks.area(ts1, columns=n)
+                assert_allclose(out.values, ts1.area().values, rtol=1e-13)
+                self.assertTrue(isinstance(out.index, TimeIndex))
+                self.assertEqual(pvchunks.count_nan(ts1, columns=n), 
+                                 countNaN(ts1))
+                assert_allclose(pvchunks.chunked_mean(ts1, columns=n).values,
+                                ts1.mean().values, rtol=1e-13)
+                assert_allclose(
+                    pvchunks.chunked_sum(ts1, axis=1, columns=n).values, 
+                    ts1.sum(axis=1).values, rtol=1e-13)
+                assert_allclose(
+                    pvchunks.wavelength_slices(ts1, ranges, columns=n).values,
+                    ts1.wavelength_slices(ranges).values, rtol=1e-13)
+                assert_array_equal(
+                    ts1.map_reduce(lambda c: c.max(), columns=n).values,
+                    ts1.max().values)
+
+    def test_chunked_correlation(self):
+        ts1 = solvent_evap()
+        sync, async = chunked_correlation(ts1, columns=4)
+        corr = Corr2d(ts1)
+        assert_array_almost_equal(sync, corr.sync_noscale)
+        assert_array_almost_equal(async, corr.async_noscale)
@@ -0,0 +1,138 @@
+""" Tests for skspec.correlation.corr."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec import Spectra
+from skspec.core.abcindex import nearest
+from skspec.correlation import Corr2d
+from skspec.correlation.corr import StreamingCorr2d, noda_matrix, \
+     noda_transform, tiled_correlation
+from skspec.data import solvent_evap
+
+
+def _sync(spec):
+    """ Mean centered sync_noscale of a Corr2d of spec."""
+    corr = Corr2d(spec)
+    corr.set_center('mean')
+    return corr.sync_noscale
+
+
+class TestCorr2d(tm.TestCase):
+    def setUp(self):
+        self.ts = solvent_evap()
+
+    def test_cache(self):
+        corr = Corr2d(self.ts)
+        sync = corr.sync_noscale
+        self.assertIs(corr.sync_noscale, sync)
+        assert_array_almost_equal(corr.phase._frame.values, 
+            np.arctan(corr.async_noscale / sync))
+
+        # Scaling reuses the products; centering recomputes them
+        corr.scale(alpha=0.5, beta=0.2)
+        assert_array_almost_equal(corr.sync._frame.values, 
+            sync * corr.joint_var**-0.5 * abs(corr.coeff_corr)**0.2)
+        self.assertIs(corr.sync_noscale, sync)
+        corr.set_center(lambda spec: spec.min(axis=1))
+        self.assertIsNot(corr.sync_noscale, sync)
+        dyn = corr.spec._frame.values
+        dyn = dyn - dyn.min(axis=1)[:, None]
+        assert_array_almost_equal(corr.sync_noscale, 
+                                  np.dot(dyn, dyn.T) / (corr.M - 1.0))
+
+    def test_hilbert(self):
+        dyn = np.random.randn(6, 37)
+        assert_array_almost_equal(noda_transform(dyn), 
+                                  np.dot(dyn, noda_matrix(37).T))
+        corr = Corr2d(self.ts)
+        corr.scale(alpha=0.5, beta=0.2)
+        async = corr.async_noscale
+        disr = corr.coeff_disr
+        scaled = corr._async_matrix
+        corr.hilbert = 'dense'
+        assert_allclose(corr.async_noscale, async, rtol=1e-9, atol=1e-9)
+
+        # Dependent products are recomputed, not served from the cache
+        self.assertFalse(corr.coeff_disr is disr)
+        self.assertFalse(corr._async_matrix is scaled)
+        assert_allclose(corr._async_matrix, scaled, rtol=1e-9, atol=1e-9)
+
+    def test_tiled(self):
+        ts1 = self.ts
+        corr = Corr2d(ts1)
+        sync, async = tiled_correlation(ts1, tile=300, threads=2)
+        assert_allclose(sync, corr.sync_noscale, rtol=1e-9, atol=1e-9)
+        assert_allclose(async, corr.async_noscale, rtol=1e-9, atol=1e-9)
+
+        corr.scale(alpha=0.5, beta=0.2)
+        sync, async = tiled_correlation(ts1, alpha=0.5, beta=0.2, tile=300,
+                                        memmap=True)
+        assert_allclose(sync, corr.sync._frame.values, rtol=1e-9, atol=1e-12)
+        assert_allclose(async, corr.async._frame.values, rtol=1e-9, 
+                        atol=1e-12)
+
+    def test_roi(self):
+        ts1 = self.ts
+        full = Corr2d(ts1)
+        rows = slice(*np.sort(nearest(ts1.index, [1500.0, 1450.0])) + [0, 1])
+        cols = slice(*np.sort(nearest(ts1.index, [1200.0, 1000.0])) + [0, 1])
+        roi = Corr2d(ts1, rows=(1500.0, 1450.0), cols=(1200.0, 1000.0))
+        assert_allclose(roi.async_noscale, full.async_noscale[rows, cols], 
+                        rtol=1e-9, atol=1e-9)
+        correlation = roi.correlation
+        assert_array_almost_equal(correlation._frame.values, 
+                                  full.coeff_corr[rows, cols])
+        self.assertTrue(correlation.columns.equals(ts1.index[cols]))
+
+        # Heterospectral: columns from another Spectra
+        hetero = Corr2d(ts1, other=ts1.iloc[cols], rows=(1500.0, 1450.0))
+        assert_allclose(hetero.sync_noscale, full.sync_noscale[rows, cols],
+                        rtol=1e-9, atol=1e-9)
+
+
+class TestStreamingCorr2d(tm.TestCase):
+    def setUp(self):
+        self.ts = solvent_evap()
+
+    def test_append(self):
+        stream = StreamingCorr2d(self.ts.iloc[:, :3])
+        stream.append(self.ts.iloc[:, 3:])
+        assert_allclose(stream.sync_noscale, _sync(self.ts), atol=1e-12)
+
+        # Sliding window: oldest spectra drop out as new ones arrive
+        window = StreamingCorr2d(self.ts.iloc[:, :3], window=5)
+        for j in range(3, self.ts.shape[1]):
+            window.append(self.ts.iloc[:, j].values, label=self.ts.columns[j])
+        last = self.ts.iloc[:, -5:]
+        assert_allclose(window.sync_noscale, _sync(last), atol=1e-12)
+        self.assertTrue(window.spec.columns.equals(self.ts.columns[-5:]))
+        assert_array_almost_equal(window.corr2d().sync_noscale, _sync(last))
+
+    def test_append_column(self):
+        # A column slice is a Spectrum; its label is the column, not .name
+        stream = StreamingCorr2d(self.ts.iloc[:, :3])
+        for j in range(3, 6):
+            stream.append(self.ts.iloc[:, j])
+        assert_allclose(stream.sync_noscale, _sync(self.ts.iloc[:, :6]), 
+                        atol=1e-12)
+        self.assertTrue(stream.spec.columns.equals(self.ts.columns[:6]))
+
+    def test_window_wraparound(self):
+        # Every frame, through several laps of the ring buffer
+        rng = np.random.RandomState(0)
+        values = np.cumsum(rng.randn(30, 40), axis=1) + 100.0
+        spec = Spectra(values, index=np.linspace(400.0, 700.0, 30))
+        window = StreamingCorr2d(spec.iloc[:, :2], window=7)
+        for j in range(2, values.shape[1]):
+            window.append(values[:, j], label=j)
+            first = max(0, j - 6)
+            self.assertEqual(window.n, j + 1 - first)
+            assert_allclose(window.sync_noscale, 
+                            _sync(spec.iloc[:, first:j+1]), 
+                            rtol=1e-10, atol=1e-10)
+        assert_array_equal(window.spec._frame.values, values[:, -7:])
+
+        # recompute() starts over from the window
+        removed = window.sync_noscale
+        window.recompute()
+        assert_allclose(window.sync_noscale, removed, rtol=1e-10, atol=1e-10)
@@ -0,0 +1,34 @@
+""" Tests for skspec.core.filters, through Spectra.smooth and derivative."""
+import numpy as np
+from scipy.signal import savgol_filter
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec import Spectra
+from skspec.data import aunps_glass
+
+
+class TestFilters(tm.TestCase):
+    def test_smooth_derivative(self):
+        ts1 = aunps_glass()
+        values = ts1._frame.values
+        out = ts1.smooth(window=11, polyorder=3)
+        assert_array_almost_equal(out._frame.values, 
+            savgol_filter(values, 11, 3, axis=0, mode='nearest'))
+        assert_array_equal(np.asarray(out.index), np.asarray(ts1.index))
+
+        # Chunked gives the same result
+        assert_array_equal(ts1.smooth(window=11, polyorder=3, 
+                                      columns=7)._frame.values,
+                           out._frame.values)
+
+        # Derivative of a straight line (away from the edges) is its slope
+        line = Spectra(np.outer(np.linspace(0, 10, 200), [1.0, -2.0]), 
+                       index=np.linspace(400, 800, 200))
+        for kind, kwds in (('savgol', {}), ('gaussian', {'sigma':2.0})):
+            slope = line.derivative(kind=kind, **kwds)._frame.values[20:-20]
+            assert_array_almost_equal(slope[:, 0], 0.025)
+            assert_array_almost_equal(slope[:, 1], -0.05)
+
+        ts32 = aunps_glass(dtype='float32')
+        out = ts32.smooth('gaussian', sigma=2.0)
+        self.assertEqual(out._frame.values.dtype, np.float32)
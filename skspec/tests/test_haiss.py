@@ -0,0 +1,49 @@
+""" Tests for skspec.nptools.haiss, nanoparticle sizing."""
+import warnings
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec import SpecStack
+from skspec.data import aunps_glass
+from skspec.nptools import haiss
+
+
+class TestHaiss(tm.TestCase):
+    def setUp(self):
+        self.ts = aunps_glass()
+
+    def test_haiss_arrays(self):
+        ts = self.ts
+        absorbance = ts.copy()
+        absorbance.iunit = 'a'
+        cut = absorbance._frame.ix[400.0:700.0]
+
+        # Same as sizing column by column
+        d = haiss.haiss_m1(absorbance)
+        expected = [haiss._haiss_m1(x) for x in cut.idxmax()]
+        assert_array_almost_equal(d.values, expected)
+        self.assertTrue(d.index.equals(ts.columns))
+
+        d = haiss.haiss_m2(absorbance, peak_width=2.0, ref_width=2.0)
+        expected = []
+        for col in cut.columns:
+            curve = cut[col]
+            xspr = curve.idxmax()
+            expected.append(haiss._haiss_m2(curve[xspr-2.0:xspr+2.0].mean(),
+                                            curve[448.0:452.0].mean()))
+        assert_allclose(d.values, expected, rtol=1e-10)
+
+        # No diameter at or below 512nm (log(0) at 512)
+        d = haiss._haiss_m1(np.array([511.0, 512.0, 512.5]))
+        self.assertTrue(np.isnan(d[:2]).all())
+        self.assertTrue(np.isfinite(d[2]))
+        self.assertTrue(np.isnan(haiss._haiss_m1(512.0)))
+
+        # Runs of a SpecStack; the caller's units are left alone
+        stack = SpecStack({'run1':ts, 'run2':ts})
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            out = haiss.haiss_m1(stack)
+        assert_array_almost_equal(out._data['run2'].values, 
+                                  haiss.haiss_m1(absorbance).values)
+        self.assertEqual(ts.iunit, 'cts')
@@ -15,7 +15,8 @@ from copy import deepcopy
 from numpy.testing import *
 from pandas import DatetimeIndex
 from skspec import AnyFrame, Spectra, TimeSpectra, SpecStack
-from skspec.core.abcindex import ConversionIndex, CustomIndex, ConversionFloat64Index
+from skspec.core.abcindex import ConversionIndex, CustomIndex, ConversionFloat64Index, nearest
+from skspec.core.abcspectra import SpecIndexError
 from skspec.core.specindex import SpecIndex
 from skspec.core.timeindex import TimeIndex
 from skspec.data import aunps_glass
@@ -53,5 +54,29 @@ class TestIndexing(tm.TestCase):
         ind1 = ts1.index
         ind2 = ts.index[sstart:send+1]
         self.assertTrue(ind1.equals(ind2))    
+
+    def test_nearby_keys(self):
+        ts = aunps_glass()
+        values = np.array(ts.index)
+        keys = [450, 520.3, 610]
+        expected = [np.abs(values - k).argmin() for k in keys]
+        out = ts.nearby[keys]
+        self.assertTrue(out.index.equals(ts.index[expected]))
+        self.assertEqual(out.index.unit, 'nm')
+        self.assertRaises(SpecIndexError, ts.nearby.__getitem__, [450, 300])
+
+        # Descending axis (binary search from the other end)
+        ev = ts.as_specunit('ev')
+        values = np.array(ev.index)
+        self.assertEqual(ev.index.monotonic, -1)
+        assert_array_equal(nearest(ev.index, [2.5, 2.1]),
+                           [np.abs(values - k).argmin() for k in [2.5, 2.1]])
+        self.assertEqual(ev.nearby[2.5:2.1].index[0], 
+                         values[np.abs(values - 2.5).argmin()])
+
+        # Datetime columns
+        dti = ts.columns.datetimeindex
+        out = ts.nearby[:, [dti[3], dti[10]]]
+        self.assertTrue(out.columns.datetimeindex.equals(dti[[3, 10]]))
     
     
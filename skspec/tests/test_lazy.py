@@ -0,0 +1,42 @@
+""" Tests for skspec.core.lazy, deferred and fused Spectra operations."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec.data import aunps_glass
+
+
+class TestLazy(tm.TestCase):
+    def test_lazy_matches_eager(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        ts1.baseline = np.linspace(0.0, 5.0, ts1.shape[0])
+        raw = ts1._frame.values.copy()
+
+        lazy = ts1.lazy().sub_base().nearby[480:650].iloc[:, 10:60]
+        out = lazy.mul(2.0).as_norm('a').compute()
+
+        expected = ts1.deepcopy()
+        expected.sub_base()
+        expected = (expected.nearby[480:650].iloc[:, 10:60] * 2.0).as_norm('a')
+
+        assert_array_equal(out._frame.values, expected._frame.values)
+        assert_array_equal(out.reference.values, expected.reference.values)
+        assert_array_equal(out.baseline.values, expected.baseline.values)
+        self.assertEqual(out.norm, 'a')
+        self.assertTrue(out.base_sub)
+
+        # The source is untouched
+        assert_array_equal(ts1._frame.values, raw)
+        self.assertFalse(ts1.base_sub)
+
+        # Arithmetic pandas has to align isn't fused, but still matches
+        mean = ts1.mean(axis=1)._frame
+        out = (ts1.lazy().sub(mean, axis=0).nearby[500:600] + 1.0).compute()
+        expected = ts1.sub(mean, axis=0).nearby[500:600] + 1.0
+        assert_array_equal(out._frame.values, expected._frame.values)
+
+        # A reference column is read from the data the earlier steps made
+        out = ts1.lazy().as_norm('a').as_norm('t', reference=3).compute()
+        expected = ts1.as_norm('a').as_norm('t', reference=3)
+        assert_array_equal(out._frame.values, expected._frame.values)
+        assert_array_equal(out.reference.values, expected.reference.values)
@@ -0,0 +1,60 @@
+""" Tests for skspec.core.memmap, the memory-mapped Spectra backend."""
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec import TimeSpectra
+from skspec.core.memmap import memmap_base
+from skspec.data import aunps_glass
+
+
+class TestMemmap(tm.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'run.dat')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_memmap_roundtrip(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        ts1.to_memmap(self.path)
+        mm = TimeSpectra.from_memmap(self.path)
+        self.assertTrue(memmap_base(mm) is not None)
+        assert_array_equal(mm._frame.values, ts1._frame.values)
+        self.assertEqual(mm.specunit, ts1.specunit)
+        self.assertEqual(mm.varunit, ts1.varunit)
+        assert_array_equal(mm.columns.datetimeindex, ts1.columns.datetimeindex)
+
+        self.assertRaises(ValueError, mm.__isub__, 1.0) #Read-only
+
+        # Slices stay views of the map; conversions go to temporary maps
+        self.assertTrue(memmap_base(mm.nearby[500:600]) is not None)
+        self.assertTrue(memmap_base(mm.iloc[:, 0:10]) is not None)
+        assert_array_almost_equal(mm.area().values, ts1.area().values)
+        a = mm.as_norm('a')
+        self.assertTrue(memmap_base(a) is not None)
+        assert_array_almost_equal(a._frame.values, 
+                                  ts1.as_norm('a')._frame.values)
+
+    def test_memmap_modes(self):
+        ts1 = aunps_glass()
+        ts1.to_memmap(self.path, dtype='float32')
+        rw = TimeSpectra.from_memmap(self.path, mode='r+')
+        self.assertEqual(rw.dtype, np.float32)
+        rw -= 1.0
+        del rw
+        mm = TimeSpectra.from_memmap(self.path)
+        assert_array_almost_equal(mm._frame.values, 
+                                  ts1._frame.values - 1.0, decimal=3)
+
+        # Writes to a copy-on-write view don't reach the file
+        view = TimeSpectra.from_memmap(self.path, mode='r+').iloc[:, 0:10]
+        view -= 1.0
+        assert_array_almost_equal(view._frame.values, 
+                                  ts1._frame.values[:, 0:10] - 2.0, decimal=3)
+        assert_array_equal(TimeSpectra.from_memmap(self.path)._frame.values,
+                           mm._frame.values)
@@ -0,0 +1,34 @@
+""" Tests for skspec.core.norms, through Spectra.norm and as_norm."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec import Spectra
+from skspec.data import aunps_glass
+
+
+class TestNorms(tm.TestCase):
+    def test_norm_roundtrip(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        raw = ts1._frame.values.copy()
+        x = raw / raw[:, [0]]
+        a = ts1.as_norm('a')
+        assert_array_almost_equal(a._frame.values, -np.log10(x))
+        assert_array_almost_equal(ts1._frame.values, raw)
+        pt = a.as_norm('%t')
+        assert_array_almost_equal(pt._frame.values, 100.0 / x)
+        ts1.norm = 'a(ln)'
+        ts1.norm = 't'
+        ts1.norm = None
+        assert_array_almost_equal(ts1._frame.values, raw)
+
+    def test_norm_outside_buffer(self):
+        # Data wrapped without copying belongs to the caller; don't convert
+        # it in place
+        raw = aunps_glass()._frame.values.copy()
+        ts1 = Spectra(raw, index=np.arange(raw.shape[0]) + 400.0)
+        ts1.reference = 0
+        ts1.norm = 'a'
+        assert_array_almost_equal(raw, aunps_glass()._frame.values)
+        assert_array_almost_equal(ts1._frame.values, 
+                                  -np.log10(raw / raw[:, [0]]))
@@ -0,0 +1,72 @@
+""" Tests for skspec.peaks.peakfinder."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from pandas import DataFrame
+from skspec import Spectra
+from skspec.peaks import find_peaks, track_peaks
+
+
+def _gaussians(x, centers, amplitudes, sigma=20.0):
+    """ One column per (center, amplitude): a gaussian of width sigma plus
+    a narrow one at 700."""
+    return np.array([a * np.exp(-(x - c)**2 / (2 * sigma**2)) +
+                     np.exp(-(x - 700.0)**2 / (2 * 10.0**2))
+                     for a, c in zip(amplitudes, centers)]).T
+
+
+class TestPeaks(tm.TestCase):
+    def setUp(self):
+        self.x = np.linspace(400.0, 800.0, 801)
+        self.centers = np.linspace(450.0, 500.0, 40)
+        self.amplitudes = np.linspace(2.0, 0.5, 40)
+        self.frame = DataFrame(_gaussians(self.x, self.centers, 
+                                          self.amplitudes), index=self.x)
+
+    def test_find_peaks(self):
+        # Highest first: the broad peak, then the narrow one
+        peaks = find_peaks(self.frame, npeaks=2)
+        assert_array_almost_equal(peaks['position'][0].values[:5], 
+                                  self.centers[:5], decimal=3)
+        assert_array_almost_equal(peaks['height'][0].values[:5], 
+                                  self.amplitudes[:5], decimal=4)
+        assert_array_almost_equal(peaks['fwhm'][1].values[:5], 
+                                  10.0 * 2 * np.sqrt(2 * np.log(2)), 
+                                  decimal=2)
+        assert_array_almost_equal(peaks['area'][1].values[:5], 
+                                  10.0 * np.sqrt(2 * np.pi), decimal=3)
+        self.assertEqual(peaks['position'][0].values[-1], 700.0)
+
+        # Blocks of columns give the same result; so does the Spectra method
+        tm.assert_panel_equal(find_peaks(self.frame, npeaks=2, columns=3), 
+                              peaks)
+        spec = Spectra(self.frame.values, index=self.x)
+        tm.assert_panel_equal(spec.find_peaks(npeaks=2), peaks)
+
+        # Within half a grid step
+        centroid = find_peaks(self.frame, refine='centroid', window=40)
+        error = centroid['position'][0].values[:5] - self.centers[:5]
+        assert_array_less(np.abs(error), 0.25)
+
+        # Maxima below min_height are skipped
+        high = find_peaks(self.frame, npeaks=2, min_height=1.5)
+        self.assertTrue(np.isnan(high['position'][1].values).all())
+        self.assertRaises(NotImplementedError, find_peaks, self.frame, 
+                          refine='spline')
+
+    def test_find_peaks_nan(self):
+        # Missing values are never peaks
+        frame = self.frame.copy()
+        frame.iloc[10, :] = np.nan
+        frame.iloc[:, 0] = np.nan
+        peaks = find_peaks(frame, npeaks=1)
+        assert_array_almost_equal(peaks['position'][0].values[1:5], 
+                                  self.centers[1:5], decimal=3)
+        self.assertTrue(np.isnan(peaks['position'][0].values[0]))
+
+    def test_track_peaks(self):
+        # Tracks follow positions, not heights
+        tracks = track_peaks(find_peaks(self.frame, npeaks=2))
+        assert_array_almost_equal(tracks['position'][0].values, self.centers,
+                                  decimal=2)
+        assert_array_almost_equal(tracks['position'][1].values, 700.0)
@@ -0,0 +1,30 @@
+""" Tests for skspec.core.quadrature, through wavelength_slices and area."""
+import numpy as np
+from scipy import integrate
+import pandas.util.testing as tm
+from numpy.testing import *
+from skspec.core.timeindex import TimeIndex
+from skspec.data import aunps_glass
+
+
+class TestIntegrate(tm.TestCase):
+    def test_batched_integration(self):
+        ts1 = aunps_glass()
+        ix = ts1.index
+        ranges = [(ix[0], ix[-1]), (ix[10], ix[51]), (ix[100], ix[200])]
+        for rule, kwds in (('simps', {'even':'last'}), ('trapz', {})):
+            fcn = getattr(integrate, rule)
+            out = ts1.wavelength_slices(ranges, apply_fcn=rule)
+            for row, (start, stop) in zip(out.values, ranges):
+                cut = ts1._frame.ix[start:stop]
+                expected = [fcn(cut[c].values, x=np.asarray(cut.index), **kwds)
+                            for c in cut.columns]
+                assert_array_almost_equal(row, expected)
+
+            area = ts1.area(apply_fcn=rule)
+            self.assertTrue(isinstance(area.index, TimeIndex))
+            assert_array_equal(area.values, out.values[0])
+
+        # Descending x is integrated in ascending order
+        flipped = ts1.iloc[::-1]
+        assert_array_almost_equal(flipped.area().values, ts1.area().values)
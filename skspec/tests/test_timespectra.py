@@ -11,7 +11,7 @@ from skspec import AnyFrame, Spectra, TimeSpectra, SpecStack
 from skspec.core.abcindex import ConversionIndex, CustomIndex, ConversionFloat64Index
 from skspec.core.specindex import SpecIndex
 from skspec.core.timeindex import TimeIndex
-from skspec.data import aunps_glass
+from skspec.data import aunps_glass, solvent_evap
 from skspec.units import SPECUNITS
 
 
@@ -71,4 +71,254 @@ class test_timespectra(tm.TestCase):
     def test_numeric(self):
         tsquared = ts**2
         for item in ts.columns:
-            assert_array_almost_equal(ts[item]**2,tsquared[item])        
\ No newline at end of file
+            assert_array_almost_equal(ts[item]**2,tsquared[item])        
+
+class TestTransfer(tm.TestCase):
+    def test_transfer_shares_metadata(self):
+        ts1 = aunps_glass()
+        ts1.baseline = 5.0
+        ts1.nearby #cache an indexer
+        ts2 = ts1 * 2
+        self.assertTrue(ts2._reference is ts1._reference)
+        self.assertTrue(ts2._baseline is ts1._baseline)
+        self.assertTrue(ts2.nearby.obj is ts2)
+        self.assertEqual(ts2.specunit, ts1.specunit)
+        self.assertEqual(ts2.varunit, ts1.varunit)
+        assert_array_almost_equal(ts2._frame.values, 2 * ts1._frame.values)
+
+    def test_slice_copy_on_write(self):
+        ts1 = aunps_glass()
+        ts1.baseline = 5.0
+        orig = ts1._frame.values.copy()
+        view = ts1.nearby[500:600]
+        self.assertTrue(np.may_share_memory(view._frame.values, 
+                                            ts1._frame.values))
+        self.assertEqual(len(view._baseline), view.shape[0])
+        self.assertEqual(view.specunit, ts1.specunit)
+        view.iloc[0:5] = 0.0
+        assert_array_almost_equal(ts1._frame.values, orig)
+        self.assertTrue((view._frame.values[0:5] == 0.0).all())
+
+    def test_cow_released(self):
+        ts1 = aunps_glass()
+        buf = ts1._frame.values
+        view = ts1.iloc[:, :3]
+        self.assertTrue(ts1._cow)
+        del view
+        ts1 *= 2.0
+        self.assertFalse(ts1._cow)
+        self.assertTrue(np.may_share_memory(ts1._frame.values, buf))
+
+        view = ts1.iloc[:, :3]
+        view *= 2.0 # view copies, so the parent's buffer is its own again
+        ts1 *= 2.0
+        self.assertTrue(np.may_share_memory(ts1._frame.values, buf))
+
+    def test_method_dispatch(self):
+        ts1 = aunps_glass()
+        ranked = ts1.rank()
+        self.assertTrue(isinstance(ranked, ts1.__class__))
+        self.assertEqual(ranked.specunit, ts1.specunit)
+        self.assertEqual(ts1.rank.__name__, 'rank')
+        self.assertTrue(ts1.rank.im_self is ts1)
+
+class TestInplace(tm.TestCase):
+    def test_inplace_operators(self):
+        ts1 = aunps_glass()
+        ts1.baseline = 5.0
+        orig = ts1._frame.values.copy()
+        buf = ts1._frame.values
+        ts1 -= 1.0
+        ts1 *= 2.0
+        self.assertTrue(isinstance(ts1, ts.__class__))
+        self.assertTrue(np.may_share_memory(ts1._frame.values, buf))
+        assert_array_almost_equal(ts1._frame.values, 2.0 * (orig - 1.0))
+        # Conserved attributes untouched unless op in _cnsvdmeth
+        assert_array_almost_equal(ts1._baseline.values, 5.0)
+
+    def test_inplace_view(self):
+        ts1 = aunps_glass()
+        orig = ts1._frame.values.copy()
+        view = ts1.iloc[0:10]
+        view -= 100.0
+        assert_array_almost_equal(ts1._frame.values, orig)
+        assert_array_almost_equal(view._frame.values, orig[0:10] - 100.0)
+
+class TestRepCache(tm.TestCase):
+    def test_repcache(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        ts1.enable_repcache()
+        a1 = ts1.as_norm('a')
+        a2 = ts1.as_norm('a')
+        self.assertFalse(a1 is a2)
+        self.assertEqual(ts1.repcache.hits, 1)
+        self.assertEqual(ts1.repcache.misses, 1)
+
+        # Changing an output in place doesn't change the cached copy
+        a1.norm = 'r'
+        a3 = ts1.as_norm('a')
+        assert_array_almost_equal(a3._frame.values, a2._frame.values)
+
+        # Writing to the data invalidates
+        ts1 *= 2.0
+        self.assertEqual(len(ts1.repcache), 0)
+
+    def test_repcache_eviction(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        nbytes = ts1._frame.values.nbytes
+        ts1.enable_repcache(maxbytes=2 * nbytes)
+        for norm in ['a', 'r', 't']:
+            ts1.as_norm(norm)
+        self.assertEqual(len(ts1.repcache), 2)
+        self.assertEqual(ts1.repcache.evictions, 1)
+        self.assertFalse(('a', id(ts1._reference), ts1.specunit, 
+                          ts1.varunit) in ts1.repcache)
+
+    def test_repcache_axes(self):
+        ts1 = aunps_glass()
+        ts1.reference = 0
+        ts1.enable_repcache()
+        ts1.as_norm('a')
+        ts1.index = ts1.index[::-1]
+        self.assertEqual(len(ts1.repcache), 0)
+        assert_array_almost_equal(ts1.as_norm('a').index, ts1.index)
+
+        ts1.columns = ts1.columns[::-1]
+        self.assertEqual(len(ts1.repcache), 0)
+        self.assertTrue(ts1.as_norm('a').columns.equals(ts1.columns))
+
+class TestDtype(tm.TestCase):
+    def test_float32_policy(self):
+        ts32 = aunps_glass(dtype='float32')
+        ts32.reference = 0
+        self.assertEqual(ts32.dtype, np.float32)
+        self.assertEqual(ts32._frame.values.dtype, np.float32)
+
+        # Upcasting by alignment with float64 is undone on transfer
+        out = ts32.sub(ts32.reference, axis=0)
+        self.assertEqual(out._frame.values.dtype, np.float32)
+
+        # Log conversions are done in float64, stored in float32
+        ts64 = aunps_glass()
+        ts64.reference = 0
+        a32 = ts32.as_norm('a')
+        self.assertEqual(a32._frame.values.dtype, np.float32)
+        assert_array_almost_equal(a32._frame.values, 
+                                  ts64.as_norm('a')._frame.values, decimal=5)
+
+        ts32.baseline = 1.0
+        ts32.sub_base()
+        self.assertEqual(ts32._frame.values.dtype, np.float32)
+
+        # Explicit casts aren't undone
+        ts64 = ts32.astype('float64')
+        self.assertEqual(ts64._frame.values.dtype, np.float64)
+        self.assertEqual((ts64 * 2)._frame.values.dtype, np.float64)
+        self.assertEqual(ts32.dtype, np.float32)
+
+class TestBoxcar(tm.TestCase):
+    def test_boxcar(self):
+        ts1 = solvent_evap()
+        out = ts1.boxcar(3)
+        assert_array_equal(np.asarray(out.columns), [2.5, 5.5, 8.5, 11.5])
+        assert_array_almost_equal(out._frame.values[:, 0], 
+                                  ts1._frame.iloc[:, :3].mean(axis=1).values)
+
+        # Datetime columns are binned by time, labeled with datetimes
+        ts1 = aunps_glass()
+        out = ts1.boxcar(10)
+        self.assertEqual(out.shape, (ts1.shape[0], 10))
+        self.assertEqual(out.varunit, 'dti')
+
+class TestResample(tm.TestCase):
+    def test_resample(self):
+        from pandas import DataFrame
+        # Irregular (3-4 s) acquisition times, same as pandas on the transpose
+        frame = DataFrame(ts._frame.values.T, index=ts.columns.datetimeindex)
+        for how in ('mean', 'median'):
+            out = ts.resample('10s', how=how)
+            expected = frame.resample('10s', how=how).dropna(how='all')
+            assert_array_almost_equal(out._frame.values, expected.values.T)
+            self.assertTrue(out.columns.datetimeindex.equals(expected.index))
+            self.assertEqual(out.varunit, 'dti')
+
+        out = ts.resample('1min', how='sum', label='right')
+        expected = frame.resample('1min', how='sum', label='right')
+        assert_array_almost_equal(out._frame.values, expected.values.T)
+
+        # Interval units: widths in varunit, from t=0
+        seconds = ts.as_varunit('s')
+        codes = np.asarray(seconds.columns) // 10.0
+        expected = ts._frame.groupby(codes, axis=1).mean()
+        assert_array_almost_equal(seconds.resample(10.0)._frame.values,
+                                  expected.values)
+        # A frequency is converted to varunit
+        assert_array_almost_equal(seconds.resample('10s')._frame.values,
+                                  expected.values)
+        minutes = ts.as_varunit('m').resample('10s')
+        assert_array_almost_equal(np.asarray(minutes.columns) * 60.0,
+                                  np.asarray(seconds.resample(10.0).columns))
+
+class TestRolling(tm.TestCase):
+    def test_rolling(self):
+        from pandas import DataFrame
+        from pandas.stats.moments import rolling_mean, rolling_var, rolling_max
+        values = ts._frame.values
+        frame = DataFrame(values.T)
+        for window in (5, 17):
+            roll = ts.rolling(window)
+            for name, ref in (('mean', rolling_mean), ('var', rolling_var),
+                              ('max', rolling_max)):
+                out = getattr(roll, name)()
+                assert_allclose(out._frame.values, ref(frame, window).values.T,
+                                rtol=1e-9, atol=1e-9)
+                self.assertEqual(out.varunit, 'dti')
+
+        # Irregular (3-4 s) times: window (t - 10s, t], in seconds or as '10s'
+        x = np.asarray(ts.columns.convert('s'), dtype=float)
+        expected = np.column_stack([values[:, (x > t-10) & (x <= t)].max(axis=1)
+                                    for t in x])
+        assert_array_almost_equal(ts.rolling(10, unit='s').max()._frame.values,
+                                  expected)
+        assert_array_almost_equal(ts.rolling('10s').mean()._frame.values,
+                                  ts.rolling(10, unit='s').mean()._frame.values)
+
+    def test_rolling_var_drift(self):
+        # Short windows of a long, drifting run; a NaN in one row
+        t = np.arange(20000.0)
+        noise = np.random.RandomState(0).randn(2, len(t))
+        values = np.vstack((1e4 + 50.0 * t + 1e-4 * noise[0],
+                            1e6 + 50.0 * np.sin(t / 100.0) + 1e-2 * noise[1]))
+        values[1, 5000] = np.nan
+        from skspec.core.rolling import Rolling
+        out = Rolling(Spectra(values, index=[400.0, 500.0]), 10).var()
+        out = out._frame.values
+        for j in (9, 4999, 5100, 19999):
+            expected = np.nanvar(values[:, j-9:j+1], axis=1, ddof=1)
+            if j - 9 <= 5000 <= j:
+                expected[1] = np.nan  # Fewer than min_periods
+            assert_allclose(out[:, j], expected, rtol=1e-10)
+
+class TestSplit(tm.TestCase):
+    def test_split_by(self):
+        # Uneven: first pieces one longer; views of ts, not copies
+        pieces = ts.split_by(7, stack=False)
+        self.assertEqual([p.shape[1] for p in pieces], [15, 15] + [14]*5)
+        for p in pieces:
+            self.assertTrue(np.may_share_memory(p._frame.values, 
+                                                ts._frame.values))
+        tm.assert_frame_equal(pieces[2]._frame, ts._frame.iloc[:, 30:44])
+
+        stack = ts.split_by(4, axis=0)
+        self.assertEqual(list(stack._data.keys()), 
+                         ['spec_0', 'spec_1', 'spec_2', 'spec_3'])
+        self.assertEqual(stack._data['spec_1'].shape, (176, 100))
+        self.assertEqual(stack._data['spec_1'].specunit, 'nm')
+
+        # By duration, from the first acquisition time
+        seconds = np.asarray(ts.columns.convert('s'))
+        pieces = ts.split_by('1min', stack=False)
+        self.assertEqual([p.shape[1] for p in pieces], 
+                         list(np.bincount((seconds // 60).astype(int))))
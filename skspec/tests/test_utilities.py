@@ -0,0 +1,55 @@
+""" Tests for skspec.core.utilities and skspec.core.binning."""
+import numpy as np
+import pandas.util.testing as tm
+from numpy.testing import *
+from pandas import Series
+from skspec.core.binning import reduce_groups, rebin_values
+from skspec.core.specindex import SpecIndex
+from skspec.core.utilities import rebin
+from skspec.data import solvent_evap
+
+
+class TestRebin(tm.TestCase):
+    def test_reduce_groups(self):
+        values = np.arange(12.0).reshape(6, 2)
+        codes = np.array([2, 2, 0, 0, 0, 5])
+        groups, out = reduce_groups(values, codes, how='mean')
+        assert_array_equal(groups, [0, 2, 5])
+        assert_array_equal(out, [[6.0, 7.0], [1.0, 2.0], [10.0, 11.0]])
+        groups, out = reduce_groups(values, codes, axis=0, how='sum')
+        assert_array_equal(out[0], [18.0, 21.0])
+
+    def test_rebin_matches_groupby(self):
+        df = solvent_evap()._frame.copy()
+        df.iloc[3, 2] = np.nan
+        for how in ('mean', 'sum', 'weighted'):
+            out = rebin(df, 7.0, axis=0, avg_fcn=how)
+            grouped = df.groupby(lambda x: x // 7.0)
+            expected = grouped.sum() if how == 'sum' else grouped.mean()
+            if how == 'weighted':
+                expected = expected / expected.max()
+            assert_array_almost_equal(out.values, expected.values)
+            assert_array_almost_equal(np.asarray(out.index), 
+                                      7.0 * np.asarray(expected.index) + 3.5)
+            self.assertTrue(isinstance(out.index, SpecIndex))
+
+        # Non-uniform edges; values outside of them are dropped
+        out = rebin(df, [500.0, 1000.0, 2000.0, 4000.0], avg_fcn='mean')
+        assert_array_equal(np.asarray(out.index), [750.0, 1500.0, 3000.0])
+        x = np.asarray(df.index)
+        assert_array_almost_equal(out.values[1], 
+                                  df[(x >= 1000.0) & (x < 2000.0)].mean().values)
+
+    def test_weighted_outside_edges(self):
+        # Values outside of the edges don't set the weighting maximum
+        s = Series([1.0, 2.0, 3.0, 4.0, 1000.0], index=[0.0, 1.0, 2.0, 3.0, 9.0])
+        out = rebin_values(s, np.asarray(s.index), [0.0, 2.0, 4.0], 
+                           how='weighted')
+        assert_array_almost_equal(out.values, [1.5 / 3.5, 1.0])
+        out = rebin(s, [0.0, 2.0, 4.0])
+        assert_array_almost_equal(out.values, [1.5 / 3.5, 1.0])
+
+        # Nothing inside
+        out = rebin(s, [20.0, 30.0])
+        self.assertEqual(len(out), 0)
+